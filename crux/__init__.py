@@ -1,13 +1,53 @@
 """
 Module packages root level crux objects.
+
+Objects are imported on first access on Python 3.7+, so importing crux doesn't
+import requests and the models until they are used.
 """
+from importlib import import_module
 import logging
 from logging import NullHandler
+import sys
+
+# Module defining each root level object.
+_LAZY_OBJECTS = {
+    "Crux": "crux.apis",
+    "InMemoryMetrics": "crux._metrics",
+    "MetricsHook": "crux._metrics",
+    "Profile": "crux._profile",
+    "RequestEvent": "crux._metrics",
+    "TRACE": "crux._utils",
+}
+
+__all__ = (
+    "Crux",
+    "InMemoryMetrics",
+    "MetricsHook",
+    "Profile",
+    "RequestEvent",
+    "TRACE",
+)
+
+if sys.version_info >= (3, 7):
+
+    def __getattr__(name):
+        if name not in _LAZY_OBJECTS:
+            raise AttributeError(
+                "module {!r} has no attribute {!r}".format(__name__, name)
+            )
+        value = getattr(import_module(_LAZY_OBJECTS[name]), name)
+        globals()[name] = value
+        return value
+
+    def __dir__():
+        return sorted(list(globals()) + list(_LAZY_OBJECTS))
 
-from crux._utils import TRACE
-from crux.apis import Crux
 
-__all__ = ("Crux", "TRACE")
+else:
+    from crux._metrics import InMemoryMetrics, MetricsHook, RequestEvent
+    from crux._profile import Profile
+    from crux._utils import TRACE
+    from crux.apis import Crux
 
 # Set default logging handler to avoid "No handler found" warnings.
 logging.getLogger(__name__).addHandler(NullHandler())
@@ -0,0 +1,225 @@
+"""Module contains the in-memory cache of API metadata responses."""
+
+from collections import OrderedDict
+import copy
+import threading
+import time
+from typing import Any, Dict, FrozenSet, List, Optional, Text, Tuple  # noqa: F401
+
+from requests.models import Response
+from requests.structures import CaseInsensitiveDict
+
+from crux._utils import create_logger
+
+
+log = create_logger(__name__)
+
+DEFAULT_RESPONSE_CACHE_SIZE = 0
+
+# Seconds for which GET responses of these routes are reused, "*" matches any
+# path segment. Routes missing here are never cached.
+DEFAULT_RESPONSE_CACHE_TTLS = {
+    "v2/resources/*": 60,
+    "v1/resources/*": 60,
+    "v1/resources/*/folderpath": 300,
+    "resources/*/permissions": 60,
+    "v2/datasets/*": 300,
+}  # type: Dict[str, float]
+
+# Request headers which select a different representation of a response.
+_KEY_HEADERS = ("accept",)
+
+# Response headers kept for the responses rebuilt from the cache.
+_KEPT_HEADERS = ("content-type", "etag", "last-modified")
+
+
+def _route_segments(path):
+    # type: (List[str]) -> Tuple[str, ...]
+    return tuple(str(segment) for segment in path)
+
+
+def _path_tags(path):
+    # type: (List[str]) -> FrozenSet[Tuple[str, str]]
+    """Returns the (collection, ID) pairs of an API path, ignoring its version.
+
+    A write to a path invalidates the cached responses sharing one of its pairs,
+    so a PUT to v1/resources/ID invalidates v2/resources/ID and
+    resources/ID/permissions. A path ending in a collection of an ID is also
+    tagged with that collection and ID, so a PUT to permissions/ID/... invalidates
+    resources/ID/permissions too.
+    """
+    segments = _route_segments(path)
+    if segments and segments[0] in ("v1", "v2"):
+        segments = segments[1:]
+    tags = set(zip(segments[::2], segments[1::2]))
+    if len(segments) > 1 and len(segments) % 2:
+        tags.add((segments[-1], segments[-2]))
+    return frozenset(tags)
+
+
+class CachedResponse(object):
+    """Body and validators of a cached API response."""
+
+    __slots__ = ("url", "status_code", "content", "headers", "expires_at", "tags")
+
+    def __init__(self, response, ttl, tags):
+        # type: (Response, float, FrozenSet[Tuple[str, str]]) -> None
+        self.url = response.url
+        self.status_code = response.status_code
+        self.content = response.content
+        self.headers = dict(
+            (name, response.headers[name])
+            for name in _KEPT_HEADERS
+            if name in response.headers
+        )
+        self.expires_at = time.time() + ttl
+        self.tags = tags
+
+    @property
+    def fresh(self):
+        # type: () -> bool
+        """bool: True until the TTL of the response has passed."""
+        return time.time() < self.expires_at
+
+    def validators(self):
+        # type: () -> Dict[Text, Text]
+        """Returns the conditional request headers revalidating the response."""
+        headers = {}  # type: Dict[Text, Text]
+        if "etag" in self.headers:
+            headers["if-none-match"] = self.headers["etag"]
+        if "last-modified" in self.headers:
+            headers["if-modified-since"] = self.headers["last-modified"]
+        return headers
+
+    def to_response(self):
+        # type: () -> Response
+        """Returns a new requests Response with the cached body."""
+        response = Response()
+        response.url = self.url
+        response.status_code = self.status_code
+        response.headers = CaseInsensitiveDict(self.headers)
+        response._content = self.content  # pylint: disable=protected-access
+        response.encoding = "utf-8"
+        return response
+
+
+class ResponseCache(object):
+    """Thread-safe LRU cache of GET responses of the API, with a TTL per route.
+
+    Expired responses with an ETag or Last-Modified header are kept, so they can
+    be revalidated with a conditional request instead of fetched again.
+    """
+
+    def __init__(self, max_entries, ttls=None):
+        # type: (int, Optional[Dict[str, float]]) -> None
+        """
+        Args:
+            max_entries (int): Maximum number of responses kept, the least recently
+                used are evicted first.
+            ttls (dict): Seconds for which responses are reused by route, added to
+                DEFAULT_RESPONSE_CACHE_TTLS. A TTL of 0 disables a default route.
+                Defaults to None.
+        """
+        self.max_entries = max_entries
+        merged = dict(DEFAULT_RESPONSE_CACHE_TTLS)
+        merged.update(ttls or {})
+        self.ttls = merged
+        self._routes = [
+            (tuple(route.strip("/").split("/")), ttl)
+            for route, ttl in merged.items()
+            if ttl > 0
+        ]
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # type: OrderedDict[Any, CachedResponse]
+
+    def ttl(self, path):
+        # type: (List[str]) -> Optional[float]
+        """Returns the TTL of the route of path, or None if it isn't cached."""
+        segments = _route_segments(path)
+        for route, ttl in self._routes:
+            if len(route) == len(segments) and all(
+                part in ("*", segment) for part, segment in zip(route, segments)
+            ):
+                return ttl
+        return None
+
+    @staticmethod
+    def key(url, params, headers):
+        # type: (str, Optional[Dict[str, Any]], Any) -> Any
+        """Returns the cache key of a GET request."""
+        query = sorted(
+            (str(name), str(value)) for name, value in (params or {}).items()
+        )
+        return (
+            url,
+            tuple(query),
+            tuple(headers.get(name) for name in _KEY_HEADERS),
+        )
+
+    def get(self, key):
+        # type: (Any) -> Optional[CachedResponse]
+        """Returns the cached response of key, which may need revalidation."""
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is None:
+                return None
+            if not entry.fresh and not entry.validators():
+                return None
+            self._entries[key] = entry
+            return entry
+
+    def put(self, key, path, response, ttl):
+        # type: (Any, List[str], Response, float) -> None
+        """Caches a successful response for ttl seconds."""
+        entry = CachedResponse(response, ttl, _path_tags(path))
+        with self._lock:
+            self._entries.pop(key, None)
+            self._entries[key] = entry
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def revalidated(self, key, entry, ttl):
+        # type: (Any, CachedResponse, float) -> None
+        """Reuses entry for ttl more seconds, after the API answered 304."""
+        entry.expires_at = time.time() + ttl
+        with self._lock:
+            if key not in self._entries:
+                self._entries[key] = entry
+
+    def invalidate_path(self, path):
+        # type: (List[str]) -> None
+        """Drops the responses of the resources written by a request to path.
+
+        A bulk write, like a POST to permissions/bulk, may change any resource of
+        its collection, so it drops every response tagged with that collection.
+        """
+        tags = _path_tags(path)
+        if not tags:
+            return
+        bulk = frozenset(collection for collection, name in tags if name == "bulk")
+        with self._lock:
+            stale = [
+                key
+                for key, entry in self._entries.items()
+                if entry.tags & tags
+                or any(collection in bulk for collection, _ in entry.tags)
+            ]
+            for key in stale:
+                del self._entries[key]
+        if stale:
+            log.debug("Invalidated %s cached responses of %s", len(stale), path)
+
+    def clear(self):
+        # type: () -> None
+        """Drops all responses."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        # type: () -> int
+        with self._lock:
+            return len(self._entries)
+
+    def __deepcopy__(self, memo):
+        # The lock can't be copied, and responses are cheap to fetch again.
+        return ResponseCache(self.max_entries, ttls=copy.deepcopy(self.ttls, memo))
@@ -0,0 +1,178 @@
+"""Module contains the on-disk catalog of delivery manifests and resource metadata."""
+
+import json
+import os
+import sqlite3
+import threading
+from typing import Any, Dict, List, Optional  # noqa: F401
+
+from crux._utils import create_logger
+
+
+log = create_logger(__name__)
+
+CATALOG_FILE_NAME = "delivery_catalog.sqlite3"
+
+_SCHEMA = (
+    """
+    CREATE TABLE IF NOT EXISTS delivery_manifests (
+        dataset_id TEXT NOT NULL,
+        delivery_id TEXT NOT NULL,
+        file_format TEXT NOT NULL,
+        manifest TEXT NOT NULL,
+        PRIMARY KEY (dataset_id, delivery_id, file_format)
+    )
+    """,
+    """
+    CREATE TABLE IF NOT EXISTS resources (
+        resource_id TEXT NOT NULL PRIMARY KEY,
+        dataset_id TEXT NOT NULL,
+        frame_id TEXT,
+        raw_model TEXT NOT NULL
+    )
+    """,
+)
+
+
+class DeliveryCatalog(object):
+    """SQLite catalog of delivery manifests and their resource metadata.
+
+    Deliveries never change once they have happened, so their manifests, the frame
+    IDs and the metadata of their resources can be kept across processes. Only
+    deliveries and resources missing from the catalog have to be fetched from the API.
+
+    The catalog is safe to share between threads, and between processes through
+    SQLite's own file locking.
+    """
+
+    def __init__(self, path):
+        # type: (str) -> None
+        """
+        Args:
+            path (str): Path of the SQLite database file. Parent directories are
+                created when the catalog is first used.
+        """
+        self.path = path
+        self._lock = threading.Lock()
+        self._db = None  # type: Optional[sqlite3.Connection]
+
+    @classmethod
+    def from_cache_dir(cls, cache_dir):
+        # type: (str) -> DeliveryCatalog
+        """Returns a catalog stored in cache_dir."""
+        return cls(os.path.join(os.path.expanduser(cache_dir), CATALOG_FILE_NAME))
+
+    def _connect(self):
+        # type: () -> sqlite3.Connection
+        if self._db is None:
+            directory = os.path.dirname(self.path)
+            if directory and not os.path.isdir(directory):
+                os.makedirs(directory)
+            log.debug("Opening delivery catalog %s", self.path)
+            connection = sqlite3.connect(self.path, timeout=30, check_same_thread=False)
+            with connection:
+                for statement in _SCHEMA:
+                    connection.execute(statement)
+            self._db = connection
+        return self._db
+
+    def get_manifest(self, dataset_id, delivery_id, file_format):
+        # type: (str, str, str) -> Optional[Dict[str, Any]]
+        """Returns the stored data manifest of a delivery, or None if unknown."""
+        with self._lock:
+            row = (
+                self._connect()
+                .execute(
+                    "SELECT manifest FROM delivery_manifests"
+                    " WHERE dataset_id = ? AND delivery_id = ? AND file_format = ?",
+                    (dataset_id, delivery_id, file_format),
+                )
+                .fetchone()
+            )
+        return json.loads(row[0]) if row else None
+
+    def put_manifest(self, dataset_id, delivery_id, file_format, manifest):
+        # type: (str, str, str, Dict[str, Any]) -> None
+        """Stores the data manifest of a delivery."""
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.execute(
+                    "INSERT OR REPLACE INTO delivery_manifests"
+                    " (dataset_id, delivery_id, file_format, manifest)"
+                    " VALUES (?, ?, ?, ?)",
+                    (dataset_id, delivery_id, file_format, json.dumps(manifest)),
+                )
+
+    def get_resources(self, resource_ids):
+        # type: (List[str]) -> Dict[str, Dict[str, Any]]
+        """Returns the stored raw models of resource_ids, keyed by resource ID."""
+        raw_models = {}  # type: Dict[str, Dict[str, Any]]
+        resource_ids = list(resource_ids)
+        # Stay under SQLite's default limit of 999 bound parameters.
+        batch_size = 900
+        with self._lock:
+            connection = self._connect()
+            for start in range(0, len(resource_ids), batch_size):
+                end = start + batch_size
+                batch = resource_ids[start:end]
+                rows = connection.execute(
+                    "SELECT resource_id, raw_model FROM resources"
+                    " WHERE resource_id IN ({})".format(",".join("?" * len(batch))),
+                    batch,
+                )
+                for resource_id, raw_model in rows:
+                    raw_models[resource_id] = json.loads(raw_model)
+        return raw_models
+
+    def put_resources(self, dataset_id, raw_models):
+        # type: (str, List[Dict[str, Any]]) -> None
+        """Stores resource raw models."""
+        rows = []
+        for raw_model in raw_models:
+            frame_id = None
+            for label in raw_model.get("labels") or []:
+                if label.get("labelKey") == "frame_id":
+                    frame_id = label.get("labelValue")
+            rows.append(
+                (raw_model["resourceId"], dataset_id, frame_id, json.dumps(raw_model))
+            )
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                connection.executemany(
+                    "INSERT OR REPLACE INTO resources"
+                    " (resource_id, dataset_id, frame_id, raw_model)"
+                    " VALUES (?, ?, ?, ?)",
+                    rows,
+                )
+
+    def clear(self, dataset_id=None):
+        # type: (Optional[str]) -> None
+        """Removes everything stored for dataset_id, or for all datasets if None."""
+        with self._lock:
+            connection = self._connect()
+            with connection:
+                if dataset_id is None:
+                    connection.execute("DELETE FROM delivery_manifests")
+                    connection.execute("DELETE FROM resources")
+                else:
+                    connection.execute(
+                        "DELETE FROM delivery_manifests WHERE dataset_id = ?",
+                        (dataset_id,),
+                    )
+                    connection.execute(
+                        "DELETE FROM resources WHERE dataset_id = ?", (dataset_id,)
+                    )
+
+    def close(self):
+        # type: () -> None
+        """Closes the database connection."""
+        with self._lock:
+            if self._db is not None:
+                self._db.close()
+                self._db = None
+
+    def __deepcopy__(self, memo):
+        # The SQLite connection and lock can't be copied, the copy opens its own.
+        return DeliveryCatalog(self.path)
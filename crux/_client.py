@@ -1,5 +1,7 @@
 """Module contains code pertaining to CruxClient."""
 
+import copy
+from timeit import default_timer
 from typing import (  # noqa: F401 pylint: disable=unused-import
     Any,
     Dict,
@@ -11,6 +13,7 @@ from typing import (  # noqa: F401 pylint: disable=unused-import
     Union,
 )
 
+from requests import Response  # noqa: F401 pylint: disable=unused-import
 from requests.exceptions import (
     ConnectTimeout,
     HTTPError,
@@ -20,8 +23,21 @@ from requests.exceptions import (
     TooManyRedirects,
 )
 
+from crux._cache import CachedResponse, ResponseCache  # noqa: F401
+from crux._catalog import DeliveryCatalog
 from crux._config import CruxConfig
-from crux._utils import create_logger, Headers, url_builder
+from crux._lazy import LazyModelList
+from crux._metrics import (  # noqa: F401
+    MetricsHook,
+    RequestEvent,
+    response_event,
+    route_template,
+)
+from crux._path_index import PathIndex
+from crux._profile import current_context, record_request
+from crux._signed_urls import SignedURLCache
+from crux._singleflight import SingleFlight
+from crux._utils import create_logger, get_pool_stats, Headers, url_builder
 from crux.exceptions import (
     CruxAPIError,
     CruxClientConnectionError,
@@ -34,6 +50,123 @@ from crux.exceptions import (
 
 log = create_logger(__name__)
 
+# Status codes of successful API responses which have a body.
+SUCCESS_STATUS_CODES = (200, 201, 202, 206)
+
+
+def build_api_url(crux_config, path):
+    # type: (CruxConfig, List[str]) -> str
+    """Builds the URL of an API path.
+
+    Args:
+        crux_config (CruxConfig): Configuration with the API host and prefixes.
+        path (list): API resource path. A first element of "v1" or "v2" selects
+            the prefix of that API version.
+
+    Returns:
+        str: Percent encoded URL.
+
+    Raises:
+        TypeError: If Path is not of list type.
+    """
+    if path is None or not isinstance(path, list) or len(path) <= 0:
+        raise TypeError("Path cannot be of NoneType. It should be a List")
+
+    if path[0] == "v2":
+        return url_builder(
+            url_base=crux_config.api_host,
+            url_prefix=crux_config.api_prefix_v2,
+            url_path_list=path[1:],
+        )
+    elif path[0] == "v1":
+        return url_builder(
+            url_base=crux_config.api_host,
+            url_prefix=crux_config.api_prefix_v1,
+            url_path_list=path[1:],
+        )
+    else:
+        return url_builder(
+            url_base=crux_config.api_host,
+            url_prefix=crux_config.api_prefix,
+            url_path_list=path,
+        )
+
+
+def build_api_headers(crux_config, headers=None):
+    # type: (CruxConfig, MutableMapping[Text, Text]) -> MutableMapping[Text, Text]
+    """Adds the authorization and user agent headers to headers."""
+    if headers is None:
+        headers = Headers({})
+
+    auth_scheme = "Bearer"  # type: str
+    bearer_token = "{scheme} {key}".format(
+        scheme=auth_scheme, key=crux_config.api_key
+    )  # type: Text
+
+    user_agent = crux_config.user_agent  # type: Text
+
+    headers["authorization"] = bearer_token
+    headers["user-agent"] = user_agent
+
+    return headers
+
+
+def deserialize(response_json, model, connection, paginate, lazy=False):
+    # type: (Any, Any, Any, Dict[str, Any], bool) -> Any
+    """Serializes a decoded API response into model objects.
+
+    Args:
+        response_json (dict or list): Decoded response body.
+        model (crux.models.CruxModel): Deserialization Model.
+        connection: Connection given to the created objects.
+        paginate (dict): Receives the cursor of paginated responses.
+        lazy (bool): Returns lists as a LazyModelList, which builds model objects
+            when they are accessed. Defaults to False.
+
+    Returns:
+        crux.models.Model or list: Model object, or list of them.
+    """
+    items = None
+    if isinstance(response_json, list):
+        log.debug("Response is list of type %s", model)
+        items = response_json
+    elif (
+        isinstance(response_json, dict)
+        and "results" in response_json
+        and "cursor" in response_json
+    ):
+        log.debug("Response is pagination of type %s", model)
+        paginate["cursor"] = response_json["cursor"]
+        paginate["pages"] = paginate.get("pages", 0) + 1
+        items = response_json["results"]
+
+    if items is not None:
+        if lazy:
+            return LazyModelList(items, model, connection)
+        return [model.from_dict(item, connection=connection) for item in items]
+
+    log.debug("Response is of type %s", model)
+    return model.from_dict(response_json, connection=connection)
+
+
+def request_key(url, params, headers):
+    # type: (str, Optional[Dict[str, Any]], MutableMapping[Text, Text]) -> Tuple
+    """Returns a key identifying identical requests."""
+    query = sorted((str(name), str(value)) for name, value in (params or {}).items())
+    return (
+        url,
+        tuple(query),
+        tuple(sorted((name.lower(), value) for name, value in headers.items())),
+    )
+
+
+def api_error(status_code, response_json):
+    # type: (int, Dict[str, Any]) -> CruxAPIError
+    """Returns the exception for an unsuccessful API response."""
+    if status_code == 404:
+        return CruxResourceNotFoundError(response_json)
+    return CruxAPIError(response_json)
+
 
 class CruxClient(object):
     """Crux HTTP REST client."""
@@ -47,6 +180,44 @@ class CruxClient(object):
             log.debug("Using the passed crux_config object")
             self.crux_config = crux_config
 
+        if self.crux_config.cache_dir:
+            self.delivery_catalog = DeliveryCatalog.from_cache_dir(
+                self.crux_config.cache_dir
+            )  # type: Optional[DeliveryCatalog]
+        else:
+            self.delivery_catalog = None
+
+        if self.crux_config.response_cache_size > 0:
+            self.response_cache = ResponseCache(
+                self.crux_config.response_cache_size,
+                ttls=self.crux_config.response_cache_ttls,
+            )  # type: Optional[ResponseCache]
+        else:
+            self.response_cache = None
+
+        self.metrics_hooks = list(
+            self.crux_config.metrics_hooks
+        )  # type: List[MetricsHook]
+
+        if self.crux_config.coalesce_requests:
+            self.single_flight = SingleFlight()  # type: Optional[SingleFlight]
+        else:
+            self.single_flight = None
+
+        if self.crux_config.signed_url_cache_size > 0:
+            self.signed_url_cache = SignedURLCache(
+                max_entries=self.crux_config.signed_url_cache_size
+            )  # type: Optional[SignedURLCache]
+        else:
+            self.signed_url_cache = None
+
+        if self.crux_config.path_index_ttl is not None:
+            self.path_index = PathIndex(
+                self.crux_config.path_index_ttl
+            )  # type: Optional[PathIndex]
+        else:
+            self.path_index = None
+
     def api_call(  # pylint: disable=too-many-branches, too-many-statements
         self,
         method,  # type: str
@@ -60,6 +231,7 @@ class CruxClient(object):
         connect_timeout=9.5,  # type: float
         read_timeout=60,  # type: float
         paginate=None,
+        lazy=False,  # type: bool
     ):
         # type:(...) -> Any
         """
@@ -80,6 +252,8 @@ class CruxClient(object):
             read_timeout (float): Request read timeout configuration in seconds.
                 Defaults to 60.
             paginate (dict): Dictionary to store pagination params
+            lazy (bool): Returns lists of models as a LazyModelList, which only
+                builds a model object when it is accessed. Defaults to False.
 
         Returns:
             crux.models.Model or bool: Serialized response from API backend.
@@ -93,112 +267,213 @@ class CruxClient(object):
             CruxAPIError: If API has status code other than 2XX.
         """
 
-        if path is None or not isinstance(path, list) or len(path) <= 0:
-            raise TypeError("Path cannot be of NoneType. It should be a List")
-
-        if path[0] == "v2":
-            url = url_builder(
-                url_base=self.crux_config.api_host,
-                url_prefix=self.crux_config.api_prefix_v2,
-                url_path_list=path[1:],
-            )
-        elif path[0] == "v1":
-            url = url_builder(
-                url_base=self.crux_config.api_host,
-                url_prefix=self.crux_config.api_prefix_v1,
-                url_path_list=path[1:],
-            )
-        else:
-            url = url_builder(
-                url_base=self.crux_config.api_host,
-                url_prefix=self.crux_config.api_prefix,
-                url_path_list=path,
-            )
+        url = build_api_url(self.crux_config, path)
 
-
-        if headers is None:
-            headers = Headers({})
+        headers = build_api_headers(self.crux_config, headers)
 
         if params is None:
             params = {}
 
         if paginate is None:
             paginate = {}
+        # Position of this request in a paginated listing, counted by deserialize.
+        page = paginate.get("pages", 0) + 1
+        # Events are only built for metrics hooks or an active profile.
+        record = bool(self.metrics_hooks) or current_context() is not None
 
-        auth_scheme = "Bearer"  # type: str
-        bearer_token = "{scheme} {key}".format(
-            scheme=auth_scheme, key=self.crux_config.api_key
-        )  # type: Text
+        if method not in ("GET", "DELETE", "PUT", "POST"):
+            raise ValueError("Request Method Type should be in GET, DELETE, PUT, POST")
 
-        user_agent = self.crux_config.user_agent  # type: Text
+        cache = self.response_cache
+        cache_key = cached = None
+        cache_ttl = 0.0
+        if cache is not None and method == "GET" and not stream:
+            route_ttl = cache.ttl(path)
+            if route_ttl is not None:
+                cache_ttl = route_ttl
+                cache_key = cache.key(url, params, headers)
+                cached = cache.get(cache_key)
+        if cached is not None:
+            if cached.fresh:
+                log.debug("Using cached response of %s", url)
+                if record:
+                    self._emit_request_event(
+                        RequestEvent(
+                            method,
+                            route_template(path),
+                            status_code=cached.status_code,
+                            response_bytes=len(cached.content),
+                            page=page,
+                            cached=True,
+                        )
+                    )
+                return self._cached_result(cached, model, paginate, lazy)
+            headers.update(cached.validators())
 
-        headers["authorization"] = bearer_token
-        headers["user-agent"] = user_agent
+        log.trace("Setting request stream: %s", stream)
+        log.trace("Setting request data: %s, json: %s", data, json)
+        log.trace("Setting request params: %s", params)
+        log.trace("Setting headers: %s", headers)
 
-        session = self.crux_config.session
-        if method in ("GET", "DELETE", "PUT", "POST"):
-            try:
-                log.trace("Setting request stream: %s", stream)
-                log.trace("Setting request data: %s, json: %s", data, json)
-                log.trace("Setting request params: %s", params)
-                log.trace("Setting headers: %s", headers)
-                response = session.request(
-                    method,
-                    url,
-                    headers=headers,
-                    data=data,
-                    json=json,
-                    stream=stream,
-                    params=params,
-                    timeout=(connect_timeout, read_timeout),
+        def send():
+            return self.crux_config.session.request(
+                method,
+                url,
+                headers=headers,
+                data=data,
+                json=json,
+                stream=stream,
+                params=params,
+                timeout=(connect_timeout, read_timeout),
+            )
+
+        response = None
+        shared = False
+        # Exception raised to the caller when the request fails, for its event.
+        error = None  # type: Optional[BaseException]
+        started = default_timer()
+        try:
+            if self.single_flight is not None and method == "GET" and not stream:
+                response, shared = self.single_flight.run(
+                    request_key(url, params, headers), send
                 )
-            except HTTPError as err:
-                raise CruxClientHTTPError(str(err), err.response)
-            except TooManyRedirects as err:
-                raise CruxClientTooManyRedirects(str(err))
-            except (ProxyError, SSLError) as err:
-                raise CruxClientConnectionError(str(err))
-            except (ConnectTimeout, ReadTimeout) as err:
-                raise CruxClientTimeout(str(err))
-        else:
-            raise ValueError("Request Method Type should be in GET, DELETE, PUT, POST")
+                if shared:
+                    log.debug("Sharing the response of a concurrent GET %s", url)
+                    # Each caller decodes its own copy, so models share no state.
+                    response = copy.copy(response)
+            else:
+                response = send()
+        except HTTPError as err:
+            error = CruxClientHTTPError(str(err), err.response)
+            raise error
+        except TooManyRedirects as err:
+            error = CruxClientTooManyRedirects(str(err))
+            raise error
+        except (ProxyError, SSLError) as err:
+            error = CruxClientConnectionError(str(err))
+            raise error
+        except (ConnectTimeout, ReadTimeout) as err:
+            error = CruxClientTimeout(str(err))
+            raise error
+        except BaseException as err:
+            error = err
+            raise
+        finally:
+            # A write may have been applied even when its response is lost.
+            if cache is not None and method != "GET":
+                cache.invalidate_path(path)
+            if response is None and record:
+                self._emit_request_event(
+                    RequestEvent(
+                        method,
+                        route_template(path),
+                        duration=default_timer() - started,
+                        page=page,
+                        error=type(error).__name__ if error is not None else None,
+                    )
+                )
+        assert response is not None
 
-        if response.status_code in (200, 201, 202, 206):
+        if record:
+            event = response_event(
+                method,
+                path,
+                response,
+                default_timer() - started,
+                page=page,
+                stream=stream,
+                shared=shared,
+            )
+            event.cached = cached is not None and response.status_code == 304
+            self._emit_request_event(event)
+
+        if cache is not None and cached is not None and response.status_code == 304:
+            log.debug("Cached response of %s is still valid", url)
+            cache.revalidated(cache_key, cached, cache_ttl)
+            return self._cached_result(cached, model, paginate, lazy)
+
+        if response.status_code in SUCCESS_STATUS_CODES:
+            if (
+                cache is not None
+                and cache_key is not None
+                and response.status_code == 200
+            ):
+                cache.put(cache_key, path, response, cache_ttl)
             if model is None:
                 log.debug("Model is set to None, returning response dictionary")
                 return response
             else:
-                if isinstance(response.json(), list):
-                    log.debug("Response is list of type %s", model)
-                    serial_list = []
-                    for item in response.json():
-                        obj = model.from_dict(item, connection=self)
-                        serial_list.append(obj)
-                    return serial_list
-                elif (
-                    isinstance(response.json(), dict)
-                    and "results" in response.json()
-                    and "cursor" in response.json()
-                ):
-                    log.debug("Response is pagination of type %s", model)
-                    paginate["cursor"] = response.json()["cursor"]
-                    serial_list = []
-                    for item in response.json()["results"]:
-                        obj = model.from_dict(item, connection=self)
-                        serial_list.append(obj)
-                    return serial_list
-                else:
-                    log.debug("Response is of type %s", model)
-                    obj = model.from_dict(response.json(), connection=self)
-                    return obj
+                # Decode the body once, with the configured decoder.
+                response_json = self.json(response)
+                return deserialize(response_json, model, self, paginate, lazy=lazy)
         elif response.status_code == 204:
             log.debug("Response code is 204, returning True boolean value")
             return True
         else:
-            if response.status_code == 404:
-                raise CruxResourceNotFoundError(response.json())
-            raise CruxAPIError(response.json())
+            raise api_error(response.status_code, self.json(response))
+
+    def json(self, response):
+        # type: (Union[Response, CachedResponse]) -> Any
+        """Decodes the JSON body of response with the configured decoder.
+
+        Args:
+            response (requests.Response): Response of api_call with model None.
+
+        Returns:
+            Decoded JSON document.
+        """
+        return self.crux_config.json_decoder(response.content)
+
+    def add_metrics_hook(self, hook):
+        # type: (MetricsHook) -> None
+        """Adds a hook receiving the RequestEvent of each API call.
+
+        Args:
+            hook (crux.MetricsHook): Hook, for example an InMemoryMetrics.
+        """
+        self.metrics_hooks.append(hook)
+
+    def _emit_request_event(self, event):
+        # type: (RequestEvent) -> None
+        if not (event.cached or event.shared):
+            record_request(
+                "{} {}".format(event.method, event.route),
+                event.duration,
+                bytes_sent=event.request_bytes,
+                bytes_received=event.response_bytes,
+            )
+        for hook in self.metrics_hooks:
+            try:
+                hook.on_request(event)
+            except Exception as err:  # pylint: disable=broad-except
+                log.warning("Metrics hook %s failed: %s", hook, err)
+
+    def _cached_result(self, cached, model, paginate, lazy):
+        # type: (CachedResponse, Any, Dict[str, Any], bool) -> Any
+        """Returns what api_call returns for a cached response."""
+        if model is None:
+            return cached.to_response()
+        response_json = self.crux_config.json_decoder(cached.content)
+        return deserialize(response_json, model, self, paginate, lazy=lazy)
+
+    def pool_stats(self):
+        # type: () -> Dict[str, List[Dict[str, Any]]]
+        """Gets the usage counters of the API and storage connection pools.
+
+        Returns:
+            dict: Lists of per-host pool counters, as returned by get_pool_stats,
+                keyed by "api" and "storage".
+        """
+        return {
+            "api": get_pool_stats(self.crux_config.session),
+            "storage": get_pool_stats(self.crux_config.storage_session),
+        }
 
     def close(self):
         """Closes the Session."""
         self.crux_config.session.close()
+        self.crux_config.storage_session.close()
+        if self.crux_config.recorder is not None:
+            self.crux_config.recorder.close()
+        if self.delivery_catalog is not None:
+            self.delivery_catalog.close()
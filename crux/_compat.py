@@ -4,10 +4,30 @@
 try:
     # Python 3 imports
     from builtins import str as unicode
-    from urllib.parse import quote as urllib_quote  # type: ignore
+    from collections.abc import Sequence  # type: ignore
+    import queue  # type: ignore
+    from sys import intern  # type: ignore
+    from urllib.parse import (  # type: ignore
+        parse_qs,
+        quote as urllib_quote,
+        unquote,
+        urlsplit,
+    )
 except ImportError:
     # Python 2 imports
-    from __builtin__ import unicode  # type: ignore
-    from urllib import quote as urllib_quote
+    from __builtin__ import intern, unicode  # type: ignore
+    from collections import Sequence  # type: ignore
+    import Queue as queue  # type: ignore
+    from urllib import quote as urllib_quote, unquote
+    from urlparse import parse_qs, urlsplit  # type: ignore
 
-__all__ = ("unicode", "urllib_quote")
+__all__ = (
+    "intern",
+    "parse_qs",
+    "queue",
+    "Sequence",
+    "unicode",
+    "unquote",
+    "urllib_quote",
+    "urlsplit",
+)
@@ -3,25 +3,121 @@
 import os
 import platform
 import re
-from typing import Dict, MutableMapping, Optional, Text, Union  # noqa: F401
+from typing import (  # noqa: F401
+    Any,
+    Callable,
+    Dict,
+    List,
+    MutableMapping,
+    Optional,
+    Text,
+    Union,
+)
 
 import requests
-from requests.packages.urllib3.util.retry import (  # Dynamic load pylint: disable=import-error
-    Retry,
-)
+from requests.adapters import DEFAULT_POOLBLOCK, DEFAULT_POOLSIZE
 
 from crux.__version__ import __version__
-from crux._utils import create_logger, get_session, str_to_bool
+from crux._cache import DEFAULT_RESPONSE_CACHE_SIZE
+from crux._json import get_json_decoder
+from crux._profile import record_storage_response
+from crux._ratelimit import RateLimiter
+from crux._replay import Recorder, ReplayAdapter
+from crux._signed_urls import DEFAULT_SIGNED_URL_CACHE_SIZE
+from crux._utils import (
+    create_logger,
+    get_session,
+    RateLimitedRetry,
+    RETRY_STATUS_CODES,
+    str_to_bool,
+)
 
 log = create_logger(__name__)
 
+# Default user agent, computed once per process as platform.processor() can run
+# a subprocess.
+_CACHED_USER_AGENT = None  # type: Optional[str]
+
+# Options set from arguments or environment variables, logged at debug level.
+_LOGGED_OPTIONS = (
+    "api_host",
+    "api_prefix",
+    "api_prefix_v2",
+    "api_prefix_v1",
+    "user_agent",
+    "only_use_crux_domains",
+    "cache_dir",
+    "path_index_ttl",
+    "signed_url_cache_size",
+    "response_cache_size",
+    "coalesce_requests",
+    "pool_connections",
+    "pool_maxsize",
+    "pool_block",
+    "storage_pool_size",
+    "api_rate_limit",
+    "storage_rate_limit",
+    "adaptive_rate_limit",
+    "json_decoder",
+    "record_path",
+    "replay_path",
+    "replay_latency_scale",
+)
+
+
+def _env_str(value, name, default):
+    # type: (Optional[str], str, str) -> str
+    """Returns value, or the environment variable name if value is None."""
+    if value is None:
+        return os.environ.get(name, default)
+    return value
+
+
+def _env_path(value, name):
+    # type: (Optional[str], str) -> Optional[str]
+    """Returns value, or the environment variable name if value is None.
+
+    Returns None if neither is set.
+    """
+    if value is None:
+        return os.environ.get(name)
+    return value
+
+
+def _env_int(value, name, default):
+    # type: (Optional[int], str, int) -> int
+    """Returns value, or the environment variable name as an int if value is None."""
+    if value is None:
+        return int(os.environ.get(name, default))
+    return value
+
+
+def _env_float(value, name):
+    # type: (Optional[float], str) -> Optional[float]
+    """Returns value, or the environment variable name as a float if value is None.
+
+    Returns None if neither is set.
+    """
+    if value is None:
+        env_value = os.environ.get(name)
+        return float(env_value) if env_value else None
+    return value
+
+
+def _env_bool(value, name, default):
+    # type: (Optional[bool], str, bool) -> bool
+    """Returns value, or the environment variable name as a bool if value is None."""
+    if value is None:
+        return str_to_bool(os.environ.get(name, str(default)))
+    return value
+
 
 class CruxConfig(object):
     """
     Crux Configuration Class.
     """
 
-    def __init__(  # pylint: disable=too-many-branches
+    def __init__(
         self,
         api_key=None,  # type: Optional[str]
         api_host=None,  # type: str
@@ -32,6 +128,24 @@ class CruxConfig(object):
         session=None,  # type: requests.Session
         api_prefix_v2=None,  # type: str
         api_prefix_v1=None, #type: str
+        cache_dir=None,  # type: str
+        path_index_ttl=None,  # type: float
+        signed_url_cache_size=None,  # type: int
+        storage_pool_size=None,  # type: int
+        pool_connections=None,  # type: int
+        pool_maxsize=None,  # type: int
+        pool_block=None,  # type: bool
+        json_decoder=None,  # type: Union[str, Callable[[bytes], Any]]
+        response_cache_size=None,  # type: int
+        response_cache_ttls=None,  # type: Dict[str, float]
+        coalesce_requests=None,  # type: bool
+        api_rate_limit=None,  # type: float
+        storage_rate_limit=None,  # type: float
+        adaptive_rate_limit=None,  # type: bool
+        metrics_hooks=None,  # type: List[Any]
+        record_path=None,  # type: str
+        replay_path=None,  # type: str
+        replay_latency_scale=None,  # type: float
     ):
         # type: (...) -> None
         """
@@ -45,6 +159,54 @@ class CruxConfig(object):
                 use for upload and download, False otherwise.
                 Defaults to False.
             session(requests.Session): Session to be used with connection.
+            cache_dir (str): Directory of the on-disk delivery catalog, which keeps
+                delivery manifests and resource metadata across processes.
+                Defaults to None, which disables the catalog.
+            path_index_ttl (float): Seconds for which Dataset path lookups are answered
+                from a per-folder index instead of a listing call per path.
+                Defaults to None, which disables the index.
+            signed_url_cache_size (int): Maximum number of signed URLs of file
+                resources kept until they expire, 0 disables the cache.
+                Defaults to 1024.
+            storage_pool_size (int): Maximum number of keep-alive connections per
+                storage host, shared by all file transfers. Defaults to pool_maxsize.
+            pool_connections (int): Number of hosts whose connection pools are kept
+                by each session. Defaults to 10.
+            pool_maxsize (int): Maximum number of keep-alive connections per API host.
+                Set it to at least the number of threads sharing the connection.
+                Defaults to 10.
+            pool_block (bool): True to wait for a free connection when a pool is
+                full, False to open a connection which is discarded after use.
+                Defaults to False.
+            json_decoder (str or callable): Function decoding JSON response bodies
+                from bytes, or the name of a decoder: "orjson", "simdjson", "json"
+                or "auto". Defaults to "auto", the fastest decoder installed.
+            response_cache_size (int): Maximum number of metadata GET responses
+                reused until their route TTL passes, 0 disables the cache.
+                Defaults to 0.
+            response_cache_ttls (dict): Seconds for which responses of a route are
+                reused, keyed by routes like "v2/resources/*", added to the
+                default routes. Defaults to None.
+            coalesce_requests (bool): True to share the response of a GET request
+                with the identical GET requests made while it is in flight.
+                Defaults to True.
+            api_rate_limit (float): Maximum API requests per second, shared by all
+                threads. Defaults to None, which is unlimited until throttled.
+            storage_rate_limit (float): Maximum storage requests per second, shared
+                by all file transfers. Defaults to None, which is unlimited until
+                throttled.
+            adaptive_rate_limit (bool): True to lower the request rate after 429
+                responses, and 503 responses with Retry-After, raising it back
+                while requests succeed. Defaults to True.
+            metrics_hooks (list): crux.MetricsHook objects receiving the
+                measurements of each API call. Defaults to None.
+            record_path (str): JSONL file to which every API and storage response
+                is appended. Defaults to None.
+            replay_path (str): JSONL recording whose responses are served instead
+                of sending requests. Defaults to None.
+            replay_latency_scale (float): Factor applied to the recorded duration
+                of replayed responses, which is waited before returning them.
+                Defaults to None, which returns them immediately.
 
         Raises:
             ValueError: If CRUX_API_KEY is not set.
@@ -60,81 +222,145 @@ class CruxConfig(object):
             self.api_key = api_key
             log.trace("API KEY: %s", self.api_key)
 
-        if api_host is None:
-            self.api_host = os.environ.get(
-                "CRUX_API_HOST", "https://api.cruxinformatics.com"
-            )
-            log.debug("Setting API host to %s", self.api_host)
-        else:
-            self.api_host = api_host
-            log.debug("Setting API host to %s", self.api_host)
+        self.api_host = _env_str(
+            api_host, "CRUX_API_HOST", "https://api.cruxinformatics.com"
+        )
+        self.api_prefix = _env_str(api_prefix, "CRUX_API_PREFIX", "plat-api")
+        self.api_prefix_v2 = _env_str(api_prefix_v2, "CRUX_API_PREFIX_V2", "v2/client")
+        self.api_prefix_v1 = _env_str(api_prefix_v1, "CRUX_API_PREFIX_V1", "v1/client")
+        self.user_agent = (
+            self._default_user_agent() if user_agent is None else user_agent
+        )
 
-        if api_prefix is None:
-            self.api_prefix = os.environ.get("CRUX_API_PREFIX", "plat-api")
-        else:
-            self.api_prefix = api_prefix
-        log.trace("Setting API prefix to %s", self.api_prefix)
+        self.proxies = (
+            proxies if proxies else {}
+        )  # type: Optional[MutableMapping[Text, Text]]
 
-        if api_prefix_v2 is None:
-            self.api_prefix_v2 = os.environ.get("CRUX_API_PREFIX_V2", "v2/client")
-        else:
-            self.api_prefix_v2 = api_prefix_v2
-        log.trace("Setting API prefix-v2 to %s", self.api_prefix_v2)
+        self.only_use_crux_domains = _env_bool(
+            only_use_crux_domains, "CRUX_ONLY_USE_CRUX_DOMAINS", False
+        )
 
-        if api_prefix_v1 is None:
-            self.api_prefix_v1 = os.environ.get("CRUX_API_PREFIX_V1", "v1/client")
-        else:
-            self.api_prefix_v1 = api_prefix_v1
+        self.cache_dir = _env_path(cache_dir, "CRUX_CACHE_DIR")
+        self.path_index_ttl = _env_float(path_index_ttl, "CRUX_PATH_INDEX_TTL")
+        self.signed_url_cache_size = _env_int(
+            signed_url_cache_size,
+            "CRUX_SIGNED_URL_CACHE_SIZE",
+            DEFAULT_SIGNED_URL_CACHE_SIZE,
+        )
+        self.response_cache_size = _env_int(
+            response_cache_size, "CRUX_RESPONSE_CACHE_SIZE", DEFAULT_RESPONSE_CACHE_SIZE
+        )
+        self.response_cache_ttls = (
+            response_cache_ttls if response_cache_ttls else {}
+        )  # type: Dict[str, float]
+        self.coalesce_requests = _env_bool(
+            coalesce_requests, "CRUX_COALESCE_REQUESTS", True
+        )
+        self.metrics_hooks = list(metrics_hooks or [])  # type: List[Any]
+        self.pool_connections = _env_int(
+            pool_connections, "CRUX_POOL_CONNECTIONS", DEFAULT_POOLSIZE
+        )
+        self.pool_maxsize = _env_int(
+            pool_maxsize, "CRUX_POOL_MAXSIZE", DEFAULT_POOLSIZE
+        )
+        self.pool_block = _env_bool(pool_block, "CRUX_POOL_BLOCK", DEFAULT_POOLBLOCK)
+        self.storage_pool_size = _env_int(
+            storage_pool_size, "CRUX_STORAGE_POOL_SIZE", self.pool_maxsize
+        )
+        self.api_rate_limit = _env_float(api_rate_limit, "CRUX_API_RATE_LIMIT")
+        self.storage_rate_limit = _env_float(
+            storage_rate_limit, "CRUX_STORAGE_RATE_LIMIT"
+        )
+        self.adaptive_rate_limit = _env_bool(
+            adaptive_rate_limit, "CRUX_ADAPTIVE_RATE_LIMIT", True
+        )
+        if json_decoder is None:
+            json_decoder = os.environ.get("CRUX_JSON_DECODER", "auto")
+        self.json_decoder = get_json_decoder(json_decoder)
+        self.record_path = _env_path(record_path, "CRUX_RECORD_PATH")
+        self.replay_path = _env_path(replay_path, "CRUX_REPLAY_PATH")
+        self.replay_latency_scale = _env_float(
+            replay_latency_scale, "CRUX_REPLAY_LATENCY_SCALE"
+        )
+        for option in _LOGGED_OPTIONS:
+            log.debug("Setting %s to %s", option, getattr(self, option))
 
-        log.trace("Setting API prefix-v1 to %s", self.api_prefix_v1)
-        if user_agent is None:
-            self.user_agent = self._default_user_agent()
-            log.debug("Setting User Agent to %s", self.user_agent)
-        else:
-            self.user_agent = user_agent
-            log.debug("Setting User Agent to %s", self.user_agent)
+        self._init_sessions(session)
 
-        self.proxies = (
-            proxies if proxies else {}
-        )  # type: Optional[MutableMapping[Text, Text]]
+    def _init_sessions(self, session):
+        # type: (Optional[requests.Session]) -> None
+        """Creates the rate limiters, and the API and storage sessions."""
+        # API and storage requests have separate budgets, each shared by the
+        # threads using the session.
+        self.api_rate_limiter = RateLimiter(
+            "API", max_rate=self.api_rate_limit, adaptive=self.adaptive_rate_limit
+        )
+        self.storage_rate_limiter = RateLimiter(
+            "Storage",
+            max_rate=self.storage_rate_limit,
+            adaptive=self.adaptive_rate_limit,
+        )
 
-        if only_use_crux_domains is None:
-            self.only_use_crux_domains = str_to_bool(
-                os.environ.get("CRUX_ONLY_USE_CRUX_DOMAINS", "false")
-            )
-            log.debug("Setting only_use_crux_domain to %s", self.only_use_crux_domains)
-        else:
-            self.only_use_crux_domains = only_use_crux_domains
-            log.debug("Setting only_use_crux_domain to %s", self.only_use_crux_domains)
+        # Transfers from and to signed URLs share this session and its connections.
+        self.storage_session = get_session(
+            rate_limiter=self.storage_rate_limiter,
+            proxies=self.proxies,
+            pool_maxsize=self.storage_pool_size,
+            pool_connections=self.pool_connections,
+            pool_block=self.pool_block,
+        )
+        self.storage_session.hooks["response"].append(record_storage_response)
 
         if session is None:
-            retries = Retry(
+            retries = RateLimitedRetry(
                 total=20,
                 backoff_factor=0.3,
-                status_forcelist=(
-                    500,
-                    502,
-                    503,
-                    504,
-                    520,
-                    521,
-                    522,
-                    523,
-                    524,
-                    525,
-                    527,
-                    530,
-                ),
+                status_forcelist=RETRY_STATUS_CODES,
                 method_whitelist=("GET", "PUT", "DELETE", "POST"),
                 redirect=10,
                 connect=10,
                 read=10,
             )
-            self.session = get_session(retries=retries, proxies=self.proxies)
+            self.session = get_session(
+                retries=retries,
+                rate_limiter=self.api_rate_limiter,
+                proxies=self.proxies,
+                pool_maxsize=self.pool_maxsize,
+                pool_connections=self.pool_connections,
+                pool_block=self.pool_block,
+            )
         else:
             self.session = session
 
+        if self.replay_path:
+            replay_adapter = ReplayAdapter(
+                self.replay_path, latency_scale=self.replay_latency_scale
+            )
+            for replay_session in (self.session, self.storage_session):
+                replay_session.mount("http://", replay_adapter)
+                replay_session.mount("https://", replay_adapter)
+
+        self.recorder = None  # type: Optional[Recorder]
+        if self.record_path:
+            self.recorder = Recorder(
+                self.record_path,
+                api_prefixes=[
+                    (self.api_prefix_v2, "v2"),
+                    (self.api_prefix_v1, "v1"),
+                    (self.api_prefix, None),
+                ],
+            )
+            self.session.hooks["response"].append(self.recorder.api_hook)
+            self.storage_session.hooks["response"].append(self.recorder.storage_hook)
+
     def _default_user_agent(self):
+        # type: () -> str
+        global _CACHED_USER_AGENT  # pylint: disable=global-statement
+        if _CACHED_USER_AGENT is None:
+            _CACHED_USER_AGENT = self._build_user_agent()
+        return _CACHED_USER_AGENT
+
+    def _build_user_agent(self):
         # type: () -> str
         user_agent = (
             "crux-python/{ver}"
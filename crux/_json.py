@@ -0,0 +1,72 @@
+"""Module selects the JSON decoder used for API responses."""
+
+import json
+from typing import Any, Callable, Text, Union  # noqa: F401
+
+from crux._utils import create_logger
+
+
+log = create_logger(__name__)
+
+# Decoders tried in order when the decoder is "auto".
+AUTO_JSON_DECODERS = ("orjson", "simdjson", "json")
+
+
+def _json_loads(document):
+    # type: (Union[bytes, Text]) -> Any
+    # json.loads only accepts bytes from Python 3.6.
+    if isinstance(document, bytes):
+        return json.loads(document.decode("utf-8"))
+    return json.loads(document)
+
+
+def _import_decoder(name):
+    # type: (str) -> Callable[[Union[bytes, str]], Any]
+    if name == "json":
+        return _json_loads
+    elif name == "orjson":
+        import orjson  # type: ignore # pylint: disable=import-outside-toplevel,import-error
+
+        return orjson.loads
+    elif name == "simdjson":
+        import simdjson  # type: ignore # pylint: disable=import-outside-toplevel,import-error
+
+        return simdjson.loads
+    raise ValueError(
+        "json_decoder should be a callable or one of: auto, {}".format(
+            ", ".join(AUTO_JSON_DECODERS)
+        )
+    )
+
+
+def get_json_decoder(decoder=None):
+    # type: (Union[str, Callable[[Union[bytes, str]], Any], None]) -> Callable
+    """Gets the function decoding JSON response bodies.
+
+    Args:
+        decoder (str or callable): A function decoding a JSON document from bytes,
+            or the name of a decoder: "orjson", "simdjson", "json", or "auto" for the
+            fastest one installed. Defaults to None, which is "auto".
+
+    Returns:
+        callable: Function decoding a JSON document from bytes or str.
+
+    Raises:
+        ValueError: If decoder is an unknown name.
+        ImportError: If the named decoder is not installed.
+    """
+    if callable(decoder):
+        return decoder
+
+    if decoder is not None and decoder != "auto":
+        return _import_decoder(decoder)
+
+    loads = _json_loads  # type: Callable[[Union[bytes, str]], Any]
+    for name in AUTO_JSON_DECODERS:
+        try:
+            loads = _import_decoder(name)
+        except ImportError:
+            continue
+        log.debug("Using %s to decode JSON responses", name)
+        break
+    return loads
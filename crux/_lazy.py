@@ -0,0 +1,70 @@
+"""Module contains LazyModelList, a page of models built on access."""
+
+from typing import Any, Callable, Dict, Iterator, List  # noqa: F401
+
+from crux._compat import Sequence
+
+
+class LazyModelList(Sequence):
+    """Sequence of models over a list of decoded API objects.
+
+    A model object is only built when an element is accessed, so counting the
+    elements, or filtering and collecting fields from raw_items, doesn't build any.
+    Models aren't kept, each access builds a new one.
+    """
+
+    __slots__ = ("raw_items", "model", "connection")
+
+    def __init__(self, raw_items, model, connection=None):
+        # type: (List[Dict[str, Any]], Any, Any) -> None
+        """
+        Args:
+            raw_items (list): Decoded API objects.
+            model (crux.models.CruxModel): Model built from each object.
+            connection (crux._client.CruxClient): Connection given to the built
+                models. Defaults to None.
+        """
+        self.raw_items = raw_items
+        self.model = model
+        self.connection = connection
+
+    def _build(self, raw_item):
+        # type: (Dict[str, Any]) -> Any
+        return self.model.from_dict(raw_item, connection=self.connection)
+
+    def __getitem__(self, index):
+        if isinstance(index, slice):
+            return LazyModelList(self.raw_items[index], self.model, self.connection)
+        return self._build(self.raw_items[index])
+
+    def __len__(self):
+        # type: () -> int
+        return len(self.raw_items)
+
+    def __iter__(self):
+        # type: () -> Iterator[Any]
+        for raw_item in self.raw_items:
+            yield self._build(raw_item)
+
+    def __repr__(self):
+        # type: () -> str
+        return "LazyModelList({}, {} items)".format(
+            getattr(self.model, "__name__", self.model), len(self.raw_items)
+        )
+
+    def filter(self, predicate):
+        # type: (Callable[[Dict[str, Any]], bool]) -> LazyModelList
+        """Selects elements by their decoded API object, without building models.
+
+        Args:
+            predicate (callable): Called with each decoded API object, the
+                elements for which it returns True are kept.
+
+        Returns:
+            crux._lazy.LazyModelList: Sequence of the kept elements.
+        """
+        return LazyModelList(
+            [raw_item for raw_item in self.raw_items if predicate(raw_item)],
+            self.model,
+            self.connection,
+        )
@@ -0,0 +1,405 @@
+"""Module contains the request metrics hooks of CruxClient."""
+
+from collections import defaultdict
+import threading
+from typing import Any, DefaultDict, Dict, List, Optional, Tuple  # noqa: F401
+
+from crux._utils import create_logger
+
+
+log = create_logger(__name__)
+
+# Upper bounds, in seconds, of the request latency histogram buckets.
+DEFAULT_LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10)
+
+
+# Routes of the API, without their version, "*" marking the segments which are
+# IDs or values. Paths matching none have every segment following a collection
+# name replaced by {id}.
+_API_ROUTES = (
+    "datasets",
+    "datasets/provenance",
+    "datasets/public",
+    "datasets/stitch/*",
+    "datasets/*",
+    "datasets/*/labels/search",
+    "datasets/*/labels/*",
+    "datasets/*/labels/*/*",
+    "datasets/*/permissions",
+    "datasets/*/resources",
+    "datasets/*/resources/*/labels",
+    "datasets/*/resources/*/labels/*",
+    "datasets/*/resources/*/labels/*/*",
+    "datasets/*/stitch",
+    "deliveries/*/ids",
+    "deliveries/*/log",
+    "deliveries/*/*",
+    "deliveries/*/*/data",
+    "deliveries/*/*/raw",
+    "drives/my",
+    "identities/profile",
+    "jobs/*",
+    "permissions/bulk",
+    "permissions/*/*/*",
+    "resources",
+    "resources/get-batch",
+    "resources/*",
+    "resources/*/content",
+    "resources/*/content-url",
+    "resources/*/folderpath",
+    "resources/*/permissions",
+    "resources/*/upload-session-complete",
+    "resources/*/upload-session-start",
+    "subscriptions/view/summary",
+)
+
+
+def _routes_by_length(routes):
+    # type: (Tuple[str, ...]) -> Dict[int, List[Tuple[str, ...]]]
+    """Returns the segments of routes by their number, the most specific first.
+
+    Routes with fewer "*" segments come first, so a literal segment like
+    get-batch is preferred to an ID.
+    """
+    by_length = defaultdict(list)  # type: DefaultDict[int, List[Tuple[str, ...]]]
+    for route in sorted(routes, key=lambda name: name.count("*")):
+        by_length[route.count("/") + 1].append(tuple(route.split("/")))
+    return dict(by_length)
+
+
+_ROUTES_BY_LENGTH = _routes_by_length(_API_ROUTES)
+
+
+def route_template(path):
+    # type: (List[str]) -> str
+    """Returns the route of an API path, with its IDs and values replaced by {id}.
+
+    The path is matched against the API routes, so v2/resources/abc/permissions
+    becomes v2/resources/{id}/permissions while v1/resources/get-batch is kept.
+    Other paths have every segment following a collection name replaced, so
+    the number of routes stays bounded.
+    """
+    segments = [str(segment) for segment in path]
+    version = segments[:1] if segments[:1] in (["v1"], ["v2"]) else []
+    start = len(version)
+    segments = segments[start:]
+    for route in _ROUTES_BY_LENGTH.get(len(segments), ()):
+        if all(part in ("*", segment) for part, segment in zip(route, segments)):
+            templated = ["{id}" if part == "*" else part for part in route]
+            break
+    else:
+        templated = [
+            "{id}" if position % 2 == 1 else segment
+            for position, segment in enumerate(segments)
+        ]
+    return "/".join(version + templated)
+
+
+class RequestEvent(object):
+    """Measurements of one CruxClient.api_call."""
+
+    __slots__ = (
+        "method",
+        "route",
+        "status_code",
+        "duration",
+        "retries",
+        "request_bytes",
+        "response_bytes",
+        "page",
+        "cached",
+        "shared",
+        "error",
+    )
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        method,  # type: str
+        route,  # type: str
+        status_code=None,  # type: Optional[int]
+        duration=0.0,  # type: float
+        retries=0,  # type: int
+        request_bytes=0,  # type: int
+        response_bytes=0,  # type: int
+        page=1,  # type: int
+        cached=False,  # type: bool
+        shared=False,  # type: bool
+        error=None,  # type: Optional[str]
+    ):
+        # type: (...) -> None
+        """
+        Attributes:
+            method (str): Request method.
+            route (str): API route, see route_template.
+            status_code (int): Response status code, None if there is no response.
+            duration (float): Seconds until the response headers arrived.
+            retries (int): Retries made by urllib3 before the response.
+            request_bytes (int): Size of the request body.
+            response_bytes (int): Size of the response body, from Content-Length
+                for streamed responses.
+            page (int): Position of the response in a paginated listing, 1 for the
+                first page and for requests which aren't paginated.
+            cached (bool): True if the response came from the response cache.
+            shared (bool): True if the response of a concurrent request was shared.
+            error (str): Name of the exception raised instead of a response.
+        """
+        self.method = method
+        self.route = route
+        self.status_code = status_code
+        self.duration = duration
+        self.retries = retries
+        self.request_bytes = request_bytes
+        self.response_bytes = response_bytes
+        self.page = page
+        self.cached = cached
+        self.shared = shared
+        self.error = error
+
+    def __repr__(self):
+        # type: () -> str
+        fields = (
+            "{}={!r}".format(name, getattr(self, name)) for name in self.__slots__
+        )
+        return "RequestEvent({})".format(", ".join(fields))
+
+
+def response_event(  # pylint: disable=too-many-arguments
+    method,  # type: str
+    path,  # type: List[str]
+    response,  # type: Any
+    duration,  # type: float
+    page=1,  # type: int
+    stream=False,  # type: bool
+    shared=False,  # type: bool
+):
+    # type: (...) -> RequestEvent
+    """Returns the RequestEvent of a requests Response."""
+    retries = getattr(getattr(response.raw, "retries", None), "history", None) or ()
+    body = response.request.body if response.request is not None else None
+    if stream:
+        response_bytes = int(response.headers.get("content-length") or 0)
+    else:
+        response_bytes = len(response.content or b"")
+    return RequestEvent(
+        method,
+        route_template(path),
+        status_code=response.status_code,
+        duration=duration,
+        retries=len(retries),
+        request_bytes=len(body) if isinstance(body, (bytes, str)) else 0,
+        response_bytes=response_bytes,
+        page=page,
+        shared=shared,
+    )
+
+
+class MetricsHook(object):
+    """Base class of the objects receiving the RequestEvent of each API call.
+
+    Hooks are called on the thread making the request, so they should be quick
+    and thread-safe. Exceptions raised by hooks are logged and ignored.
+    """
+
+    def on_request(self, event):
+        # type: (RequestEvent) -> None
+        """Receives the measurements of an API call."""
+
+
+class _RouteStats(object):
+    """Aggregated measurements of a method and route."""
+
+    __slots__ = (
+        "statuses",
+        "bucket_counts",
+        "duration_sum",
+        "count",
+        "retries",
+        "request_bytes",
+        "response_bytes",
+        "max_page",
+        "cached",
+        "shared",
+    )
+
+    def __init__(self, bucket_count):
+        # type: (int) -> None
+        self.statuses = defaultdict(int)  # type: DefaultDict[str, int]
+        self.bucket_counts = [0] * bucket_count
+        self.duration_sum = 0.0
+        self.count = 0
+        self.retries = 0
+        self.request_bytes = 0
+        self.response_bytes = 0
+        self.max_page = 0
+        self.cached = 0
+        self.shared = 0
+
+
+class InMemoryMetrics(MetricsHook):
+    """Thread-safe MetricsHook aggregating the requests of each method and route."""
+
+    def __init__(self, buckets=DEFAULT_LATENCY_BUCKETS):
+        # type: (Tuple[float, ...]) -> None
+        """
+        Args:
+            buckets (tuple): Upper bounds of the latency histogram buckets, in
+                seconds. Defaults to DEFAULT_LATENCY_BUCKETS.
+        """
+        self.buckets = tuple(sorted(buckets))
+        self._lock = threading.Lock()
+        self._routes = {}  # type: Dict[Tuple[str, str], _RouteStats]
+
+    def on_request(self, event):
+        # type: (RequestEvent) -> None
+        key = (event.method, event.route)
+        if event.status_code is not None:
+            status = str(event.status_code)
+        else:
+            status = event.error or "error"
+        with self._lock:
+            stats = self._routes.get(key)
+            if stats is None:
+                stats = self._routes[key] = _RouteStats(len(self.buckets))
+            stats.statuses[status] += 1
+            stats.count += 1
+            stats.duration_sum += event.duration
+            for index, bound in enumerate(self.buckets):
+                if event.duration <= bound:
+                    stats.bucket_counts[index] += 1
+            stats.retries += event.retries
+            stats.request_bytes += event.request_bytes
+            stats.response_bytes += event.response_bytes
+            stats.max_page = max(stats.max_page, event.page)
+            stats.cached += event.cached
+            stats.shared += event.shared
+
+    def snapshot(self):
+        # type: () -> Dict[Tuple[str, str], Dict[str, Any]]
+        """Returns the aggregated measurements.
+
+        Returns:
+            dict: Measurements keyed by (method, route), with the keys
+                "requests", "statuses", "latency_buckets" (cumulative counts by
+                upper bound), "latency_sum", "retries", "request_bytes",
+                "response_bytes", "max_page", "cached" and "shared".
+        """
+        with self._lock:
+            return dict(
+                (
+                    key,
+                    {
+                        "requests": stats.count,
+                        "statuses": dict(stats.statuses),
+                        "latency_buckets": list(zip(self.buckets, stats.bucket_counts)),
+                        "latency_sum": stats.duration_sum,
+                        "retries": stats.retries,
+                        "request_bytes": stats.request_bytes,
+                        "response_bytes": stats.response_bytes,
+                        "max_page": stats.max_page,
+                        "cached": stats.cached,
+                        "shared": stats.shared,
+                    },
+                )
+                for key, stats in self._routes.items()
+            )
+
+    def __deepcopy__(self, memo):
+        # Copies of a connection keep reporting to the same aggregator.
+        return self
+
+    def reset(self):
+        # type: () -> None
+        """Drops the aggregated measurements."""
+        with self._lock:
+            self._routes.clear()
+
+    def to_prometheus(self, prefix="crux_client"):
+        # type: (str) -> str
+        """Exports the measurements in the Prometheus text exposition format.
+
+        Args:
+            prefix (str): Prefix of the metric names. Defaults to crux_client.
+
+        Returns:
+            str: Metrics text, ending with a newline.
+        """
+        return prometheus_text(self.snapshot(), prefix=prefix)
+
+
+def _escape(value):
+    # type: (str) -> str
+    return value.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def _labels(**labels):
+    # type: (**str) -> str
+    return "{{{}}}".format(
+        ",".join(
+            '{}="{}"'.format(name, _escape(str(value)))
+            for name, value in sorted(labels.items())
+        )
+    )
+
+
+def prometheus_text(snapshot, prefix="crux_client"):
+    # type: (Dict[Tuple[str, str], Dict[str, Any]], str) -> str
+    """Formats a snapshot of InMemoryMetrics in the Prometheus text format.
+
+    Args:
+        snapshot (dict): Measurements returned by InMemoryMetrics.snapshot.
+        prefix (str): Prefix of the metric names. Defaults to crux_client.
+
+    Returns:
+        str: Metrics text, ending with a newline.
+    """
+    counters = (
+        ("retries", "retries_total", "Retries made by urllib3."),
+        ("request_bytes", "request_bytes_total", "Bytes of request bodies."),
+        ("response_bytes", "response_bytes_total", "Bytes of response bodies."),
+        ("cached", "cached_responses_total", "Responses from the response cache."),
+        ("shared", "shared_responses_total", "Responses of concurrent requests."),
+    )
+    routes = sorted(snapshot.items())
+    lines = [
+        "# HELP {}_requests_total API calls by status.".format(prefix),
+        "# TYPE {}_requests_total counter".format(prefix),
+    ]
+    for (method, route), stats in routes:
+        for status, count in sorted(stats["statuses"].items()):
+            lines.append(
+                "{}_requests_total{} {}".format(
+                    prefix, _labels(method=method, route=route, status=status), count
+                )
+            )
+
+    name = "{}_request_duration_seconds".format(prefix)
+    lines.append("# HELP {} API call latency.".format(name))
+    lines.append("# TYPE {} histogram".format(name))
+    for (method, route), stats in routes:
+        for bound, count in stats["latency_buckets"]:
+            labels = _labels(method=method, route=route, le=repr(float(bound)))
+            lines.append("{}_bucket{} {}".format(name, labels, count))
+        labels = _labels(method=method, route=route, le="+Inf")
+        lines.append("{}_bucket{} {}".format(name, labels, stats["requests"]))
+        labels = _labels(method=method, route=route)
+        lines.append("{}_sum{} {}".format(name, labels, repr(stats["latency_sum"])))
+        lines.append("{}_count{} {}".format(name, labels, stats["requests"]))
+
+    for key, metric, description in counters:
+        lines.append("# HELP {}_{} {}".format(prefix, metric, description))
+        lines.append("# TYPE {}_{} counter".format(prefix, metric))
+        for (method, route), stats in routes:
+            lines.append(
+                "{}_{}{} {}".format(
+                    prefix, metric, _labels(method=method, route=route), stats[key]
+                )
+            )
+
+    name = "{}_pagination_depth_max".format(prefix)
+    lines.append("# HELP {} Deepest page fetched of a paginated listing.".format(name))
+    lines.append("# TYPE {} gauge".format(name))
+    for (method, route), stats in routes:
+        labels = _labels(method=method, route=route)
+        lines.append("{}{} {}".format(name, labels, stats["max_page"]))
+
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,70 @@
+"""Module contains the in-memory index of the resources in dataset folders."""
+
+import threading
+import time
+from typing import Dict, Optional, Tuple  # noqa: F401
+
+from crux._utils import create_logger
+
+
+log = create_logger(__name__)
+
+
+class PathIndex(object):
+    """Raw models of the resources of dataset folders, keyed by resource name.
+
+    Each folder is kept for ttl seconds after it is listed, so path lookups in it
+    don't need a listing call each. Folders are keyed by dataset ID, so every
+    Dataset object of a connection shares them, and resources deleted through the
+    connection can drop the folders they were in.
+    """
+
+    def __init__(self, ttl):
+        # type: (float) -> None
+        """
+        Args:
+            ttl (float): Seconds for which a folder listing is used.
+        """
+        self.ttl = ttl
+        self._lock = threading.Lock()
+        # Maps (dataset ID, folder) to (load time, {resource name: raw model}).
+        self._folders = {}  # type: Dict[Tuple[str, str], Tuple[float, Dict[str, Dict]]]
+
+    def get(self, dataset_id, folder):
+        # type: (str, str) -> Optional[Dict[str, Dict]]
+        """Returns the raw models of folder, or None if missing or expired."""
+        with self._lock:
+            entry = self._folders.get((dataset_id, folder))
+        if entry is None or time.time() - entry[0] >= self.ttl:
+            return None
+        return entry[1]
+
+    def put(self, dataset_id, folder, folder_index, loaded_at):
+        # type: (str, str, Dict[str, Dict], float) -> None
+        """Stores the raw models of folder, listed at loaded_at."""
+        with self._lock:
+            self._folders[(dataset_id, folder)] = (loaded_at, folder_index)
+
+    def invalidate(self, dataset_id=None, folder=None):
+        # type: (Optional[str], Optional[str]) -> None
+        """Drops folders so the next lookup lists them again.
+
+        Args:
+            dataset_id (str): Dataset whose folders are dropped. Defaults to None,
+                which drops the folders of every dataset.
+            folder (str): Folder which is dropped. Defaults to None, which drops
+                every folder of the dataset.
+        """
+        log.debug("Invalidating path index of dataset %s folder %s", dataset_id, folder)
+        with self._lock:
+            if dataset_id is None:
+                self._folders.clear()
+            elif folder is not None:
+                self._folders.pop((dataset_id, folder), None)
+            else:
+                for key in [key for key in self._folders if key[0] == dataset_id]:
+                    del self._folders[key]
+
+    def __deepcopy__(self, memo):
+        # The lock can't be copied, and folders are listed again on demand.
+        return PathIndex(self.ttl)
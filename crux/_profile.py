@@ -0,0 +1,313 @@
+"""Module contains the profiler attributing requests to high-level operations."""
+
+from collections import defaultdict
+import functools
+import random
+import threading
+from timeit import default_timer
+from types import GeneratorType
+from typing import Any, Callable, DefaultDict, Dict, Iterator, List, Tuple  # noqa: F401
+
+# Requests of an operation call to one route with an ID, above which the route is
+# reported as an N+1 pattern.
+DEFAULT_N_PLUS_ONE_THRESHOLD = 10
+
+# Operation of the requests made outside of any profiled operation.
+OTHER_OPERATION = "other"
+
+_local = threading.local()
+
+
+class _Context(object):
+    """Profile and operation call the requests of a thread are attributed to."""
+
+    __slots__ = ("profile", "invocation")
+
+    def __init__(self, profile, invocation):
+        # type: (Profile, Any) -> None
+        self.profile = profile
+        self.invocation = invocation
+
+
+def current_context():
+    # type: () -> Any
+    """Returns the profiling context of the current thread, None if not profiling."""
+    return getattr(_local, "context", None)
+
+
+def run_in_context(context, function, *args, **kwargs):
+    # type: (Any, Callable, *Any, **Any) -> Any
+    """Calls function with context as the profiling context of the current thread.
+
+    Used to carry the context of a thread to the worker threads it starts.
+    """
+    previous = current_context()
+    _local.context = context
+    try:
+        return function(*args, **kwargs)
+    finally:
+        _local.context = previous
+
+
+class _Invocation(object):
+    """Requests of one call of an operation."""
+
+    __slots__ = (
+        "name",
+        "sampled",
+        "started",
+        "api_requests",
+        "storage_requests",
+        "intervals",
+        "bytes_sent",
+        "bytes_received",
+        "routes",
+    )
+
+    def __init__(self, name, sampled):
+        # type: (str, bool) -> None
+        self.name = name
+        self.sampled = sampled
+        self.started = default_timer()
+        self.api_requests = 0
+        self.storage_requests = 0
+        self.intervals = []  # type: List[Tuple[float, float]]
+        self.bytes_sent = 0
+        self.bytes_received = 0
+        self.routes = defaultdict(int)  # type: DefaultDict[str, int]
+
+
+def _union_length(intervals):
+    # type: (List[Tuple[float, float]]) -> float
+    """Returns the time covered by at least one of intervals."""
+    total = 0.0
+    current_start = current_end = 0.0
+    started = False
+    for start, end in sorted(intervals):
+        if started and start <= current_end:
+            current_end = max(current_end, end)
+            continue
+        if started:
+            total += current_end - current_start
+        current_start, current_end = start, end
+        started = True
+    if started:
+        total += current_end - current_start
+    return total
+
+
+class Profile(object):
+    """Context manager attributing API calls and storage transfers to operations.
+
+    Requests made by the thread entering the profile, and by the worker threads of
+    the client, are attributed to the outermost profiled operation they are made
+    from, like Dataset.get_latest_files, or to "other". Outside of a profile, the
+    cost of profiling is one thread-local lookup per request and operation.
+    """
+
+    def __init__(
+        self, sample_rate=1.0, n_plus_one_threshold=DEFAULT_N_PLUS_ONE_THRESHOLD
+    ):
+        # type: (float, int) -> None
+        """
+        Args:
+            sample_rate (float): Fraction of the operation calls profiled.
+                Defaults to 1.
+            n_plus_one_threshold (int): Requests of one operation call to a route
+                with an ID from which the route is reported as an N+1 pattern.
+                Defaults to 10.
+        """
+        self.sample_rate = sample_rate
+        self.n_plus_one_threshold = n_plus_one_threshold
+        self._lock = threading.Lock()
+        self._operations = {}  # type: Dict[str, Dict[str, Any]]
+        self._other = _Invocation(OTHER_OPERATION, True)
+        self._previous = None  # type: Any
+
+    def __enter__(self):
+        # type: () -> Profile
+        self._previous = current_context()
+        self._other = _Invocation(OTHER_OPERATION, True)
+        _local.context = _Context(self, None)
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        _local.context = self._previous
+        self._finish(self._other)
+
+    def _start(self, name):
+        # type: (str) -> _Invocation
+        return _Invocation(name, random.random() < self.sample_rate)
+
+    def _finish(self, invocation):
+        # type: (_Invocation) -> None
+        if not invocation.sampled:
+            return
+        duration = default_timer() - invocation.started
+        with self._lock:
+            if invocation.name == OTHER_OPERATION and not invocation.intervals:
+                return
+            stats = self._operations.setdefault(
+                invocation.name,
+                {
+                    "calls": 0,
+                    "api_requests": 0,
+                    "storage_requests": 0,
+                    "duration": 0.0,
+                    "serial_time": 0.0,
+                    "wall_time": 0.0,
+                    "bytes_sent": 0,
+                    "bytes_received": 0,
+                    "routes": defaultdict(int),
+                    "n_plus_one": {},
+                },
+            )
+            stats["calls"] += 1
+            stats["api_requests"] += invocation.api_requests
+            stats["storage_requests"] += invocation.storage_requests
+            stats["duration"] += duration
+            stats["serial_time"] += sum(
+                end - start for start, end in invocation.intervals
+            )
+            stats["wall_time"] += _union_length(invocation.intervals)
+            stats["bytes_sent"] += invocation.bytes_sent
+            stats["bytes_received"] += invocation.bytes_received
+            for route, count in invocation.routes.items():
+                stats["routes"][route] += count
+                if "{id}" in route and count >= self.n_plus_one_threshold:
+                    stats["n_plus_one"][route] = max(
+                        count, stats["n_plus_one"].get(route, 0)
+                    )
+
+    def _record(self, invocation, route, duration, bytes_sent, bytes_received, storage):
+        # type: (Any, str, float, int, int, bool) -> None
+        if invocation is None:
+            invocation = self._other
+        if not invocation.sampled:
+            return
+        end = default_timer()
+        with self._lock:
+            if storage:
+                invocation.storage_requests += 1
+            else:
+                invocation.api_requests += 1
+            invocation.intervals.append((end - duration, end))
+            invocation.bytes_sent += bytes_sent
+            invocation.bytes_received += bytes_received
+            invocation.routes[route] += 1
+
+    def report(self):
+        # type: () -> Dict[str, Dict[str, Any]]
+        """Returns the measurements of each operation.
+
+        Returns:
+            dict: Keyed by operation name, dicts with the keys "calls",
+                "api_requests", "storage_requests", "duration" (seconds from the
+                start to the end of the calls), "serial_time" (sum of request
+                times), "wall_time" (time with at least one request in flight),
+                "bytes_sent", "bytes_received", "routes" (requests by route) and
+                "n_plus_one" (most requests of one call by N+1 route).
+        """
+        with self._lock:
+            report = {}
+            for name, stats in self._operations.items():
+                report[name] = dict(stats)
+                report[name]["routes"] = dict(stats["routes"])
+                report[name]["n_plus_one"] = dict(stats["n_plus_one"])
+            return report
+
+    def summary(self):
+        # type: () -> str
+        """Returns the report as text, one line per operation."""
+        lines = []
+        for name, stats in sorted(self.report().items()):
+            overlap = (
+                stats["serial_time"] / stats["wall_time"] if stats["wall_time"] else 1.0
+            )
+            line = (
+                "{name}: {calls} calls, {api_requests} API and {storage_requests}"
+                " storage requests, {serial_time:.3f}s of requests in {wall_time:.3f}s"
+                " ({overlap:.1f}x overlap), {bytes_sent} bytes sent,"
+                " {bytes_received} bytes received"
+            ).format(name=name, overlap=overlap, **stats)
+            if stats["n_plus_one"]:
+                line += ", N+1: " + ", ".join(
+                    "{} ({} requests)".format(route, count)
+                    for route, count in sorted(stats["n_plus_one"].items())
+                )
+            lines.append(line)
+        return "\n".join(lines)
+
+
+def record_request(route, duration, bytes_sent=0, bytes_received=0, storage=False):
+    # type: (str, float, int, int, bool) -> None
+    """Attributes a request of the current thread to its operation, if profiling."""
+    context = current_context()
+    if context is not None:
+        context.profile._record(
+            context.invocation, route, duration, bytes_sent, bytes_received, storage
+        )
+
+
+def record_storage_response(response, *args, **kwargs):
+    # pylint: disable=unused-argument
+    """Response hook of the storage session, attributing transfers if profiling."""
+    if current_context() is None:
+        return response
+    request = response.request
+    body = request.body if request is not None else None
+    record_request(
+        "{} storage".format(request.method if request is not None else "GET"),
+        response.elapsed.total_seconds(),
+        bytes_sent=len(body) if isinstance(body, (bytes, str)) else 0,
+        bytes_received=int(response.headers.get("content-length") or 0),
+        storage=True,
+    )
+    return response
+
+
+def _profiled_generator(context, generator):
+    # type: (_Context, Iterator[Any]) -> Iterator[Any]
+    """Runs each step of generator in context, finishing its operation at the end."""
+    try:
+        while True:
+            try:
+                item = run_in_context(context, next, generator)
+            except StopIteration:
+                return
+            yield item
+    finally:
+        context.profile._finish(context.invocation)
+
+
+def profiled(function):
+    # type: (Callable) -> Callable
+    """Decorates a method as an operation of the profiler.
+
+    The operation is named after the class of the object and the method. Calls
+    made from within another operation are attributed to that one. Generators
+    returned by the method are attributed to the operation while they run.
+    """
+
+    @functools.wraps(function)
+    def wrapper(self, *args, **kwargs):
+        context = current_context()
+        if context is None or context.invocation is not None:
+            return function(self, *args, **kwargs)
+
+        profile = context.profile
+        invocation = profile._start(
+            "{}.{}".format(type(self).__name__, function.__name__)
+        )
+        operation_context = _Context(profile, invocation)
+        try:
+            result = run_in_context(operation_context, function, self, *args, **kwargs)
+        except BaseException:
+            profile._finish(invocation)
+            raise
+        if isinstance(result, GeneratorType):
+            return _profiled_generator(operation_context, result)
+        profile._finish(invocation)
+        return result
+
+    return wrapper
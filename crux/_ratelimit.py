@@ -0,0 +1,212 @@
+"""Module contains the adaptive rate limiter shared by the requests of a session."""
+
+import calendar
+from email.utils import parsedate_tz
+import threading
+import time
+from typing import Mapping, Optional  # noqa: F401
+
+from crux._utils import create_logger
+
+
+log = create_logger(__name__)
+
+# Responses telling the client to slow down. 503 only counts with Retry-After.
+THROTTLE_STATUS_CODES = frozenset((429, 503))
+
+# Lowest rate, in requests per second, throttling responses reduce the rate to.
+DEFAULT_MIN_RATE = 1.0
+
+# Factor by which a throttling response reduces the rate.
+DEFAULT_RATE_DECREASE = 0.5
+
+# Requests per second added to the rate each second without throttling.
+DEFAULT_RATE_INCREASE = 1.0
+
+# Throttling responses within this many seconds of a rate reduction were caused
+# by requests sent before it, so they don't reduce the rate again.
+_DECREASE_INTERVAL = 1.0
+
+
+def retry_after_seconds(value):
+    # type: (Optional[str]) -> Optional[float]
+    """Returns the seconds to wait from a Retry-After header value.
+
+    Args:
+        value (str): Number of seconds or an HTTP date, or None.
+
+    Returns:
+        float: Seconds to wait, or None if value is missing or invalid.
+    """
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        parsed = parsedate_tz(value)
+        if parsed is None:
+            return None
+        timestamp = calendar.timegm(parsed[:9]) - (parsed[9] or 0)
+        return max(0.0, timestamp - time.time())
+
+
+class RateLimiter(object):
+    """Thread-safe token bucket whose rate adapts to throttling responses.
+
+    Each request takes a token, tokens are added at rate per second up to burst.
+    Without a max_rate the bucket starts unlimited. A 429 response, or a 503 with
+    Retry-After, multiplies the rate by the decrease factor, starting from the
+    measured request rate when unlimited, and Retry-After holds every request
+    until it has passed. Each second without throttling adds increase to the rate,
+    up to max_rate.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        name,  # type: str
+        max_rate=None,  # type: Optional[float]
+        adaptive=True,  # type: bool
+        min_rate=DEFAULT_MIN_RATE,  # type: float
+        decrease=DEFAULT_RATE_DECREASE,  # type: float
+        increase=DEFAULT_RATE_INCREASE,  # type: float
+    ):
+        # type: (...) -> None
+        """
+        Args:
+            name (str): Name of the traffic limited, used in logs.
+            max_rate (float): Maximum requests per second. Defaults to None, which
+                is unlimited until throttled.
+            adaptive (bool): True to adjust the rate after throttling responses.
+                Defaults to True.
+            min_rate (float): Lowest rate throttling reduces the rate to.
+                Defaults to 1.
+            decrease (float): Factor throttling multiplies the rate by.
+                Defaults to 0.5.
+            increase (float): Requests per second added to the rate each second
+                without throttling. Defaults to 1.
+        """
+        self.name = name
+        self.max_rate = max_rate
+        self.adaptive = adaptive
+        self.min_rate = min_rate
+        self.decrease = decrease
+        self.increase = increase
+        self._lock = threading.Lock()
+        now = time.time()
+        self._rate = max_rate  # type: Optional[float]
+        self._tokens = self._burst()
+        self._refilled_at = now
+        self._paused_until = 0.0
+        self._decreased_at = 0.0
+        self._increased_at = now
+        self._window_start = now
+        self._window_count = 0
+        self._measured_rate = 0.0
+
+    @property
+    def rate(self):
+        # type: () -> Optional[float]
+        """float: Current requests per second, None if unlimited."""
+        return self._rate
+
+    def _burst(self):
+        # type: () -> float
+        return max(1.0, self._rate or 1.0)
+
+    def _count_request(self, now):
+        # type: (float) -> None
+        elapsed = now - self._window_start
+        if elapsed >= 1.0:
+            self._measured_rate = self._window_count / elapsed
+            self._window_start = now
+            self._window_count = 0
+        self._window_count += 1
+
+    def _wait_time(self, now):
+        # type: (float) -> float
+        """Takes a token and returns 0, or returns how long to wait for one."""
+        if now < self._paused_until:
+            return self._paused_until - now
+        if self._rate is None:
+            return 0.0
+        self._tokens = min(
+            self._burst(), self._tokens + (now - self._refilled_at) * self._rate
+        )
+        self._refilled_at = now
+        if self._tokens >= 1.0:
+            self._tokens -= 1.0
+            return 0.0
+        return (1.0 - self._tokens) / self._rate
+
+    def acquire(self):
+        # type: () -> None
+        """Blocks until the next request may be sent."""
+        while True:
+            with self._lock:
+                now = time.time()
+                wait = self._wait_time(now)
+                if wait <= 0:
+                    self._count_request(now)
+                    return
+            time.sleep(wait)
+
+    def pause(self, seconds):
+        # type: (float) -> None
+        """Holds every request for seconds."""
+        with self._lock:
+            self._paused_until = max(self._paused_until, time.time() + seconds)
+
+    def on_response(self, status_code, headers):
+        # type: (int, Mapping[str, str]) -> None
+        """Adjusts the rate after a response.
+
+        Args:
+            status_code (int): Response status code.
+            headers (dict): Response headers.
+        """
+        retry_after = retry_after_seconds(headers.get("Retry-After"))
+        throttled = status_code == 429 or (status_code == 503 and retry_after)
+        if throttled:
+            self._on_throttle(status_code, retry_after)
+        elif status_code < 400 and self.adaptive and self._rate is not None:
+            with self._lock:
+                now = time.time()
+                ceiling = self.max_rate if self.max_rate is not None else float("inf")
+                self._rate = min(
+                    ceiling, self._rate + self.increase * (now - self._increased_at)
+                )
+                self._increased_at = now
+
+    def _on_throttle(self, status_code, retry_after):
+        # type: (int, Optional[float]) -> None
+        with self._lock:
+            now = time.time()
+            if retry_after:
+                self._paused_until = max(self._paused_until, now + retry_after)
+            if not self.adaptive or now - self._decreased_at < _DECREASE_INTERVAL:
+                return
+            current = self._rate
+            if current is None:
+                window_rate = self._window_count / max(now - self._window_start, 1.0)
+                current = max(self._measured_rate, window_rate)
+            self._rate = max(self.min_rate, current * self.decrease)
+            self._tokens = min(self._tokens, 1.0)
+            self._refilled_at = now
+            self._decreased_at = self._increased_at = now
+        log.debug(
+            "%s traffic throttled with %s, rate set to %.1f requests per second",
+            self.name,
+            status_code,
+            self._rate,
+        )
+
+    def __deepcopy__(self, memo):
+        # The lock can't be copied, and the copy adapts on its own.
+        return RateLimiter(
+            self.name,
+            max_rate=self.max_rate,
+            adaptive=self.adaptive,
+            min_rate=self.min_rate,
+            decrease=self.decrease,
+            increase=self.increase,
+        )
@@ -0,0 +1,281 @@
+"""Module records API and storage traffic to JSONL and replays it without network."""
+
+from collections import defaultdict, deque
+import hashlib
+import io
+import json
+import threading
+import time
+from typing import (  # noqa: F401
+    Any,
+    DefaultDict,
+    Deque,
+    Dict,
+    IO,
+    List,
+    Optional,
+    Text,
+    Tuple,
+)
+
+from requests.adapters import BaseAdapter
+from requests.exceptions import ConnectionError as RequestsConnectionError
+from requests.models import PreparedRequest, Response  # noqa: F401
+from requests.structures import CaseInsensitiveDict
+from requests.utils import get_encoding_from_headers
+
+from crux._compat import parse_qs, unquote, urlsplit
+from crux._metrics import route_template
+from crux._utils import create_logger
+
+
+log = create_logger(__name__)
+
+# Response headers which describe the encoded body on the wire, not the decoded
+# body which is recorded.
+_WIRE_HEADERS = ("content-encoding", "content-length", "transfer-encoding")
+
+
+class ReplayMissError(RequestsConnectionError):
+    """Raised when a replayed request has no recorded response."""
+
+
+def body_digest(body):
+    # type: (Any) -> Optional[str]
+    """Returns the SHA-1 of a request body, None if it is empty or a stream."""
+    if not body or not isinstance(body, (bytes, str, type(u""))):
+        return None
+    if not isinstance(body, bytes):
+        body = body.encode("utf-8")
+    return hashlib.sha1(body).hexdigest()
+
+
+def _request_key(method, url, digest=None):
+    # type: (Text, Text, Optional[str]) -> Tuple
+    """Returns the key matching a request to its recordings, ignoring the host."""
+    parts = urlsplit(url)
+    query = tuple(
+        sorted(
+            (key, value)
+            for key, values in parse_qs(parts.query, keep_blank_values=True).items()
+            for value in values
+        )
+    )
+    return method.upper(), parts.path, query, digest
+
+
+class Recorder(object):
+    """Appends a JSONL line for each response of the API and storage sessions.
+
+    Each line has the session ("api" or "storage"), method, URL, route, query
+    parameters, status code, headers, duration and time of the response. Bodies of
+    API responses, and of JSON storage responses, are recorded when they aren't
+    streamed. Other bodies, like file content, are recorded by size only.
+    """
+
+    def __init__(self, path, api_prefixes=None):
+        # type: (str, Optional[List[Tuple[str, Optional[str]]]]) -> None
+        """
+        Args:
+            path (str): JSONL file the recording is appended to.
+            api_prefixes (list): (URL prefix, API version) pairs, used to give API
+                requests the route of their API path. Defaults to None.
+        """
+        self.path = path
+        self.api_prefixes = [
+            (prefix.strip("/"), version) for prefix, version in api_prefixes or []
+        ]
+        self._lock = threading.Lock()
+        # Kept open for the life of the recorder, closed by close().
+        self._file = io.open(  # pylint: disable=bad-option-value,consider-using-with
+            path, "a", encoding="utf-8"
+        )  # type: Optional[IO]
+
+    def _route(self, url):
+        # type: (Text) -> str
+        path = unquote(urlsplit(url).path).strip("/")
+        for prefix, version in self.api_prefixes:
+            if prefix and (path + "/").startswith(prefix + "/"):
+                start = len(prefix)
+                segments = [s for s in path[start:].split("/") if s]
+                return route_template(([version] if version else []) + segments)
+        return route_template([s for s in path.split("/") if s])
+
+    def api_hook(self, response, *_args, **kwargs):
+        """Response hook of the API session."""
+        self.record("api", response, stream=kwargs.get("stream", False))
+        return response
+
+    def storage_hook(self, response, *_args, **kwargs):
+        """Response hook of the storage session."""
+        self.record("storage", response, stream=kwargs.get("stream", False))
+        return response
+
+    def record(self, session, response, stream=False):
+        # type: (str, Response, bool) -> None
+        """Appends the recording of response.
+
+        Args:
+            session (str): "api" or "storage".
+            response (requests.Response): Response, whose body is read unless
+                stream is set.
+            stream (bool): True if the body of the response is streamed, in which
+                case only its Content-Length is recorded. Defaults to False.
+        """
+        request = response.request
+        url = response.url  # type: Text
+        method = "GET"  # type: Text
+        if request is not None and request.url and request.method:
+            url, method = request.url, request.method
+        content_type = response.headers.get("content-type") or ""
+        body = None
+        if stream:
+            body_size = int(response.headers.get("content-length") or 0)
+        else:
+            content = response.content or b""
+            body_size = len(content)
+            if session == "api" or "json" in content_type:
+                body = content.decode("utf-8", "replace")
+        entry = {
+            "time": time.time(),
+            "session": session,
+            "method": method,
+            "url": url,
+            "route": "storage" if session == "storage" else self._route(url),
+            "params": dict(
+                (key, values[0] if len(values) == 1 else values)
+                for key, values in parse_qs(
+                    urlsplit(url).query, keep_blank_values=True
+                ).items()
+            ),
+            "status": response.status_code,
+            "headers": dict(
+                (key, value)
+                for key, value in response.headers.items()
+                if key.lower() not in _WIRE_HEADERS
+            ),
+            "duration": response.elapsed.total_seconds(),
+            "request_body_sha1": body_digest(
+                request.body if request is not None else None
+            ),
+            "body": body,
+            "body_size": body_size,
+        }
+        line = json.dumps(entry, sort_keys=True)
+        with self._lock:
+            if self._file is not None:
+                self._file.write(line + u"\n")
+                self._file.flush()
+
+    def close(self):
+        # type: () -> None
+        """Closes the recording file."""
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+    def __deepcopy__(self, memo):
+        # Copies of a connection append to the same recording.
+        return self
+
+
+def load_recording(path):
+    # type: (str) -> List[Dict[str, Any]]
+    """Reads the entries of a JSONL recording."""
+    with io.open(path, encoding="utf-8") as recording:
+        return [json.loads(line) for line in recording if line.strip()]
+
+
+class ReplayAdapter(BaseAdapter):
+    """Transport adapter serving the responses of a recording, without network.
+
+    Requests are matched to recordings by method, URL path, query and body,
+    ignoring the host, falling back to method, path and query, then to method and
+    path. Recordings of a request are served in order, the last one being served
+    again once the others are used up.
+    """
+
+    def __init__(self, path, latency_scale=None):
+        # type: (str, Optional[float]) -> None
+        """
+        Args:
+            path (str): JSONL recording written by Recorder.
+            latency_scale (float): Factor applied to the recorded duration of each
+                response, which is slept before returning it. Defaults to None,
+                which returns responses immediately.
+        """
+        super(ReplayAdapter, self).__init__()
+        self.path = path
+        self.latency_scale = latency_scale
+        self._lock = threading.Lock()
+        # Recordings keyed by (method, path, query, body digest), and by the
+        # prefixes of that key used when no recording matches the whole key.
+        self._responses = defaultdict(deque)  # type: DefaultDict[Tuple, Deque[Dict]]
+        entries = load_recording(path)
+        for entry in entries:
+            key = _request_key(
+                entry["method"], entry["url"], entry.get("request_body_sha1")
+            )
+            for length in (4, 3, 2):
+                self._responses[key[:length]].append(entry)
+        log.debug("Loaded %s recorded responses from %s", len(entries), path)
+
+    def _next_entry(self, method, url, digest):
+        # type: (Text, Text, Optional[str]) -> Dict[str, Any]
+        key = _request_key(method, url, digest)
+        with self._lock:
+            for length in (4, 3, 2):
+                responses = self._responses.get(key[:length])
+                if not responses:
+                    continue
+                # Entries are in a deque for each length of their key, skip those
+                # already served through another one.
+                while len(responses) > 1 and responses[0].get("_served"):
+                    responses.popleft()
+                entry = responses.popleft() if len(responses) > 1 else responses[0]
+                entry["_served"] = True
+                return entry
+        raise ReplayMissError(
+            "No recorded response for {} {} in {}".format(method, url, self.path)
+        )
+
+    def send(  # pylint: disable=too-many-arguments
+        self, request, stream=False, timeout=None, verify=True, cert=None, proxies=None
+    ):
+        # type: (PreparedRequest, bool, Any, Any, Any, Any) -> Response
+        """Returns the recorded response of request."""
+        # Requests prepared by a session always have a method and URL.
+        assert request.method is not None and request.url is not None
+        entry = self._next_entry(request.method, request.url, body_digest(request.body))
+
+        if self.latency_scale:
+            time.sleep(entry["duration"] * self.latency_scale)
+
+        if entry["body"] is not None:
+            content = entry["body"].encode("utf-8")
+        else:
+            content = b"\0" * entry["body_size"]
+
+        response = Response()
+        response.status_code = entry["status"]
+        response.headers = CaseInsensitiveDict(entry["headers"])
+        response.headers["content-length"] = str(len(content))
+        response.encoding = get_encoding_from_headers(response.headers)
+        response.raw = io.BytesIO(content)
+        response._content = content  # pylint: disable=protected-access
+        # The Response stubs don't declare the attributes requests adapters set,
+        # and type its URL as str where requests may use unicode.
+        response._content_consumed = True  # type: ignore # pylint: disable=protected-access
+        response.url = request.url  # type: ignore
+        response.request = request
+        response.connection = self  # type: ignore
+        return response
+
+    def close(self):
+        # type: () -> None
+        pass
+
+    def __deepcopy__(self, memo):
+        # Copies of a connection replay the same recording.
+        return self
@@ -0,0 +1,162 @@
+"""Module contains the in-memory cache of signed URLs of file resources."""
+
+import calendar
+from collections import OrderedDict
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple  # noqa: F401
+
+from crux._compat import parse_qs, urlsplit
+from crux._utils import create_logger, parse_datetime
+
+
+log = create_logger(__name__)
+
+DEFAULT_SIGNED_URL_CACHE_SIZE = 1024
+
+# Lifetime of signed URLs which don't say when they expire.
+DEFAULT_SIGNED_URL_TTL = 300
+
+# Signed URLs are dropped this many seconds before they expire, so a transfer
+# doesn't start with a URL which expires before its first request.
+SIGNED_URL_EXPIRY_MARGIN = 30
+
+# Response fields the API may use for the expiry time of a signed URL.
+_EXPIRY_FIELDS = ("expiresAt", "expiration", "expires")
+
+
+def _parse_timestamp(value):
+    # type: (Any) -> float
+    """Returns seconds since the epoch from an epoch number or a datetime string."""
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        timestamp = parse_datetime(value)
+        if timestamp.tzinfo is None:
+            return calendar.timegm(timestamp.timetuple())
+        return calendar.timegm(timestamp.utctimetuple())
+
+
+def signed_url_expiry(url, response_json=None):
+    # type: (str, Optional[Dict[str, Any]]) -> Optional[float]
+    """Returns when a signed URL expires, in seconds since the epoch.
+
+    The expiry is read from the signed URL response of the API if it has one,
+    otherwise from the query of V2 or V4 signed URLs of Google Cloud Storage and S3.
+
+    Args:
+        url (str): Signed URL.
+        response_json (dict): API response the signed URL came from.
+            Defaults to None.
+
+    Returns:
+        float: Expiry time, or None if it is unknown.
+    """
+    try:
+        for field in _EXPIRY_FIELDS:
+            if response_json and response_json.get(field):
+                return _parse_timestamp(response_json[field])
+
+        query = dict(
+            (key.lower(), values[0])
+            for key, values in parse_qs(urlsplit(url).query).items()
+        )
+
+        for prefix in ("x-goog-", "x-amz-"):
+            if prefix + "date" in query and prefix + "expires" in query:
+                signed_at = calendar.timegm(
+                    time.strptime(query[prefix + "date"], "%Y%m%dT%H%M%SZ")
+                )
+                return signed_at + float(query[prefix + "expires"])
+
+        if "expires" in query:
+            return float(query["expires"])
+    except (ValueError, OverflowError) as err:
+        log.debug("Unable to parse expiry of signed url: %s", err)
+
+    return None
+
+
+class SignedURLCache(object):
+    """Thread-safe cache of signed URLs, keyed by resource ID.
+
+    Entries expire with the signed URL they hold. Transfers which find a cached URL
+    rejected by storage invalidate it and fetch a new one.
+    """
+
+    def __init__(self, max_entries=DEFAULT_SIGNED_URL_CACHE_SIZE):
+        # type: (int) -> None
+        """
+        Args:
+            max_entries (int): Maximum number of signed URLs kept, the least recently
+                used are evicted first. Defaults to 1024.
+        """
+        self.max_entries = max_entries
+        self._lock = threading.Lock()
+        self._entries = OrderedDict()  # type: OrderedDict[str, Tuple[str, float]]
+
+    def get(self, resource_id):
+        # type: (str) -> Optional[str]
+        """Returns the cached signed URL of resource_id.
+
+        Returns:
+            str: Signed URL, or None if it is missing or expired.
+        """
+        with self._lock:
+            entry = self._entries.pop(resource_id, None)
+            if entry is None:
+                return None
+            url, expires_at = entry
+            if expires_at - SIGNED_URL_EXPIRY_MARGIN <= time.time():
+                log.debug("Cached signed url for resource %s has expired", resource_id)
+                return None
+            # Re-insert to mark it as the most recently used.
+            self._entries[resource_id] = entry
+            return url
+
+    def put(self, resource_id, url, expires_at=None):
+        # type: (str, str, Optional[float]) -> None
+        """Caches the signed URL of resource_id until expires_at.
+
+        Args:
+            resource_id (str): Resource ID.
+            url (str): Signed URL.
+            expires_at (float): Expiry time in seconds since the epoch. Defaults to
+                None, which keeps the URL for DEFAULT_SIGNED_URL_TTL seconds.
+        """
+        if expires_at is None:
+            expires_at = time.time() + DEFAULT_SIGNED_URL_TTL
+        with self._lock:
+            self._entries.pop(resource_id, None)
+            self._entries[resource_id] = (url, expires_at)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate(self, resource_id, url=None):
+        # type: (str, Optional[str]) -> None
+        """Drops the signed URL of resource_id.
+
+        Args:
+            resource_id (str): Resource ID.
+            url (str): Only drop the entry if it still holds this URL, so a URL
+                already refreshed by another thread is kept. Defaults to None.
+        """
+        with self._lock:
+            entry = self._entries.get(resource_id)
+            if entry is not None and (url is None or entry[0] == url):
+                del self._entries[resource_id]
+
+    def clear(self):
+        # type: () -> None
+        """Drops all signed URLs."""
+        with self._lock:
+            self._entries.clear()
+
+    def __len__(self):
+        # type: () -> int
+        with self._lock:
+            return len(self._entries)
+
+    def __deepcopy__(self, memo):
+        # The lock can't be copied, and signed URLs are cheap to fetch again.
+        return SignedURLCache(max_entries=self.max_entries)
@@ -0,0 +1,70 @@
+"""Module contains SingleFlight, which coalesces identical concurrent calls."""
+
+import threading
+from typing import Any, Callable, Dict, Hashable, Optional, Tuple  # noqa: F401
+
+
+class _Call(object):
+    """Outcome of a call, shared with the callers waiting for it."""
+
+    __slots__ = ("done", "result", "error")
+
+    def __init__(self):
+        # type: () -> None
+        self.done = threading.Event()
+        self.result = None  # type: Any
+        self.error = None  # type: Optional[BaseException]
+
+
+class SingleFlight(object):
+    """Runs one call at a time per key, sharing its outcome with concurrent callers.
+
+    A caller asking for a key which is already in flight waits for that call and
+    receives its result, or its exception, instead of making its own call.
+    """
+
+    def __init__(self):
+        # type: () -> None
+        self._lock = threading.Lock()
+        self._calls = {}  # type: Dict[Hashable, _Call]
+
+    def run(self, key, function):
+        # type: (Hashable, Callable[[], Any]) -> Tuple[Any, bool]
+        """Calls function, unless a call of key is already in flight.
+
+        Args:
+            key (hashable): Identifies calls with the same outcome.
+            function (callable): Makes the call, without arguments.
+
+        Returns:
+            tuple: Result of the call, and True if it was made by another caller.
+
+        Raises:
+            Exception: The exception raised by the call.
+        """
+        with self._lock:
+            call = self._calls.get(key)
+            shared = call is not None
+            if call is None:
+                call = self._calls[key] = _Call()
+
+        if shared:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result, True
+
+        try:
+            call.result = function()
+        except BaseException as err:
+            call.error = err
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result, False
+
+    def __deepcopy__(self, memo):
+        # Calls in flight belong to the original.
+        return SingleFlight()
@@ -1,23 +1,32 @@
 """Modules contains set of utility functions."""
 
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime  # noqa: F401 pylint: disable=unused-import
 import logging
 import posixpath
 import re
-from typing import List, Tuple  # noqa: F401
+import threading
+from typing import Any, Dict, Iterable, Iterator, List, Tuple  # noqa: F401
 
 from requests import Session
-from requests.adapters import HTTPAdapter
+from requests.adapters import DEFAULT_POOLBLOCK, DEFAULT_POOLSIZE, HTTPAdapter
 from requests.packages.urllib3.util.retry import (  # Dynamic load pylint: disable=import-error
     Retry,
 )
 
-from crux._compat import urllib_quote
+from crux._compat import queue, urllib_quote
+from crux._profile import current_context, run_in_context
 
 
 DEFAULT_CHUNK_SIZE = 10485760  # 10 MB
+DEFAULT_WORKERS = 4
 DELIVERY_ID_REGEX = re.compile(r"^[a-zA-Z0-9]+\.[0-9]+$")
 TRACE = 5
 
+# Statuses retried by the sessions of the API and of storage. 429 responses are
+# retried once their Retry-After has passed.
+RETRY_STATUS_CODES = (429, 500, 502, 503, 504, 520, 521, 522, 523, 524, 525, 527, 530)
+
 
 def quote(data):
     # type: (str) -> str
@@ -78,6 +87,110 @@ def valid_chunk_size(chunk_size):
     return not bool(chunk_size % 262144)  # 1024*256=262144
 
 
+def get_executor(max_workers=DEFAULT_WORKERS):
+    # type: (int) -> ThreadPoolExecutor
+    """Creates the thread pool used to run client requests concurrently.
+
+    Args:
+        max_workers (int): Maximum number of worker threads.
+            Defaults to DEFAULT_WORKERS.
+
+    Returns:
+        concurrent.futures.ThreadPoolExecutor: Thread pool executor.
+
+    Raises:
+        ValueError: If max_workers is less than 1.
+    """
+    if max_workers is None or max_workers < 1:
+        raise ValueError("max_workers should be greater than 0")
+
+    return _ContextThreadPoolExecutor(max_workers=max_workers)
+
+
+class _ContextThreadPoolExecutor(ThreadPoolExecutor):
+    """Thread pool running tasks in the profiling context of the submitting thread."""
+
+    def submit(self, fn, *args, **kwargs):  # pylint: disable=arguments-differ
+        context = current_context()
+        if context is None:
+            return super(_ContextThreadPoolExecutor, self).submit(fn, *args, **kwargs)
+        return super(_ContextThreadPoolExecutor, self).submit(
+            run_in_context, context, fn, *args, **kwargs
+        )
+
+
+class _PrefetchFailure(object):
+    """Wraps an exception raised while prefetching, to re-raise it in the consumer."""
+
+    def __init__(self, error):
+        # type: (BaseException) -> None
+        self.error = error
+
+
+_PREFETCH_END = object()
+
+
+def prefetched(iterable, depth):
+    # type: (Iterable[Any], int) -> Iterator[Any]
+    """Iterates over iterable on a background thread, staying ahead of the consumer.
+
+    Args:
+        iterable (iterable): Iterable whose items are slow to produce,
+            for example pages fetched from the API.
+        depth (int): Maximum number of items produced ahead of the consumer,
+            including the one being produced.
+
+    Yields:
+        Items of iterable, in order. Exceptions raised by iterable are re-raised.
+
+    Raises:
+        ValueError: If depth is less than 1.
+    """
+    if depth < 1:
+        raise ValueError("depth should be greater than 0")
+
+    items = queue.Queue()  # type: queue.Queue
+    slots = threading.Semaphore(depth)
+    stopped = threading.Event()
+
+    def produce():
+        iterator = iter(iterable)
+        while True:
+            slots.acquire()
+            if stopped.is_set():
+                return
+            try:
+                item = next(iterator)
+            except StopIteration:
+                items.put(_PREFETCH_END)
+                return
+            except BaseException as err:  # pylint: disable=broad-except
+                items.put(_PrefetchFailure(err))
+                return
+            items.put(item)
+
+    # The producer makes its requests in the profiling context of the consumer.
+    producer = threading.Thread(
+        target=run_in_context, args=(current_context(), produce), name="crux-prefetch"
+    )
+    producer.daemon = True
+    producer.start()
+
+    try:
+        while True:
+            item = items.get()
+            if item is _PREFETCH_END:
+                return
+            if isinstance(item, _PrefetchFailure):
+                raise item.error
+            slots.release()
+            yield item
+    finally:
+        # Wake up the producer if it waits for a slot, so it can exit.
+        stopped.set()
+        slots.release()
+
+
 def split_posixpath_filename_dirpath(path):
     # type: (str) -> Tuple[str, str]
     """Split a POSIX path into file name and directory path.
@@ -99,6 +212,25 @@ def split_posixpath_filename_dirpath(path):
     return filename, dirpath
 
 
+def parse_datetime(value, dayfirst=False, yearfirst=False):
+    # type: (str, bool, bool) -> datetime
+    """Parses a date string with dateutil, which is only imported when needed.
+
+    Args:
+        value (str): Date string in any format dateutil understands.
+        dayfirst (bool): Whether ambiguous dates start with the day.
+            Defaults to False.
+        yearfirst (bool): Whether ambiguous dates start with the year.
+            Defaults to False.
+
+    Returns:
+        datetime.datetime: Parsed date.
+    """
+    from dateutil import parser  # pylint: disable=import-outside-toplevel
+
+    return parser.parse(value, dayfirst=dayfirst, yearfirst=yearfirst)
+
+
 def str_to_bool(string):
     # type (str) -> bool
     """Converts string to boolean value.
@@ -149,13 +281,79 @@ class Headers(dict):
         return super(Headers, self).get(key.lower())
 
 
-def get_session(session_class=Session, retries=None, proxies=None):
-    # type (Type[Session], requests.packages.urllib3.util.retry.Retry, Dict) -> Session
+class RateLimitedRetry(Retry):
+    """Retry whose retries wait for the rate limiter of the session.
+
+    Throttling responses retried by urllib3 adjust the limiter before the retry.
+    """
+
+    def __init__(self, *args, **kwargs):
+        self.rate_limiter = kwargs.pop("rate_limiter", None)
+        super(RateLimitedRetry, self).__init__(*args, **kwargs)
+
+    def new(self, **kw):
+        """Returns a copy of the retry for the next attempt, with the same limiter."""
+        retry = super(RateLimitedRetry, self).new(**kw)
+        retry.rate_limiter = self.rate_limiter
+        return retry
+
+    def increment(self, method=None, url=None, response=None, error=None, **kwargs):
+        """Counts an attempt, adjusting the limiter to its response first."""
+        if self.rate_limiter is not None and response is not None:
+            self.rate_limiter.on_response(response.status, response.headers)
+        return super(RateLimitedRetry, self).increment(
+            method=method, url=url, response=response, error=error, **kwargs
+        )
+
+    def sleep(self, response=None):
+        """Waits for the backoff, then for the limiter to allow the retry."""
+        super(RateLimitedRetry, self).sleep(response)
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire()
+
+
+class RateLimitedAdapter(HTTPAdapter):
+    """HTTPAdapter sending each request when its rate limiter allows."""
+
+    __attrs__ = HTTPAdapter.__attrs__ + ["rate_limiter"]
+
+    def __init__(self, rate_limiter=None, **kwargs):
+        self.rate_limiter = rate_limiter
+        super(RateLimitedAdapter, self).__init__(**kwargs)
+
+    def send(self, request, **kwargs):  # pylint: disable=arguments-differ
+        if self.rate_limiter is None:
+            return super(RateLimitedAdapter, self).send(request, **kwargs)
+        self.rate_limiter.acquire()
+        response = super(RateLimitedAdapter, self).send(request, **kwargs)
+        self.rate_limiter.on_response(response.status_code, response.headers)
+        return response
+
+
+def get_session(  # pylint: disable=too-many-arguments
+    session_class=Session,
+    retries=None,
+    proxies=None,
+    pool_maxsize=DEFAULT_POOLSIZE,
+    pool_connections=DEFAULT_POOLSIZE,
+    pool_block=DEFAULT_POOLBLOCK,
+    rate_limiter=None,
+):
+    # type (Type[Session], Retry, Dict, int, int, bool, Any) -> Session
     """Gets the session object.
     Args:
         session_class (Session): Session class. Defaults to Session.
         retries (requests.packages.urllib3.util.retry.Retry): Retry object.
         proxies (dict): Dictionary of Proxy urls.
+        pool_maxsize (int): Maximum number of keep-alive connections per host.
+            Defaults to requests' DEFAULT_POOLSIZE.
+        pool_connections (int): Number of hosts whose connection pools are kept.
+            Defaults to requests' DEFAULT_POOLSIZE.
+        pool_block (bool): True to wait for a free connection when a pool is full,
+            False to open a connection which is discarded after the request.
+            Defaults to requests' DEFAULT_POOLBLOCK.
+        rate_limiter (crux._ratelimit.RateLimiter): Limiter the requests and their
+            retries wait for. Defaults to None.
 
     Returns:
         requests.Session: Session Object.
@@ -169,38 +367,110 @@ def get_session(session_class=Session, retries=None, proxies=None):
     session = session_class()
 
     if retries is None:
-        retries = Retry(
+        retries = RateLimitedRetry(
             total=10,
             backoff_factor=1,
             connect=6,
             read=3,
-            status_forcelist=[
-                429,
-                500,
-                502,
-                503,
-                504,
-                520,
-                521,
-                522,
-                523,
-                524,
-                525,
-                527,
-                530,
-            ],
+            status_forcelist=RETRY_STATUS_CODES,
             method_whitelist=False,
         )
 
+    if retries and rate_limiter is not None and isinstance(retries, RateLimitedRetry):
+        retries = retries.new()
+        retries.rate_limiter = rate_limiter
+
     if retries:
-        session.mount("http://", HTTPAdapter(max_retries=retries))
-        session.mount("https://", HTTPAdapter(max_retries=retries))
+        for prefix in ("http://", "https://"):
+            session.mount(
+                prefix,
+                RateLimitedAdapter(
+                    rate_limiter=rate_limiter,
+                    max_retries=retries,
+                    pool_connections=pool_connections,
+                    pool_maxsize=pool_maxsize,
+                    pool_block=pool_block,
+                ),
+            )
 
     session.proxies = proxies if proxies else {}
 
     return session
 
 
+def get_shared_session(source, session_class=Session):
+    # type (Session, Type[Session]) -> Session
+    """Gets a session sending its requests through the connection pools of source.
+
+    The returned session can have its own headers, while reusing the keep-alive
+    connections of source. It must not be closed, as that would close the pools
+    of source.
+
+    Args:
+        source (requests.Session): Session whose adapters and proxies are shared.
+        session_class (Session): Session class. Defaults to Session.
+
+    Returns:
+        requests.Session: Session Object.
+
+    Raises:
+        TypeError: If session_class is not subclass of requests.Session.
+    """
+    if not issubclass(session_class, Session):
+        raise TypeError("session_class should be subclass of requests.Session")
+
+    session = session_class()
+    session.adapters = source.adapters
+    session.hooks["response"] = list(source.hooks["response"])
+    session.proxies = source.proxies
+
+    return session
+
+
+def get_pool_stats(session):
+    # type: (Session) -> List[Dict[str, Any]]
+    """Gets the usage counters of the connection pools of a session.
+
+    Args:
+        session (requests.Session): Session whose pools are inspected.
+
+    Returns:
+        list (:obj:`dict`): One dictionary per host pool, with its scheme, host,
+            port and maxsize, the number of requests sent through it, of
+            connections created and reused, and of idle connections kept.
+    """
+    stats = []
+    seen = set()
+
+    for adapter in session.adapters.values():
+        if not isinstance(adapter, HTTPAdapter):
+            continue
+        managers = [adapter.poolmanager] + list(adapter.proxy_manager.values())
+        for manager in managers:
+            for key in manager.pools.keys():
+                pool = manager.pools.get(key)
+                if pool is None or id(pool) in seen:
+                    continue
+                seen.add(id(pool))
+                idle = pool.pool.qsize() if pool.pool is not None else 0
+                stats.append(
+                    {
+                        "scheme": pool.scheme,
+                        "host": pool.host,
+                        "port": pool.port,
+                        "maxsize": pool.pool.maxsize if pool.pool is not None else 0,
+                        "requests": pool.num_requests,
+                        "connections_created": pool.num_connections,
+                        "connections_reused": max(
+                            pool.num_requests - pool.num_connections, 0
+                        ),
+                        "idle_connections": idle,
+                    }
+                )
+
+    return stats
+
+
 # google.resumable_media.requests.ResumableUpload is only compatible with JSON API endpoint.
 # Signed URL uses XML API Endpoint, which requires setting specific headers.
 # ResumableUploadSingedSession is added to make google.resumable_media.requests.ResumableUpload
@@ -0,0 +1,863 @@
+"""Module contains the asyncio client, AsyncCrux, and its models.
+
+It requires Python 3.6 or later and aiohttp, which is installed with the aio extra:
+``pip install crux[aio]``.
+"""
+
+import asyncio
+from typing import (  # noqa: F401
+    Any,
+    AsyncIterator,
+    Dict,
+    List,
+    MutableMapping,
+    Optional,
+    Text,
+)
+
+from requests.adapters import HTTPAdapter
+from requests.packages.urllib3.util.retry import (  # Dynamic load pylint: disable=import-error
+    Retry,
+)
+
+from crux._client import (
+    api_error,
+    build_api_headers,
+    build_api_url,
+    deserialize,
+    SUCCESS_STATUS_CODES,
+)
+from crux._compat import unicode, urlsplit
+from crux._config import CruxConfig
+from crux._signed_urls import SignedURLCache
+from crux._utils import (
+    create_logger,
+    DEFAULT_CHUNK_SIZE,
+    DEFAULT_WORKERS,
+    Headers,
+    valid_chunk_size,
+)
+from crux.exceptions import (
+    CruxAPIError,
+    CruxClientConnectionError,
+    CruxClientHTTPError,
+    CruxClientTimeout,
+    CruxClientTooManyRedirects,
+)
+from crux.models import Dataset, File, Identity
+from crux.models._factory import (
+    DEFAULT_BATCH_SIZE,
+    missing_resource_ids,
+    order_batch_response,
+    split_batches,
+)
+from crux.models.dataset import _FilesRangeSelection, _page_limit
+from crux.models.file import SIGNED_URL_EXPIRED_STATUS_CODES
+from crux.models.resource import MediaType
+
+try:
+    import aiohttp
+except ImportError:  # pragma: no cover
+    raise ImportError(
+        "crux.aio requires aiohttp, install it with: pip install crux[aio]"
+    )
+
+
+log = create_logger(__name__)
+
+# Maximum number of connections open at once by an AsyncCruxClient.
+DEFAULT_CONNECTION_LIMIT = 100
+
+
+class AsyncCruxClient(object):
+    """Crux HTTP REST client for asyncio.
+
+    Requests are sent through one aiohttp session, created on first use inside the
+    running event loop. They are retried like those of the synchronous client,
+    following the Retry of its session.
+    """
+
+    def __init__(self, crux_config, connection_limit=DEFAULT_CONNECTION_LIMIT):
+        # type: (CruxConfig, int) -> None
+        """
+        Args:
+            crux_config (CruxConfig): Configuration of the client.
+            connection_limit (int): Maximum number of connections open at once,
+                0 for no limit. Defaults to DEFAULT_CONNECTION_LIMIT.
+        """
+        if crux_config is None:
+            log.debug("crux_config is None, initializing CruxConfig object")
+            self.crux_config = CruxConfig()  # type: CruxConfig
+        else:
+            self.crux_config = crux_config
+
+        self.connection_limit = connection_limit
+        self._session = None  # type: Optional[aiohttp.ClientSession]
+
+        # Delivery resources are fetched from the API, the on-disk catalog is
+        # only used by the synchronous client.
+        self.delivery_catalog = None
+
+        if self.crux_config.signed_url_cache_size > 0:
+            self.signed_url_cache = SignedURLCache(
+                max_entries=self.crux_config.signed_url_cache_size
+            )  # type: Optional[SignedURLCache]
+        else:
+            self.signed_url_cache = None
+
+    @property
+    def session(self):
+        # type: () -> aiohttp.ClientSession
+        """aiohttp.ClientSession: Session shared by API and storage requests."""
+        if self._session is None or self._session.closed:
+            # Like a blocking requests pool, pool_block caps the connections per host.
+            limit_per_host = (
+                self.crux_config.pool_maxsize if self.crux_config.pool_block else 0
+            )
+            connector = aiohttp.TCPConnector(
+                limit=self.connection_limit, limit_per_host=limit_per_host
+            )
+            # trust_env honours HTTP_PROXY and HTTPS_PROXY, as requests does.
+            self._session = aiohttp.ClientSession(connector=connector, trust_env=True)
+        return self._session
+
+    def _retries(self, url):
+        # type: (str) -> Retry
+        """Returns the Retry which the synchronous session uses for url."""
+        try:
+            adapter = self.crux_config.session.get_adapter(url)
+        except Exception:  # pylint: disable=broad-except
+            return Retry(0)
+        if isinstance(adapter, HTTPAdapter):
+            return adapter.max_retries
+        return Retry(0)
+
+    async def request(  # pylint: disable=too-many-arguments
+        self,
+        method,  # type: str
+        url,  # type: str
+        headers=None,  # type: MutableMapping[Text, Text]
+        params=None,  # type: Dict[Any, Any]
+        json=None,  # type: Dict[Any, Any]
+        data=None,  # type: Any
+        stream=False,  # type: bool
+        connect_timeout=9.5,  # type: float
+        read_timeout=60,  # type: float
+    ):
+        # type: (...) -> aiohttp.ClientResponse
+        """Sends a request, retrying failed connections and retryable statuses.
+
+        Args:
+            method (str): REST method name.
+            url (str): Request URL.
+            headers (dict): Request headers. Defaults to None.
+            params (dict): Data to be passed in query string. Defaults to None.
+            json (dict): Body data to be passed with request. Defaults to None.
+            data: Request body. Defaults to None.
+            stream (bool): False to read the body before returning, True to leave it
+                to the caller, which has to release the response. Defaults to False.
+            connect_timeout (float): Connect timeout in seconds. Defaults to 9.5.
+            read_timeout (float): Read timeout in seconds. Defaults to 60.
+
+        Returns:
+            aiohttp.ClientResponse: Response object.
+
+        Raises:
+            CruxClientHTTPError: If there is HTTP related error.
+            CruxClientConnectionError: If there is a connection, SSL or Proxy error.
+            CruxClientTimeout: If there is timout related error.
+            CruxClientTooManyRedirects: If there are too many redirects.
+        """
+        retries = self._retries(url)
+        max_retries = retries.total or 0
+        max_connect_retries = min(
+            max_retries, max_retries if retries.connect is None else retries.connect
+        )
+        proxy = self.crux_config.proxies.get(urlsplit(url).scheme)
+        timeout = aiohttp.ClientTimeout(
+            sock_connect=connect_timeout, sock_read=read_timeout
+        )
+        if params:
+            params = _query_params(params)
+
+        attempt = 0
+        while True:
+            try:
+                response = await self.session.request(
+                    method,
+                    url,
+                    headers=headers,
+                    params=params,
+                    json=json,
+                    data=data,
+                    proxy=proxy,
+                    timeout=timeout,
+                )
+                if not stream:
+                    await response.read()
+            except aiohttp.TooManyRedirects as err:
+                raise CruxClientTooManyRedirects(str(err))
+            except aiohttp.ClientResponseError as err:
+                raise CruxClientHTTPError(str(err), None)
+            except (aiohttp.ClientProxyConnectionError, aiohttp.ClientSSLError) as err:
+                raise CruxClientConnectionError(str(err))
+            except asyncio.TimeoutError as err:
+                raise CruxClientTimeout(str(err) or "Request timed out: {}".format(url))
+            except aiohttp.ClientConnectionError as err:
+                if attempt >= max_connect_retries:
+                    raise CruxClientConnectionError(str(err))
+                delay = retries.backoff_factor * (2 ** attempt)
+            else:
+                has_retry_after = "retry-after" in response.headers
+                if attempt >= max_retries or not retries.is_retry(
+                    method, response.status, has_retry_after
+                ):
+                    return response
+                response.release()
+                delay = retries.backoff_factor * (2 ** attempt)
+                if has_retry_after and response.headers["retry-after"].isdigit():
+                    delay = float(response.headers["retry-after"])
+            attempt += 1
+            log.debug(
+                "Retrying %s %s in %s seconds (attempt %s)", method, url, delay, attempt
+            )
+            await asyncio.sleep(delay)
+
+    async def api_call(  # pylint: disable=too-many-arguments
+        self,
+        method,  # type: str
+        path,  # type: List[str]
+        model=None,  # type: Any
+        headers=None,  # type: MutableMapping[Text, Text]
+        params=None,  # type: Dict[Any,Any]
+        json=None,  # type: Dict[Any,Any]
+        data=None,  # type: Any
+        stream=False,  # type: bool
+        connect_timeout=9.5,  # type: float
+        read_timeout=60,  # type: float
+        paginate=None,  # type: Dict[str, Any]
+        lazy=False,  # type: bool
+    ):
+        # type: (...) -> Any
+        """Requests and Serializes response from API Backend.
+
+        Takes the arguments of CruxClient.api_call.
+
+        Returns:
+            crux.models.Model, list, bool or aiohttp.ClientResponse: Serialized
+                response, or the response itself if model is None. Its body has
+                been read, unless stream is set.
+
+        Raises:
+            TypeError: If Path is not of list type.
+            CruxClientHTTPError: If there is HTTP related error.
+            CruxClientConnectionError: If there is SSL or Proxy related error.
+            CruxClientTimeout: If there is timout related error.
+            CruxResourceNotFoundError: If API has status code 404.
+            CruxAPIError: If API has status code other than 2XX.
+        """
+        url = build_api_url(self.crux_config, path)
+        headers = build_api_headers(self.crux_config, headers)
+
+        if method not in ("GET", "DELETE", "PUT", "POST"):
+            raise ValueError("Request Method Type should be in GET, DELETE, PUT, POST")
+
+        if paginate is None:
+            paginate = {}
+
+        log.trace("Setting request params: %s", params)
+        response = await self.request(
+            method,
+            url,
+            headers=headers,
+            params=params,
+            json=json,
+            data=data,
+            stream=stream,
+            connect_timeout=connect_timeout,
+            read_timeout=read_timeout,
+        )
+
+        if response.status in SUCCESS_STATUS_CODES:
+            if model is None:
+                log.debug("Model is set to None, returning response")
+                return response
+            return deserialize(
+                await self.json(response), model, self, paginate, lazy=lazy
+            )
+        elif response.status == 204:
+            log.debug("Response code is 204, returning True boolean value")
+            response.release()
+            return True
+        else:
+            try:
+                response_json = await self.json(response)
+            except ValueError:
+                response_json = {
+                    "status": response.status,
+                    "message": await response.text(),
+                }
+            finally:
+                response.release()
+            raise api_error(response.status, response_json)
+
+    async def json(self, response):
+        # type: (aiohttp.ClientResponse) -> Any
+        """Decodes the JSON body of response with the configured decoder."""
+        return self.crux_config.json_decoder(await response.read())
+
+    async def close(self):
+        # type: () -> None
+        """Closes the Session."""
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+
+def _query_params(params):
+    # type: (Dict[Any, Any]) -> Dict[Any, Any]
+    """Encodes query parameters the way requests does, which aiohttp doesn't."""
+    return dict(
+        (key, str(value) if isinstance(value, bool) else value)
+        for key, value in params.items()
+        if value is not None
+    )
+
+
+_PREFETCH_END = object()
+
+
+async def _prefetched(iterable, depth):
+    # type: (AsyncIterator[Any], int) -> AsyncIterator[Any]
+    """Iterates over iterable on a background task, staying ahead of the consumer.
+
+    Args:
+        iterable (async iterable): Iterable whose items are slow to produce,
+            for example pages fetched from the API.
+        depth (int): Maximum number of items produced ahead of the consumer,
+            including the one being produced.
+
+    Yields:
+        Items of iterable, in order. Exceptions raised by iterable are re-raised.
+
+    Raises:
+        ValueError: If depth is less than 1.
+    """
+    if depth < 1:
+        raise ValueError("depth should be greater than 0")
+
+    items = asyncio.Queue()  # type: asyncio.Queue
+    slots = asyncio.Semaphore(depth)
+
+    async def produce():
+        try:
+            async for item in iterable:
+                await slots.acquire()
+                await items.put((item, None))
+        except Exception as err:  # pylint: disable=broad-except
+            await items.put((_PREFETCH_END, err))
+        else:
+            await items.put((_PREFETCH_END, None))
+
+    producer = asyncio.ensure_future(produce())
+    try:
+        while True:
+            item, err = await items.get()
+            if item is _PREFETCH_END:
+                if err is not None:
+                    raise err
+                return
+            slots.release()
+            yield item
+    finally:
+        producer.cancel()
+
+
+class AsyncFile(File):
+    """File Model whose transfers are coroutines.
+
+    The properties of File are available, the methods defined here have to be
+    awaited. Other File methods need a synchronous Crux connection.
+    """
+
+    async def refresh(self):  # pylint: disable=invalid-overridden-method
+        # type: () -> bool
+        """Refresh File model from API backend.
+
+        Returns:
+            bool: True, if it is able to refresh the model.
+        """
+        headers = Headers(
+            {"content-type": "application/json", "accept": "application/json"}
+        )
+        response = await self.connection.api_call(
+            "GET", ["v1", "resources", self.id], headers=headers
+        )
+        self.raw_model = await self.connection.json(response)
+        return True
+
+    async def _get_signed_url(
+        self, stale_url=None
+    ):  # pylint: disable=invalid-overridden-method
+        # type: (str) -> str
+        url = self._cached_signed_url(stale_url)
+        if url is not None:
+            return url
+
+        headers = Headers(
+            {"content-type": "application/json", "accept": "application/json"}
+        )
+        response = await self.connection.api_call(
+            "GET", ["v2", "resources", self.id, "content-url"], headers=headers, json={}
+        )
+        return self._store_signed_url(await self.connection.json(response))
+
+    async def _get_content_response(self, only_use_crux_domains):
+        # type: (bool) -> aiohttp.ClientResponse
+        if only_use_crux_domains is None:
+            only_use_crux_domains = self.connection.crux_config.only_use_crux_domains
+
+        if only_use_crux_domains:
+            log.debug("Using Crux Domain for streaming file resource %s", self.id)
+            return await self.connection.api_call(
+                "GET",
+                ["v2", "resources", self.id, "content"],
+                headers=Headers({"accept": "*/*"}),
+                stream=True,
+            )
+
+        log.debug("Using Signed url for streaming file resource %s", self.id)
+        signed_url = await self._get_signed_url()
+        response = await self.connection.request("GET", signed_url, stream=True)
+        if response.status in SIGNED_URL_EXPIRED_STATUS_CODES:
+            response.release()
+            log.debug("Signed url rejected, refreshing it for resource %s", self.id)
+            signed_url = await self._get_signed_url(stale_url=signed_url)
+            response = await self.connection.request("GET", signed_url, stream=True)
+
+        if response.status >= 400:
+            response.release()
+            raise CruxClientHTTPError(
+                "{status} error downloading resource {id}".format(
+                    status=response.status, id=self.id
+                ),
+                response,
+            )
+        return response
+
+    async def iter_content(  # pylint: disable=invalid-overridden-method
+        self, chunk_size=DEFAULT_CHUNK_SIZE, only_use_crux_domains=None
+    ):
+        # type: (int, bool) -> AsyncIterator[bytes]
+        """Streams the file resource.
+
+        Args:
+            chunk_size (int): Chunk Size for the stream.
+            only_use_crux_domains (bool): True if content is required to be downloaded
+                from Crux domains else False.
+
+        Yields:
+            bytes: Bytes of file resource.
+
+        Raises:
+            ValueError: If chunk_size is not multiple of 256 KiB.
+        """
+        if not valid_chunk_size(chunk_size):
+            raise ValueError("chunk_size should be multiple of 256 KiB")
+
+        response = await self._get_content_response(only_use_crux_domains)
+        try:
+            async for chunk in response.content.iter_chunked(chunk_size):
+                yield chunk
+        except aiohttp.ClientPayloadError as err:
+            raise CruxClientConnectionError(str(err))
+        finally:
+            response.release()
+
+    async def download(  # pylint: disable=invalid-overridden-method
+        self,
+        dest,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        only_use_crux_domains=None,
+        workers=None,
+    ):
+        # type: (Any, int, bool, Optional[int]) -> bool
+        """Downloads the file resource.
+
+        Args:
+            dest (str or file): Local OS path at which file resource will be downloaded.
+            chunk_size (int): Number of bytes to be read in memory.
+            only_use_crux_domains (bool): True if content is required to be downloaded
+                from Crux domains else False.
+            workers (int): Accepted for compatibility with File.download, the content
+                is always streamed over one connection. Defaults to None.
+
+        Returns:
+            bool: True if it is downloaded.
+
+        Raises:
+            TypeError: If dest is not a file like or string type.
+        """
+        if not valid_chunk_size(chunk_size):
+            raise ValueError("chunk_size should be multiple of 256 KiB")
+
+        if hasattr(dest, "write"):
+            return await self._download_file(
+                dest, chunk_size, only_use_crux_domains, workers
+            )
+        elif isinstance(dest, (str, unicode)):
+            with open(dest, "wb") as file_obj:
+                return await self._download_file(
+                    file_obj, chunk_size, only_use_crux_domains, workers
+                )
+        else:
+            raise TypeError("Invalid Data Type for dest: {}".format(type(dest)))
+
+    async def _download_file(  # pylint: disable=invalid-overridden-method
+        self,
+        file_obj,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        only_use_crux_domains=None,
+        workers=None,
+    ):
+        # An empty file has no content to download, see File._download_file.
+        if self.size is None:
+            log.debug("File resource %s is of size None", self.id)
+            return True
+
+        if workers is not None and workers > 1:
+            log.debug("Ignoring workers=%s for async download of %s", workers, self.id)
+
+        async for chunk in self.iter_content(
+            chunk_size=chunk_size, only_use_crux_domains=only_use_crux_domains
+        ):
+            file_obj.write(chunk)
+
+        return True
+
+
+class AsyncDataset(Dataset):
+    """Dataset Model whose listings are coroutines.
+
+    The properties of Dataset are available, the methods defined here have to be
+    awaited or iterated with ``async for``. Other Dataset methods need a
+    synchronous Crux connection.
+    """
+
+    async def list_files(  # pylint: disable=invalid-overridden-method
+        self,
+        sort=None,
+        folder="/",
+        cursor=None,
+        limit=100,
+        prefetch=None,
+        as_table=False,
+    ):
+        # type: (str, str, str, Optional[int], int, bool) -> AsyncIterator[AsyncFile]
+        """Lists the files.
+
+        Args:
+            sort (str): Sets whether to sort or not. Defaults to None.
+            folder (str): Folder for which resource should be listed.
+                Defaults to /.
+            cursor (str): Sets the offset to the page cursor. Defaults to None.
+            limit (int): Sets the limit, None for all files. Defaults to 100.
+            prefetch (int): Number of pages to fetch ahead on a background task
+                while the current page is processed. Defaults to None.
+            as_table (bool): Not supported by the async listing, which always
+                yields AsyncFile objects. Defaults to False.
+
+        Yields:
+            AsyncFile: File objects.
+
+        Raises:
+            ValueError: If as_table is set.
+        """
+        if as_table:
+            raise ValueError("as_table is not supported by AsyncDataset.list_files")
+
+        pages = self._file_pages(sort=sort, folder=folder, cursor=cursor, limit=limit)
+
+        # Fetch the next pages on a background task while the caller
+        # processes the current one.
+        if prefetch:
+            pages = _prefetched(pages, depth=prefetch)
+
+        async for page in pages:
+            for resource in page.filter(lambda raw: raw.get("type") == "file"):
+                yield resource
+
+    async def _file_pages(self, sort, folder, cursor, limit):
+        # type: (str, str, str, Optional[int]) -> AsyncIterator[Any]
+        """Yields the pages of a file listing as LazyModelList objects."""
+        headers = Headers(
+            {"content-type": "application/json", "accept": "application/json"}
+        )
+        params = self._list_resources_params(
+            folder=folder, cursor=cursor, include_folders=False, name=None, sort=sort
+        )
+
+        retrieved = 0
+        paginate = {}  # type: Dict[str, Any]
+        while limit is None or retrieved < limit:
+            params["limit"] = _page_limit(limit, retrieved)
+            page = await self.connection.api_call(
+                "GET",
+                ["resources"],
+                params=params,
+                model=AsyncFile,
+                headers=headers,
+                paginate=paginate,
+                lazy=True,
+            )
+            if not page:
+                break
+
+            yield page
+
+            retrieved += len(page)
+            params["cursor"] = paginate["cursor"]
+
+    async def get_files_range(  # pylint: disable=invalid-overridden-method
+        self,
+        start_date=None,
+        end_date=None,
+        frames=None,
+        file_format=MediaType.AVRO.value,
+        dayfirst=False,
+        yearfirst=False,
+        latest_only=False,
+        delivery_status=None,
+        use_cache=None,
+        max_workers=DEFAULT_WORKERS,
+    ):
+        # type: (...) -> AsyncIterator[AsyncFile]
+        """Get a set of dataset file resources.
+
+        Selects files like Dataset.get_files_range, with delivery manifests and
+        resource metadata fetched concurrently on the event loop.
+
+        Args:
+            max_workers (int): Number of requests in flight at once.
+                Defaults to DEFAULT_WORKERS.
+
+        Yields:
+            AsyncFile: File resources.
+        """
+        selection = _FilesRangeSelection(
+            start_date=start_date,
+            end_date=end_date,
+            frames=frames,
+            file_format=file_format,
+            dayfirst=dayfirst,
+            yearfirst=yearfirst,
+            latest_only=latest_only,
+            delivery_status=delivery_status,
+        )
+
+        headers = Headers({"accept": "application/json"})
+        use_cache = True if use_cache is None else use_cache
+        response = await self.connection.api_call(
+            "GET",
+            ["v1", "deliveries", self.id, "ids"],
+            headers=headers,
+            params=selection.delivery_ids_params(use_cache),
+        )
+        select_deliveries = selection.select_deliveries(
+            await self.connection.json(response)
+        )
+
+        semaphore = asyncio.Semaphore(max_workers)
+
+        async def get_delivery_data(delivery_id):
+            params = {"delivery_resource_format": selection.file_format}
+            async with semaphore:
+                response = await self.connection.api_call(
+                    "GET",
+                    ["v1", "deliveries", self.id, delivery_id, "data"],
+                    params=params,
+                )
+                return delivery_id, await self.connection.json(response)
+
+        for future in asyncio.as_completed(
+            [get_delivery_data(delivery_id) for delivery_id in select_deliveries]
+        ):
+            delivery_id, data = await future
+            selection.add_manifest(delivery_id, data)
+
+        files = await get_resources_batch(
+            selection.resource_ids(),
+            connection=self.connection,
+            max_workers=max_workers,
+        )
+        for file in files:
+            selection.add_file(file)
+
+        for file in selection.files():
+            yield file
+
+
+async def _get_resources_chunk(resource_ids, connection):
+    # type: (List[str], AsyncCruxClient) -> List[Dict[str, Any]]
+    headers = Headers(
+        {"content-type": "application/json", "accept": "application/json"}
+    )
+    try:
+        response = await connection.api_call(
+            "POST",
+            ["v1", "resources", "get-batch"],
+            headers=headers,
+            json={"resourceIds": resource_ids},
+        )
+    except CruxAPIError as err:
+        if err.status_code not in (404, 405):
+            raise
+        log.debug("Batch resource request unsupported, fetching one by one: %s", err)
+        return await _get_resources_one_by_one(resource_ids, connection)
+
+    raw_resources = order_batch_response(await connection.json(response), resource_ids)
+    missing = missing_resource_ids(raw_resources, resource_ids)
+    if missing:
+        log.debug("Batch request did not return resources %s, fetching them", missing)
+        raw_resources = order_batch_response(
+            raw_resources + await _get_resources_one_by_one(missing, connection),
+            resource_ids,
+        )
+    return raw_resources
+
+
+async def _get_resources_one_by_one(resource_ids, connection):
+    # type: (List[str], AsyncCruxClient) -> List[Dict[str, Any]]
+    headers = Headers({"accept": "application/json"})
+    raw_resources = []
+    for resource_id in resource_ids:
+        response = await connection.api_call(
+            "GET", ["v1", "resources", resource_id], headers=headers
+        )
+        raw_resources.append(await connection.json(response))
+    return raw_resources
+
+
+async def get_resources_batch(
+    resource_ids,  # type: List[str]
+    connection,  # type: AsyncCruxClient
+    batch_size=DEFAULT_BATCH_SIZE,  # type: int
+    max_workers=DEFAULT_WORKERS,  # type: int
+):
+    # type: (...) -> List[AsyncFile]
+    """Fetches metadata of many file resources with concurrent batch requests.
+
+    Args:
+        resource_ids (:obj:`list` of :obj:`str`): Resource IDs to be fetched.
+        connection (AsyncCruxClient): Connection Object.
+        batch_size (int): Number of resource IDs per batch request.
+            Defaults to DEFAULT_BATCH_SIZE.
+        max_workers (int): Number of batch requests in flight at once.
+            Defaults to DEFAULT_WORKERS.
+
+    Returns:
+        list (:obj:`AsyncFile`): File objects, in the order of resource_ids.
+    """
+    semaphore = asyncio.Semaphore(max_workers)
+
+    async def get_chunk(chunk):
+        async with semaphore:
+            return await _get_resources_chunk(chunk, connection)
+
+    raw_chunks = await asyncio.gather(
+        *[get_chunk(chunk) for chunk in split_batches(resource_ids, batch_size)]
+    )
+    return [
+        AsyncFile(raw_model=raw_resource, connection=connection)
+        for raw_chunk in raw_chunks
+        for raw_resource in raw_chunk
+    ]
+
+
+class AsyncCrux(object):
+    """Crux APIs for asyncio.
+
+    Use it as an async context manager, or await close() when done.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments
+        self,
+        api_key=None,  # type: Optional[str]
+        api_host=None,  # type: str
+        proxies=None,  # type: Optional[MutableMapping[Text, Text]]
+        user_agent=None,  # type: str
+        api_prefix=None,  # type: str
+        only_use_crux_domains=None,  # type: bool
+        signed_url_cache_size=None,  # type: int
+        connection_limit=DEFAULT_CONNECTION_LIMIT,  # type: int
+    ):
+        # type: (...) -> None
+        crux_config = CruxConfig(
+            api_key=api_key,
+            api_host=api_host,
+            proxies=proxies,
+            user_agent=user_agent,
+            api_prefix=api_prefix,
+            only_use_crux_domains=only_use_crux_domains,
+            signed_url_cache_size=signed_url_cache_size,
+        )
+
+        self.api_client = AsyncCruxClient(
+            crux_config=crux_config, connection_limit=connection_limit
+        )
+
+    async def close(self):
+        """Closes the Connection."""
+        await self.api_client.close()
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, exc_type, exc_value, traceback):
+        await self.close()
+
+    async def whoami(self):
+        # type: () -> Identity
+        """Returns the Identity of Current User.
+
+        Returns:
+            crux.models.Identity: Identity object.
+        """
+        headers = Headers({"accept": "application/json"})
+        return await self.api_client.api_call(
+            "GET", ["v2", "identities", "profile"], model=Identity, headers=headers
+        )
+
+    async def get_dataset(
+        self, id
+    ):  # id name is by design pylint: disable=redefined-builtin
+        # type: (str) -> AsyncDataset
+        """Gets the Dataset.
+
+        Args:
+            id (str): Dataset ID which is to be fetched.
+
+        Returns:
+            AsyncDataset: Dataset object.
+        """
+        headers = Headers({"accept": "application/json"})
+        return await self.api_client.api_call(
+            "GET", ["v2", "datasets", id], model=AsyncDataset, headers=headers
+        )
+
+    async def get_file(
+        self, id
+    ):  # id name is by design pylint: disable=redefined-builtin
+        # type: (str) -> AsyncFile
+        """Gets the File resource.
+
+        Args:
+            id (str): File resource ID which is to be fetched.
+
+        Returns:
+            AsyncFile: File object.
+        """
+        headers = Headers({"accept": "application/json"})
+        return await self.api_client.api_call(
+            "GET", ["v2", "resources", id], model=AsyncFile, headers=headers
+        )
@@ -1,9 +1,20 @@
 """Module contains Crux object to interact with root APIs."""
 
-from typing import List, MutableMapping, Optional, Text, Union  # noqa: F401
+from typing import (  # noqa: F401
+    Any,
+    Callable,
+    Dict,
+    List,
+    MutableMapping,
+    Optional,
+    Text,
+    Union,
+)
 
 from crux._client import CruxClient
 from crux._config import CruxConfig
+from crux._metrics import MetricsHook  # noqa: F401 pylint: disable=unused-import
+from crux._profile import DEFAULT_N_PLUS_ONE_THRESHOLD, Profile
 from crux._utils import create_logger
 from crux._utils import Headers
 from crux.models import Dataset, File, Folder, Identity, Job
@@ -31,6 +42,24 @@ class Crux(object):
         user_agent=None,  # type: str
         api_prefix=None,  # type: str
         only_use_crux_domains=None,  # type: bool
+        cache_dir=None,  # type: str
+        path_index_ttl=None,  # type: float
+        signed_url_cache_size=None,  # type: int
+        storage_pool_size=None,  # type: int
+        pool_connections=None,  # type: int
+        pool_maxsize=None,  # type: int
+        pool_block=None,  # type: bool
+        json_decoder=None,  # type: Union[str, Callable[[bytes], Any]]
+        response_cache_size=None,  # type: int
+        response_cache_ttls=None,  # type: Dict[str, float]
+        coalesce_requests=None,  # type: bool
+        api_rate_limit=None,  # type: float
+        storage_rate_limit=None,  # type: float
+        adaptive_rate_limit=None,  # type: bool
+        metrics_hooks=None,  # type: List[MetricsHook]
+        record_path=None,  # type: str
+        replay_path=None,  # type: str
+        replay_latency_scale=None,  # type: float
     ):
         # type: (...) -> None
         crux_config = CruxConfig(
@@ -40,6 +69,24 @@ class Crux(object):
             user_agent=user_agent,
             api_prefix=api_prefix,
             only_use_crux_domains=only_use_crux_domains,
+            cache_dir=cache_dir,
+            path_index_ttl=path_index_ttl,
+            signed_url_cache_size=signed_url_cache_size,
+            storage_pool_size=storage_pool_size,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            json_decoder=json_decoder,
+            response_cache_size=response_cache_size,
+            response_cache_ttls=response_cache_ttls,
+            coalesce_requests=coalesce_requests,
+            api_rate_limit=api_rate_limit,
+            storage_rate_limit=storage_rate_limit,
+            adaptive_rate_limit=adaptive_rate_limit,
+            metrics_hooks=metrics_hooks,
+            record_path=record_path,
+            replay_path=replay_path,
+            replay_latency_scale=replay_latency_scale,
         )
 
         self.api_client = CruxClient(crux_config=crux_config)
@@ -48,6 +95,57 @@ class Crux(object):
         """Closes the Connection."""
         self.api_client.close()
 
+    def add_metrics_hook(self, hook):
+        # type: (MetricsHook) -> None
+        """Adds a hook receiving the measurements of each API call.
+
+        Args:
+            hook (crux.MetricsHook): Hook, for example a crux.InMemoryMetrics,
+                which aggregates latency histograms, statuses, retries, bytes and
+                pagination depth per route and exports them for Prometheus.
+        """
+        self.api_client.add_metrics_hook(hook)
+
+    def profile(  # pylint: disable=no-self-use
+        self, sample_rate=1.0, n_plus_one_threshold=DEFAULT_N_PLUS_ONE_THRESHOLD
+    ):
+        # type: (float, int) -> Profile
+        """Profiles the requests made while the returned context manager is entered.
+
+        API calls and storage transfers made by the current thread, and by the
+        worker threads of the client, are attributed to the outermost high-level
+        operation they are made from, like Dataset.get_latest_files or
+        Dataset.download_files.
+
+        Args:
+            sample_rate (float): Fraction of the operation calls profiled, to
+                keep the profile on in production. Defaults to 1.
+            n_plus_one_threshold (int): Requests of one operation call to a route
+                with an ID from which the route is reported as an N+1 pattern.
+                Defaults to 10.
+
+        Returns:
+            crux._profile.Profile: Context manager, whose report() and summary()
+                give requests, serial and overlapped request time, bytes and N+1
+                routes by operation.
+        """
+        return Profile(
+            sample_rate=sample_rate, n_plus_one_threshold=n_plus_one_threshold
+        )
+
+    def pool_stats(self):
+        # type: () -> Dict[str, List[Dict[str, Any]]]
+        """Returns the usage counters of the API and storage connection pools.
+
+        Each host pool reports its requests, connections created and reused, and
+        idle connections, to size pool_maxsize for the threads sharing the
+        connection.
+
+        Returns:
+            dict: Lists of per-host pool counters, keyed by "api" and "storage".
+        """
+        return self.api_client.pool_stats()
+
     def whoami(self):
         # type: () -> Identity
         """Returns the Identity of Current User.
@@ -113,7 +211,7 @@ class Crux(object):
         headers = Headers({"accept": "application/json"})  # type: MutableMapping[Text, Text]
 
         response = self.api_client.api_call("GET", ["v2", "resources", id], headers=headers)
-        raw_resource = response.json()
+        raw_resource = self.api_client.json(response)
 
         resource = get_resource_object(
             resource_type=raw_resource.get("type"),
@@ -129,7 +227,7 @@ class Crux(object):
             "GET", ["v2", "drives", "my"], model=None, headers=headers
         )
 
-        return response.json()
+        return self.api_client.json(response)
 
     def list_datasets(self, owned=True, subscribed=True):
         # type: (bool, bool) -> List[Dataset]
@@ -152,13 +250,14 @@ class Crux(object):
         while True:
             params["offset"] = retrieved
             try:
-                resp = self.api_client.api_call(
+                response = self.api_client.api_call(
                     "GET",
                     ["v2", "subscriptions", "view", "summary"],
                     params=params,
                     model=None,
                     headers=headers,
-                ).json()
+                )
+                resp = self.api_client.json(response)
             except CruxAPIError as err:
                 log.debug("Get subscriptions failed: %s", err)
                 break
@@ -248,4 +347,4 @@ class Crux(object):
         response = self.api_client.api_call(
             "POST", ["datasets", "provenance"], headers=headers, json=provenance
         )
-        return response.json()
+        return self.api_client.json(response)
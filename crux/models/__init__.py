@@ -1,21 +1,29 @@
 """
 Module containing models that represent objects returned by the API.
+
+Models are imported on first access on Python 3.7+.
 """
 
+from importlib import import_module
 import logging
 from logging import NullHandler
+import sys
 
-from crux.models.dataset import Dataset
-from crux.models.delivery import Delivery
-from crux.models.file import File
-from crux.models.folder import Folder
-from crux.models.identity import Identity
-from crux.models.ingestion import Ingestion
-from crux.models.job import Job, StitchJob
-from crux.models.label import Label
-from crux.models.permission import Permission
-from crux.models.resource import Resource
-
+# Module defining each model.
+_LAZY_MODELS = {
+    "Dataset": "crux.models.dataset",
+    "Delivery": "crux.models.delivery",
+    "File": "crux.models.file",
+    "Folder": "crux.models.folder",
+    "Identity": "crux.models.identity",
+    "Ingestion": "crux.models.ingestion",
+    "Job": "crux.models.job",
+    "Label": "crux.models.label",
+    "Permission": "crux.models.permission",
+    "Resource": "crux.models.resource",
+    "ResourceTable": "crux.models.resource_table",
+    "StitchJob": "crux.models.job",
+}
 
 __all__ = (
     "Identity",
@@ -23,6 +31,7 @@ __all__ = (
     "StitchJob",
     "Job",
     "Resource",
+    "ResourceTable",
     "File",
     "Folder",
     "Dataset",
@@ -31,5 +40,33 @@ __all__ = (
     "Ingestion",
 )
 
+if sys.version_info >= (3, 7):
+
+    def __getattr__(name):
+        if name not in _LAZY_MODELS:
+            raise AttributeError(
+                "module {!r} has no attribute {!r}".format(__name__, name)
+            )
+        value = getattr(import_module(_LAZY_MODELS[name]), name)
+        globals()[name] = value
+        return value
+
+    def __dir__():
+        return sorted(list(globals()) + list(_LAZY_MODELS))
+
+
+else:
+    from crux.models.dataset import Dataset
+    from crux.models.delivery import Delivery
+    from crux.models.file import File
+    from crux.models.folder import Folder
+    from crux.models.identity import Identity
+    from crux.models.ingestion import Ingestion
+    from crux.models.job import Job, StitchJob
+    from crux.models.label import Label
+    from crux.models.permission import Permission
+    from crux.models.resource import Resource
+    from crux.models.resource_table import ResourceTable
+
 # Set default logging handler to avoid "No handler found" warnings
 logging.getLogger(__name__).addHandler(NullHandler())
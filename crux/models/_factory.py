@@ -1,12 +1,19 @@
 """Module contains functions to create Resource objects."""
 
-from typing import Any, Dict, Union  # noqa: F401
+from typing import Any, Dict, Iterator, List, Union  # noqa: F401
 
 from crux._client import CruxClient
+from crux._utils import create_logger, DEFAULT_WORKERS, get_executor, Headers
+from crux.exceptions import CruxAPIError
 from crux.models.file import File
 from crux.models.folder import Folder
 
 
+log = create_logger(__name__)
+
+DEFAULT_BATCH_SIZE = 100
+
+
 def get_resource_object(resource_type, data, connection=None):
     # type: (str, Dict[str, Any], CruxClient) -> Union[File, Folder]
     """Creates resource object based on its type.
@@ -28,3 +35,128 @@ def get_resource_object(resource_type, data, connection=None):
         return Folder.from_dict(data, connection=connection)
     else:
         raise TypeError("Invalid Resource Type")
+
+
+def _get_resources_one_by_one(resource_ids, connection):
+    # type: (List[str], CruxClient) -> List[Dict[str, Any]]
+    headers = Headers({"accept": "application/json"})
+    raw_resources = []
+    for resource_id in resource_ids:
+        response = connection.api_call(
+            "GET", ["v1", "resources", resource_id], headers=headers
+        )
+        raw_resources.append(connection.json(response))
+    return raw_resources
+
+
+def _get_resources_chunk(resource_ids, connection):
+    # type: (List[str], CruxClient) -> List[Dict[str, Any]]
+    """Fetches metadata of resource_ids with a single batch request.
+
+    Falls back to one request per resource if the API doesn't support batch requests,
+    and for the resources the batch response left out. The result is in the order of
+    resource_ids.
+
+    Raises:
+        crux.exceptions.CruxResourceNotFoundError: If a resource doesn't exist.
+    """
+    headers = Headers(
+        {"content-type": "application/json", "accept": "application/json"}
+    )
+    try:
+        response = connection.api_call(
+            "POST",
+            ["v1", "resources", "get-batch"],
+            headers=headers,
+            json={"resourceIds": resource_ids},
+        )
+    except CruxAPIError as err:
+        if err.status_code not in (404, 405):
+            raise
+        log.debug("Batch resource request unsupported, fetching one by one: %s", err)
+        return _get_resources_one_by_one(resource_ids, connection)
+
+    raw_resources = order_batch_response(connection.json(response), resource_ids)
+    missing = missing_resource_ids(raw_resources, resource_ids)
+    if missing:
+        log.debug("Batch request did not return resources %s, fetching them", missing)
+        raw_resources = order_batch_response(
+            raw_resources + _get_resources_one_by_one(missing, connection),
+            resource_ids,
+        )
+    return raw_resources
+
+
+def order_batch_response(response_json, resource_ids):
+    # type: (Any, List[str]) -> List[Dict[str, Any]]
+    """Returns the raw resources of a batch response, in the order of resource_ids.
+
+    Resources which weren't returned are left out.
+    """
+    if isinstance(response_json, dict):
+        response_json = response_json.get("resources", response_json.get("results", []))
+
+    raw_resources = {raw["resourceId"]: raw for raw in response_json}
+    return [raw_resources[rid] for rid in resource_ids if rid in raw_resources]
+
+
+def missing_resource_ids(raw_resources, resource_ids):
+    # type: (List[Dict[str, Any]], List[str]) -> List[str]
+    """Returns the IDs of resource_ids which aren't in raw_resources."""
+    returned = set(raw["resourceId"] for raw in raw_resources)
+    return [rid for rid in resource_ids if rid not in returned]
+
+
+def split_batches(resource_ids, batch_size):
+    # type: (List[str], int) -> List[List[str]]
+    """Splits resource_ids into batches of at most batch_size IDs.
+
+    Raises:
+        ValueError: If batch_size is less than 1.
+    """
+    if batch_size < 1:
+        raise ValueError("batch_size should be greater than 0")
+
+    resource_ids = list(resource_ids)
+    batches = []
+    while resource_ids:
+        batches.append(resource_ids[:batch_size])
+        resource_ids = resource_ids[batch_size:]
+    return batches
+
+
+def get_resources_batch(
+    resource_ids,  # type: List[str]
+    connection,  # type: CruxClient
+    batch_size=DEFAULT_BATCH_SIZE,  # type: int
+    max_workers=DEFAULT_WORKERS,  # type: int
+):
+    # type: (...) -> Iterator[File]
+    """Fetches metadata of many file resources with concurrent batch requests.
+
+    Args:
+        resource_ids (:obj:`list` of :obj:`str`): Resource IDs to be fetched.
+        connection (CruxClient): Connection Object.
+        batch_size (int): Number of resource IDs per batch request.
+            Defaults to DEFAULT_BATCH_SIZE.
+        max_workers (int): Number of batch requests in flight at once.
+            Defaults to DEFAULT_WORKERS.
+
+    Yields:
+        crux.models.File: File objects, in the order of resource_ids.
+
+    Raises:
+        ValueError: If batch_size is less than 1.
+    """
+    chunks = split_batches(resource_ids, batch_size)
+    if not chunks:
+        return
+
+    with get_executor(max_workers=min(max_workers, len(chunks))) as executor:
+        # map keeps the order of the chunks regardless of which finishes first.
+        raw_chunks = executor.map(
+            lambda chunk: _get_resources_chunk(chunk, connection), chunks
+        )
+        for raw_chunk in raw_chunks:
+            for raw_resource in raw_chunk:
+                yield File(raw_model=raw_resource, connection=connection)
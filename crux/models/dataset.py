@@ -1,12 +1,15 @@
 """Module contains Dataset model."""
 
 from collections import defaultdict
+from concurrent.futures import as_completed, FIRST_COMPLETED, wait
+import copy
 from datetime import date, datetime, timedelta
-from dateutil import parser
 import json
 import os
 import posixpath
+import time
 from typing import (
+    Any,
     DefaultDict,
     Dict,
     Generator,
@@ -21,15 +24,27 @@ from typing import (
     Union,
 )  # noqa: F401
 
+from crux._client import CruxClient  # noqa: F401 pylint: disable=unused-import
 from crux._compat import unicode
+from crux._lazy import LazyModelList  # noqa: F401 pylint: disable=unused-import
+from crux._path_index import PathIndex  # noqa: F401 pylint: disable=unused-import
+from crux._profile import profiled
 from crux._utils import (
     create_logger,
+    DEFAULT_WORKERS,
     DELIVERY_ID_REGEX,
+    get_executor,
     Headers,
+    parse_datetime,
+    prefetched,
     split_posixpath_filename_dirpath,
 )
 from crux.exceptions import CruxAPIError, CruxClientError, CruxResourceNotFoundError
-from crux.models._factory import get_resource_object
+from crux.models._factory import (
+    DEFAULT_BATCH_SIZE,
+    get_resource_object,
+    get_resources_batch,
+)
 from crux.models.delivery import Delivery
 from crux.models.file import File
 from crux.models.folder import Folder
@@ -40,10 +55,41 @@ from crux.models.model import CruxModel
 from crux.models.permission import Permission
 from crux.models.resource import Resource
 from crux.models.resource import MediaType
+from crux.models.resource_table import ResourceTable
 
 
 log = create_logger(__name__)
 
+# Maximum number of resources requested per listing page.
+RESOURCE_PAGE_SIZE = 500
+
+
+class UploadSummary(object):
+    """Outcome of a Dataset.upload_files_concurrently call."""
+
+    def __init__(self):
+        # type: () -> None
+        """
+        Attributes:
+            uploaded (:obj:`list` of :obj:`crux.models.File`): Uploaded file objects.
+            failed (:obj:`list` of :obj:`tuple`): (local path, exception) pairs for
+                files and folders which could not be uploaded or created.
+        """
+        self.uploaded = []  # type: List[File]
+        self.failed = []  # type: List[Tuple[str, Exception]]
+
+    @property
+    def succeeded(self):
+        # type: () -> bool
+        """bool: True if nothing failed."""
+        return not self.failed
+
+    def __repr__(self):
+        # type: () -> str
+        return "UploadSummary(uploaded={uploaded}, failed={failed})".format(
+            uploaded=len(self.uploaded), failed=len(self.failed)
+        )
+
 
 class Dataset(CruxModel):
     """Dataset Model."""
@@ -144,7 +190,11 @@ class Dataset(CruxModel):
             bool: True if dataset is deleted.
         """
         headers = Headers({"content-type": "application/json", "accept": "application/json"})
-        return self.connection.api_call("DELETE", ["datasets", self.id], headers=headers)
+        deleted = self.connection.api_call(
+            "DELETE", ["datasets", self.id], headers=headers
+        )
+        self.invalidate_path_index()
+        return deleted
 
     def update(self, name=None, description=None, tags=None):
         # type: (str, str, List[str]) -> bool
@@ -225,13 +275,15 @@ class Dataset(CruxModel):
 
         file_resource = File(raw_model=raw_model)
 
-        return self.connection.api_call(
+        resource = self.connection.api_call(
             "POST",
             ["datasets", self.id, "resources"],
             json=file_resource.raw_model,
             model=File,
             headers=headers,
         )
+        self.invalidate_path_index(folder)
+        return resource
 
     def create_folder(self, path, folder="/", tags=None, description=None):
         # type: (str, str, List[str], str) -> Folder
@@ -266,13 +318,15 @@ class Dataset(CruxModel):
 
         folder_resource = Folder(raw_model=raw_model)
 
-        return self.connection.api_call(
+        resource = self.connection.api_call(
             "POST",
             ["datasets", self.id, "resources"],
             json=folder_resource.raw_model,
             model=Folder,
             headers=headers,
         )
+        self.invalidate_path_index(folder)
+        return resource
 
     def _get_resource(self, path, model):
         """Gets the resource object from the string path.
@@ -288,6 +342,25 @@ class Dataset(CruxModel):
             crux.exceptions.CruxResourceNotFoundError: If resource is not found.
         """
         resource_name, folder_path = split_posixpath_filename_dirpath(path)
+
+        path_index = self.connection.path_index
+        if path_index is not None:
+            raw_resource = self._get_folder_index(path_index, folder_path).get(
+                resource_name
+            )
+            if raw_resource is None:
+                raise CruxResourceNotFoundError(
+                    {"statusCode": 404, "name": resource_name}
+                )
+            # Copy, so callers updating the model don't change the index.
+            resource = model.from_dict(
+                copy.deepcopy(raw_resource), connection=self.connection
+            )
+            # The folder is known, so deleting the resource can drop its index.
+            resource._folder = folder_path  # pylint: disable=protected-access
+            resource.raw_model.setdefault("datasetId", self.id)
+            return resource
+
         resource_gen = self._list_resources(
             folder=folder_path,
             limit=1,
@@ -303,6 +376,43 @@ class Dataset(CruxModel):
             # hence raising the 404 error from the Python client
             raise CruxResourceNotFoundError({"statusCode": 404, "name": resource_name})
 
+    def _get_folder_index(self, path_index, folder):
+        # type: (PathIndex, str) -> Dict[str, Dict]
+        """Returns the raw models of the resources in folder, keyed by name.
+
+        The folder is listed once and kept for path_index_ttl seconds.
+        """
+        folder_index = path_index.get(self.id, folder)
+        if folder_index is not None:
+            return folder_index
+
+        log.debug("Loading path index for folder %s of dataset %s", folder, self.id)
+        loaded_at = time.time()
+        folder_index = dict(
+            (resource.name, resource.raw_model)
+            for resource in self._list_resources(
+                folder=folder, limit=None, include_folders=True, model=Resource
+            )
+        )
+        path_index.put(self.id, folder, folder_index, loaded_at)
+        return folder_index
+
+    def invalidate_path_index(self, folder=None):
+        # type: (Optional[str]) -> None
+        """Drops indexed paths so the next lookup lists the folder again.
+
+        Resources created or deleted through the connection of this Dataset are
+        invalidated automatically. Use this after changing the dataset in other
+        ways, or rely on path_index_ttl for changes made outside of the process.
+
+        Args:
+            folder (str): Folder whose index is dropped. Defaults to None,
+                which drops the index of every folder.
+        """
+        path_index = self.connection.path_index
+        if path_index is not None:
+            path_index.invalidate(self.id, folder)
+
     def _resource_exists(self, path):
         # type: (str) -> bool
         """Checks the existence of resource.
@@ -322,6 +432,7 @@ class Dataset(CruxModel):
         except CruxResourceNotFoundError:
             return False
 
+    @profiled
     def get_file(self, path):
         # type: (str) -> File
         """Gets the File resource object.
@@ -334,6 +445,7 @@ class Dataset(CruxModel):
         """
         return self._get_resource(path=path, model=File)
 
+    @profiled
     def get_folder(self, path):
         # type: (str) -> Folder
         """Gets the Folder resource object.
@@ -346,10 +458,17 @@ class Dataset(CruxModel):
         """
         return self._get_resource(path=path, model=Folder)
 
+    @profiled
     def list_resources(
-        self, folder="/", cursor=None, limit=1, include_folders=False, sort=None
+        self,
+        folder="/",
+        cursor=None,
+        limit=1,
+        include_folders=False,
+        sort=None,
+        prefetch=None,
     ):
-        # type: (str, str, int, bool, str) -> Generator[Resource]
+        # type: (str, str, int, bool, str, int) -> Generator[Resource]
         """Lists the resources in Dataset.
 
         Args:
@@ -361,6 +480,8 @@ class Dataset(CruxModel):
                 Defaults to False.
             sort (str): Sets whether to sort or not.
                 Defaults to None.
+            prefetch (int): Number of pages to fetch ahead on a background thread
+                while the current page is processed. Defaults to None.
 
         Returns:
             list (:obj:`crux.models.Resource`): List of File resource objects.
@@ -372,13 +493,22 @@ class Dataset(CruxModel):
             limit=limit,
             include_folders=include_folders,
             model=Resource,
+            prefetch=prefetch,
         )
 
         for result in result_gen:
             yield result
 
-    def download_files(self, folder, local_path, only_use_crux_domains=None):
-        # type: (str, str, bool) -> List[str]
+    @profiled
+    def download_files(
+        self,
+        folder,
+        local_path,
+        only_use_crux_domains=None,
+        workers=None,
+        list_workers=None,
+    ):
+        # type: (str, str, bool, int, int) -> List[str]
         """Downloads the resources recursively.
 
         Args:
@@ -387,6 +517,10 @@ class Dataset(CruxModel):
             local_path (str): Local OS Path where the file resources should be downloaded.
             only_use_crux_domains (bool): True if content is required to be downloaded
                 from Crux domains else False.
+            workers (int): Number of files to download concurrently. Defaults to None,
+                which lists folders and downloads files one after another.
+            list_workers (int): Number of folders to list concurrently when workers
+                is set. Defaults to DEFAULT_WORKERS.
 
         Returns:
             list (:obj:`str`): List of location of download files.
@@ -404,6 +538,18 @@ class Dataset(CruxModel):
         if not os.path.exists(local_path) and not os.path.isdir(local_path):
             raise OSError("local_path is an invalid directory location")
 
+        if workers is not None:
+            result_gen = self._download_files_concurrent(
+                folder=folder,
+                local_path=local_path,
+                only_use_crux_domains=only_use_crux_domains,
+                workers=workers,
+                list_workers=list_workers if list_workers else DEFAULT_WORKERS,
+            )
+            for result in result_gen:
+                yield result
+            return
+
         resources_gen = self._list_resources(
             sort=None,
             folder=folder,
@@ -435,6 +581,83 @@ class Dataset(CruxModel):
                 yield resource_local_path
                 log.debug("Downloaded file at %s", resource_local_path)
 
+    def _list_folder(self, folder):
+        # type: (str) -> List[Resource]
+        """Lists all files and folders directly under folder."""
+        return list(
+            self._list_resources(
+                sort=None,
+                folder=folder,
+                cursor=None,
+                limit=None,
+                include_folders=True,
+                model=Resource,
+            )
+        )
+
+    def _download_files_concurrent(  # pylint: disable=too-many-arguments
+        self, folder, local_path, only_use_crux_domains, workers, list_workers
+    ):
+        # type: (str, str, Optional[bool], int, int) -> Iterator[str]
+        """Downloads the resources recursively on bounded listing and transfer pools.
+
+        Yields:
+            str: Location of each downloaded file, as soon as it has been downloaded.
+        """
+        list_executor = get_executor(max_workers=list_workers)
+        transfer_executor = get_executor(max_workers=workers)
+
+        # Maps each future to the (folder, local path) it lists, or to
+        # (None, local path) for file downloads.
+        pending = {}  # type: Dict
+
+        def schedule_listing(folder_path, folder_local_path):
+            future = list_executor.submit(self._list_folder, folder_path)
+            pending[future] = (folder_path, folder_local_path)
+
+        def schedule_resources(folder_path, folder_local_path, resources):
+            for resource in resources:
+                resource_path = posixpath.join(folder_path, resource.name)
+                resource_local_path = os.path.join(folder_local_path, resource.name)
+                if resource.type == "folder":
+                    if not os.path.exists(resource_local_path):
+                        os.mkdir(resource_local_path)
+                    log.debug("Created local directory %s", resource_local_path)
+                    schedule_listing(resource_path, resource_local_path)
+                elif resource.type == "file":
+                    file_resource = File.from_dict(
+                        resource.to_dict(), connection=self.connection
+                    )
+                    future = transfer_executor.submit(
+                        file_resource.download,
+                        resource_local_path,
+                        only_use_crux_domains=only_use_crux_domains,
+                    )
+                    pending[future] = (None, resource_local_path)
+
+        try:
+            schedule_listing(folder, local_path)
+            while pending:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    folder_path, resource_local_path = pending.pop(future)
+                    if folder_path is None:
+                        future.result()
+                        log.debug("Downloaded file at %s", resource_local_path)
+                        yield resource_local_path
+                    else:
+                        schedule_resources(
+                            folder_path, resource_local_path, future.result()
+                        )
+        finally:
+            # Don't let the pools run queued work if the caller stopped early
+            # or a listing or download failed.
+            for future in pending:
+                future.cancel()
+            list_executor.shutdown(wait=True)
+            transfer_executor.shutdown(wait=True)
+
+    @profiled
     def upload_files(
         self,
         local_path,
@@ -443,8 +666,11 @@ class Dataset(CruxModel):
         description=None,
         tags=None,
         only_use_crux_domains=None,
+        workers=None,
+        retries=2,
+        retry_backoff=1.0,
     ):
-        # type: (str, str, str, str, List[str], bool) -> List[File]
+        # type: (str, str, str, str, List[str], bool, int, int, float) -> List[File]
         """Uploads the resources recursively.
 
         Args:
@@ -459,6 +685,14 @@ class Dataset(CruxModel):
                 Defaults to None.
             only_use_crux_domains (bool): True if content is required to be downloaded
                 from Crux domains else False.
+            workers (int): Number of files to upload concurrently. Defaults to None,
+                which uploads files one after another and stops at the first error.
+                When set, the first error is raised once the other files are
+                uploaded, see upload_files_concurrently to get every failure.
+            retries (int): Number of times a failed file upload is retried when
+                workers is set. Defaults to 2.
+            retry_backoff (float): Seconds to wait before the first retry of a file,
+                doubled for each further retry. Defaults to 1.0.
 
         Returns:
             list (:obj:`crux.models.File`): List of uploaded file objects.
@@ -480,6 +714,22 @@ class Dataset(CruxModel):
         if not os.path.exists(local_path) and not os.path.isdir(local_path):
             raise OSError("local_path is an invalid directory location")
 
+        if workers is not None:
+            summary = self.upload_files_concurrently(
+                local_path=local_path,
+                folder=folder,
+                media_type=media_type,
+                description=description,
+                tags=tags,
+                only_use_crux_domains=only_use_crux_domains,
+                workers=workers,
+                retries=retries,
+                retry_backoff=retry_backoff,
+            )
+            if summary.failed:
+                raise summary.failed[0][1]
+            return summary.uploaded
+
         for content in os.listdir(local_path):
             content_local_path = os.path.join(local_path, content)
             content_path = posixpath.join(folder, content)
@@ -509,8 +759,175 @@ class Dataset(CruxModel):
 
         return uploaded_file_objects
 
-    def list_files(self, sort=None, folder="/", cursor=None, limit=100):
-        # type: (str, str, str, int) -> List[File]
+    def upload_files_concurrently(  # pylint: disable=too-many-arguments,too-many-locals
+        self,
+        local_path,
+        folder,
+        media_type=None,
+        description=None,
+        tags=None,
+        only_use_crux_domains=None,
+        workers=DEFAULT_WORKERS,
+        retries=2,
+        retry_backoff=1.0,
+    ):
+        # type: (str, str, str, str, List[str], bool, int, int, float) -> UploadSummary
+        """Uploads the resources recursively and concurrently, reporting failures.
+
+        The folder tree is created level by level, then the files are uploaded on a
+        pool of threads. Instead of stopping at the first error, the files and
+        folders which failed are returned with the uploaded files.
+
+        Args:
+            local_path (str): Local OS Path from where the file resources should be
+                uploaded.
+            folder (str): Crux Dataset Folder where file resources
+                should be recursively uploaded.
+            media_type (str): Content Types of File resources to be uploaded.
+                Defaults to None.
+            description (str): Description to be set on uploaded resources.
+                Defaults to None.
+            tags (:obj:`list` of :obj:`str`): Tags to be set on uploaded resources.
+                Defaults to None.
+            only_use_crux_domains (bool): True if content is required to be downloaded
+                from Crux domains else False.
+            workers (int): Number of files to upload concurrently.
+                Defaults to DEFAULT_WORKERS.
+            retries (int): Number of times a failed file upload is retried.
+                Defaults to 2.
+            retry_backoff (float): Seconds to wait before the first retry of a file,
+                doubled for each further retry. Defaults to 1.0.
+
+        Returns:
+            crux.models.dataset.UploadSummary: Uploaded file objects, and local paths
+                of the files and folders which failed.
+
+        Raises:
+            ValueError: If folder or local_path is None.
+            OSError: If local_path is an invalid directory location.
+        """
+        tags = tags if tags else []
+
+        if folder is None:
+            raise ValueError("Folder value shouldn't be empty")
+
+        if local_path is None:
+            raise ValueError("Local Path value shouldn't be empty")
+
+        if not os.path.exists(local_path) and not os.path.isdir(local_path):
+            raise OSError("local_path is an invalid directory location")
+
+        summary = UploadSummary()
+
+        folder_levels, file_paths = _walk_upload_tree(local_path, folder)
+
+        failed_dirs = []  # type: List[str]
+
+        def under_failed_dir(content_local_path):
+            return any(
+                content_local_path.startswith(failed_dir + os.sep)
+                for failed_dir in failed_dirs
+            )
+
+        with get_executor(max_workers=workers) as executor:
+            for depth in sorted(folder_levels):
+                futures = {}
+                for dir_local_path, dir_path in folder_levels[depth]:
+                    if under_failed_dir(dir_local_path):
+                        continue
+                    future = executor.submit(
+                        self.create_folder,
+                        path=dir_path,
+                        tags=tags,
+                        description=description,
+                    )
+                    futures[future] = dir_local_path
+                for future in as_completed(futures):
+                    try:
+                        future.result()
+                    except (CruxClientError, CruxAPIError) as err:
+                        dir_local_path = futures[future]
+                        log.debug("Failed creating folder %s: %s", dir_local_path, err)
+                        failed_dirs.append(dir_local_path)
+                        summary.failed.append((dir_local_path, err))
+
+            upload_futures = {}
+            for file_local_path, file_path in file_paths:
+                if under_failed_dir(file_local_path):
+                    continue
+                upload_future = executor.submit(
+                    self._upload_file_with_retries,
+                    file_local_path,
+                    file_path,
+                    media_type=media_type,
+                    tags=tags,
+                    description=description,
+                    only_use_crux_domains=only_use_crux_domains,
+                    retries=retries,
+                    retry_backoff=retry_backoff,
+                )
+                upload_futures[upload_future] = file_local_path
+            for upload_future in as_completed(upload_futures):
+                file_local_path = upload_futures[upload_future]
+                try:
+                    summary.uploaded.append(upload_future.result())
+                except (CruxClientError, CruxAPIError, IOError, LookupError) as err:
+                    log.debug("Failed uploading file %s: %s", file_local_path, err)
+                    summary.failed.append((file_local_path, err))
+
+        return summary
+
+    def _upload_file_with_retries(  # pylint: disable=too-many-arguments
+        self,
+        src,
+        dest,
+        media_type=None,
+        tags=None,
+        description=None,
+        only_use_crux_domains=None,
+        retries=2,
+        retry_backoff=1.0,
+    ):
+        # type: (str, str, str, List[str], str, bool, int, float) -> File
+        """Uploads the File, retrying with exponential backoff on failure."""
+        attempt = 0
+        while True:
+            try:
+                file_object = self.upload_file(
+                    src,
+                    dest,
+                    media_type=media_type,
+                    tags=tags,
+                    description=description,
+                    only_use_crux_domains=only_use_crux_domains,
+                )
+                log.debug("Uploaded file %s in dataset %s", dest, self.id)
+                return file_object
+            except (CruxClientError, CruxAPIError, IOError) as err:
+                if attempt >= retries:
+                    raise
+                delay = retry_backoff * (2 ** attempt)
+                attempt += 1
+                log.debug(
+                    "Retrying upload of %s in %s seconds (attempt %s): %s",
+                    dest,
+                    delay,
+                    attempt,
+                    err,
+                )
+                time.sleep(delay)
+
+    @profiled
+    def list_files(
+        self,
+        sort=None,
+        folder="/",
+        cursor=None,
+        limit=100,
+        prefetch=None,
+        as_table=False,
+    ):
+        # type: (str, str, str, int, int, bool) -> Union[Iterator[File], ResourceTable]
         """Lists the files.
 
         Args:
@@ -519,23 +936,88 @@ class Dataset(CruxModel):
                 Defaults to /.
             cursor (str): Sets the offset to the page cursor. Defaults to None.
             limit (int): Sets the limit. Defaults to 100.
+            prefetch (int): Number of pages to fetch ahead on a background thread
+                while the current page is processed. Defaults to None.
+            as_table (bool): Lists all files into a ResourceTable, which keeps
+                their common fields in columns and builds File objects on request,
+                instead of yielding File objects. Defaults to False.
 
         Returns:
-            list (:obj:`crux.models.File`): List of File objects.
+            list (:obj:`crux.models.File`): List of File objects, or a
+                crux.models.ResourceTable if as_table is set.
         """
-        resource_list_gen = self._list_resources(
+        pages = self._resource_pages(
             sort=sort,
             folder=folder,
             cursor=cursor,
             limit=limit,
             include_folders=False,
             model=File,
+            prefetch=prefetch,
         )
 
-        for resource in resource_list_gen:
-            if resource.type == "file":
+        if as_table:
+            table = ResourceTable(dataset_id=self.id, connection=self.connection)
+            for page in pages:
+                table.extend(
+                    (raw for raw in page.raw_items if raw.get("type") == "file"),
+                    folder=folder,
+                )
+            return table
+
+        return self._iter_files(pages)
+
+    @staticmethod
+    def _iter_files(pages):
+        # type: (Iterator[LazyModelList]) -> Iterator[File]
+        for page in pages:
+            # Skip non-file resources before any model object is built.
+            for resource in page.filter(lambda raw: raw.get("type") == "file"):
                 yield resource
 
+    @profiled
+    def list_resource_pages(
+        self,
+        folder="/",
+        cursor=None,
+        limit=None,
+        include_folders=False,
+        sort=None,
+        prefetch=None,
+    ):
+        # type: (str, str, int, bool, str, int) -> Iterator[LazyModelList]
+        """Lists the resources page by page, without building resource objects.
+
+        Each page is a LazyModelList: its length and decoded resources are
+        available from len() and raw_items, and a Resource object is only built
+        when an element is accessed. This suits callers which count resources,
+        filter them by name or collect their IDs.
+
+        Args:
+            folder (str): Folder for which resource should be listed.
+                Defaults to /.
+            cursor (str): Sets the offset to the page cursor. Defaults to None.
+            limit (int): Maximum number of resources listed. Defaults to None,
+                which lists all of them.
+            include_folders (bool): Sets whether to include folders or not.
+                Defaults to False.
+            sort (str): Sets whether to sort or not. Defaults to None.
+            prefetch (int): Number of pages to fetch ahead on a background thread
+                while the current page is processed. Defaults to None.
+
+        Returns:
+            iterator (:obj:`crux._lazy.LazyModelList`): Pages of Resource objects.
+        """
+        return self._resource_pages(
+            folder=folder,
+            cursor=cursor,
+            limit=limit,
+            include_folders=include_folders,
+            model=Resource,
+            sort=sort,
+            prefetch=prefetch,
+        )
+
     def _list_resources(
         self,
         folder="/",
@@ -545,10 +1027,60 @@ class Dataset(CruxModel):
         name=None,
         model=None,
         sort=None,
+        prefetch=None,
     ):
+        pages = self._resource_pages(
+            folder=folder,
+            cursor=cursor,
+            limit=limit,
+            include_folders=include_folders,
+            name=name,
+            model=model,
+            sort=sort,
+            prefetch=prefetch,
+        )
 
+        for page in pages:
+            for resource in page:
+                yield resource
+
+    def _resource_pages(
+        self,
+        folder="/",
+        cursor=None,
+        limit=1,
+        include_folders=False,
+        name=None,
+        model=None,
+        sort=None,
+        prefetch=None,
+    ):
+        """Yields the pages of a resource listing as LazyModelList objects."""
         headers = Headers({"content-type": "application/json", "accept": "application/json"})
 
+        params = self._list_resources_params(
+            folder=folder,
+            cursor=cursor,
+            include_folders=include_folders,
+            name=name,
+            sort=sort,
+        )
+
+        pages = self._iter_resource_pages(
+            params=params, limit=limit, model=model, headers=headers
+        )
+
+        # Fetch the next pages on a background thread while the caller
+        # processes the current one.
+        if prefetch:
+            pages = prefetched(pages, depth=prefetch)
+
+        for page in pages:
+            yield page
+
+    def _list_resources_params(self, folder, cursor, include_folders, name, sort):
+        # type: (str, str, bool, str, str) -> Dict[str, Any]
+        """Returns the query parameters of a resource listing."""
         params = {"datasetId": self.id, "folder": folder}
 
         if cursor:
@@ -565,11 +1097,17 @@ class Dataset(CruxModel):
         else:
             params["includeFolders"] = "false"
 
+        return params
+
+    def _iter_resource_pages(self, params, limit, model, headers):
+        """Fetches pages of resources, following the cursor until limit is reached.
+
+        Pages are LazyModelList objects, which build models when accessed.
+        """
         retrieved = 0
-        pagesize = 500
         paginate = {}
         while limit is None or retrieved < limit:
-            params["limit"] = None if limit is None else min(pagesize, limit - retrieved)
+            params["limit"] = _page_limit(limit, retrieved)
 
             resp = self.connection.api_call(
                 "GET",
@@ -578,14 +1116,14 @@ class Dataset(CruxModel):
                 model=model,
                 headers=headers,
                 paginate=paginate,
+                lazy=True,
             )
             resp_count = len(resp)
 
             if resp_count == 0:
                 break
 
-            for resource in resp:
-                yield resource
+            yield resp
 
             retrieved += resp_count
             params["cursor"] = paginate["cursor"]
@@ -625,8 +1163,10 @@ class Dataset(CruxModel):
             )
         except (CruxClientError, CruxAPIError, IOError):
             file_resource.delete()
+            self.invalidate_path_index(split_posixpath_filename_dirpath(dest)[1])
             raise
 
+    @profiled
     def add_permission_to_resources(
         self,
         identity_id,
@@ -707,6 +1247,7 @@ class Dataset(CruxModel):
             "POST", ["permissions", "bulk"], headers=headers, json=body
         )
 
+    @profiled
     def delete_permission_from_resources(
         self,
         identity_id,
@@ -899,6 +1440,7 @@ class Dataset(CruxModel):
             model=Label,
         )
 
+    @profiled
     def find_resources_by_label(self, predicates, max_per_page=1000):
         # type: (List[Dict[str,str]],int)->Iterator[Union[File,Folder]]
         """Method which searches the resouces for given labels in Dataset
@@ -981,7 +1523,7 @@ class Dataset(CruxModel):
                 params=query_params,
             )
 
-            resource_list = response.json().get("results")
+            resource_list = self.connection.json(response).get("results")
             if resource_list:
                 after = resource_list[-1].get("resourceId")
                 for resource in resource_list:
@@ -994,6 +1536,7 @@ class Dataset(CruxModel):
             else:
                 return
 
+    @profiled
     def stitch(
         self,
         source_resources,
@@ -1065,11 +1608,11 @@ class Dataset(CruxModel):
             "POST", ["datasets", self.id, "stitch"], headers=headers, json=data
         )
 
-        raw_json = response.json().get("destinationResource")
+        raw_json = self.connection.json(response).get("destinationResource")
 
         file_object = Resource.from_dict(raw_json, connection=self.connection)
 
-        job_id = response.json().get("jobId")
+        job_id = self.connection.json(response).get("jobId")
 
         return (file_object, job_id)
 
@@ -1140,7 +1683,7 @@ class Dataset(CruxModel):
             "GET", ["v1", "deliveries", self.id, "ids"], headers=headers, params=params
         )
 
-        response_json = response.json()
+        response_json = self.connection.json(response)
         if isinstance(response_json, dict):
             all_deliveries = response_json.get("delivery_ids")
         else:
@@ -1166,6 +1709,7 @@ class Dataset(CruxModel):
             yield obj
 
 
+    @profiled
     def get_latest_files(
         self,
         frames=None,
@@ -1208,7 +1752,9 @@ class Dataset(CruxModel):
             )
         elif isinstance(cutoff_date, str):
             try:
-                codt = parser.parse(cutoff_date, dayfirst=dayfirst, yearfirst=yearfirst)
+                codt = parse_datetime(
+                    cutoff_date, dayfirst=dayfirst, yearfirst=yearfirst
+                )
                 codt = datetime(year=codt.year, month=codt.month, day=codt.day)
             except:
                 raise ValueError("Value of start_date is invalid")
@@ -1253,6 +1799,7 @@ class Dataset(CruxModel):
             )
         return found_files
 
+    @profiled
     def get_files_range(
         self,
         start_date=None,  # type: Optional[Union[datetime, str]]
@@ -1264,6 +1811,7 @@ class Dataset(CruxModel):
         latest_only=False,  # type: bool
         delivery_status=None,  # type: str
         use_cache=None,  # type: bool
+        max_workers=DEFAULT_WORKERS,  # type: int
     ):
         # type: (...) -> Iterator[File]
         """Get a set of dataset file resources. The best single delivery version for each
@@ -1280,11 +1828,168 @@ class Dataset(CruxModel):
             latest_only (bool): Return latest files only
             delivery_status (str): Delivery status enum
             use_cache (bool): Preference to set cached response
+            max_workers (int): Number of delivery data requests in flight at once.
+                Defaults to DEFAULT_WORKERS.
 
         Returns:
             list (:obj:`crux.models.File`): List of file resources.
         """
 
+        selection = _FilesRangeSelection(
+            start_date=start_date,
+            end_date=end_date,
+            frames=frames,
+            file_format=file_format,
+            dayfirst=dayfirst,
+            yearfirst=yearfirst,
+            latest_only=latest_only,
+            delivery_status=delivery_status,
+        )
+
+        headers = Headers({"accept": "application/json"})
+        use_cache = True if use_cache is None else use_cache
+        response = self.connection.api_call(
+            "GET",
+            ["v1", "deliveries", self.id, "ids"],
+            headers=headers,
+            params=selection.delivery_ids_params(use_cache),
+        )
+        select_deliveries = selection.select_deliveries(self.connection.json(response))
+
+        use_catalog = selection.use_catalog
+        with get_executor(max_workers=max_workers) as executor:
+            futures = dict(
+                (
+                    executor.submit(
+                        self._get_delivery_data,
+                        d_id,
+                        selection.file_format,
+                        use_catalog,
+                    ),
+                    d_id,
+                )
+                for d_id in select_deliveries
+            )
+            for future in as_completed(futures):
+                selection.add_manifest(futures[future], future.result())
+
+        resource_ids = selection.resource_ids()
+        for file in self._get_delivery_resources(resource_ids, use_catalog):
+            selection.add_file(file)
+
+        for file in selection.files():
+            yield file
+
+    def _get_delivery_data(self, delivery_id, file_format, use_catalog=False):
+        # type: (str, str, bool) -> Dict
+        """Fetches the processed data manifest of a delivery.
+
+        If use_catalog is set and the connection has a delivery catalog, the
+        manifest is read from the catalog, or stored in it once fetched.
+        """
+        catalog = self.connection.delivery_catalog if use_catalog else None
+        if catalog is not None:
+            manifest = catalog.get_manifest(self.id, delivery_id, file_format)
+            if manifest is not None:
+                log.trace("Delivery %s manifest found in catalog", delivery_id)
+                return manifest
+
+        params = {"delivery_resource_format": file_format}
+        response = self.connection.api_call(
+            "GET", ["v1", "deliveries", self.id, delivery_id, "data"], params=params
+        )
+        manifest = self.connection.json(response)
+
+        if catalog is not None:
+            catalog.put_manifest(self.id, delivery_id, file_format, manifest)
+        return manifest
+
+    def _get_delivery_resources(self, resource_ids, use_catalog=False):
+        # type: (List[str], bool) -> Iterator[File]
+        """Gets delivered file resources, only fetching those missing from the catalog.
+
+        Yields:
+            crux.models.File: File objects, in the order of resource_ids.
+        """
+        catalog = self.connection.delivery_catalog if use_catalog else None
+        if catalog is None:
+            for file_object in self.get_resources_batch(resource_ids):
+                yield file_object
+            return
+
+        raw_models = catalog.get_resources(resource_ids)
+        missing_ids = [rid for rid in resource_ids if rid not in raw_models]
+        log.debug(
+            "Found %s resources in catalog, fetching %s",
+            len(raw_models),
+            len(missing_ids),
+        )
+        if missing_ids:
+            fetched = [
+                file_object.raw_model
+                for file_object in self.get_resources_batch(missing_ids)
+            ]
+            catalog.put_resources(self.id, fetched)
+            for raw_model in fetched:
+                raw_models[raw_model["resourceId"]] = raw_model
+
+        for resource_id in resource_ids:
+            if resource_id in raw_models:
+                raw_model = raw_models[resource_id]
+                yield File(raw_model=raw_model, connection=self.connection)
+
+    @profiled
+    def get_resources_batch(
+        self, resource_ids, batch_size=DEFAULT_BATCH_SIZE, max_workers=DEFAULT_WORKERS
+    ):
+        # type: (List[str], int, int) -> Iterator[File]
+        """Gets resource metadata.
+
+        Resource IDs are fetched with concurrent batch requests.
+
+        Args:
+            resource_ids (list): List of resource IDs
+            batch_size (int): Number of resource IDs per batch request.
+                Defaults to DEFAULT_BATCH_SIZE.
+            max_workers (int): Number of batch requests in flight at once.
+                Defaults to DEFAULT_WORKERS.
+
+        Returns:
+            list (:obj:`crux.models.File`): List of file resources, in the order
+                of resource_ids.
+        """
+        return get_resources_batch(
+            resource_ids,
+            connection=self.connection,
+            batch_size=batch_size,
+            max_workers=max_workers,
+        )
+
+
+def _page_limit(limit, retrieved):
+    # type: (Optional[int], int) -> Optional[int]
+    """Returns the size of the next listing page, None for unlimited listings."""
+    return None if limit is None else min(RESOURCE_PAGE_SIZE, limit - retrieved)
+
+
+class _FilesRangeSelection(object):
+    """Selects the best delivered file of each frame and date for get_files_range.
+
+    Only the selection lives here, so it is shared by the clients which fetch
+    delivery IDs, manifests and resources in their own way.
+    """
+
+    def __init__(  # pylint: disable=too-many-arguments,too-many-branches
+        self,
+        start_date,
+        end_date,
+        frames,
+        file_format,
+        dayfirst,
+        yearfirst,
+        latest_only,
+        delivery_status,
+    ):
         if isinstance(frames, list):
             frames = set([x.upper() for x in frames])
         elif isinstance(frames, str):
@@ -1305,14 +2010,13 @@ class Dataset(CruxModel):
             stdt = start_date.date()
         elif isinstance(start_date, str):
             try:
-                stdt = parser.parse(start_date, dayfirst=dayfirst, yearfirst=yearfirst)
+                stdt = parse_datetime(
+                    start_date, dayfirst=dayfirst, yearfirst=yearfirst
+                )
             except:
                 raise ValueError("Value of start_date is invalid")
         else:
             raise ValueError("start_date must be str or datetime")
-        stdt = (
-            None if stdt is None else datetime(year=stdt.year, month=stdt.month, day=stdt.day)
-        )
 
         if end_date is None:
             enddt = None
@@ -1320,122 +2024,191 @@ class Dataset(CruxModel):
             enddt = end_date.date()
         elif isinstance(end_date, str):
             try:
-                enddt = parser.parse(end_date, dayfirst=dayfirst, yearfirst=yearfirst)
+                enddt = parse_datetime(end_date, dayfirst=dayfirst, yearfirst=yearfirst)
             except:
                 raise ValueError("Value of end_date is invalid")
         else:
             raise ValueError("date must be str or datetime")
-        enddt = (
+
+        self.frames = frames
+        self.file_format = file_format
+        self.stdt = (
+            None
+            if stdt is None
+            else datetime(year=stdt.year, month=stdt.month, day=stdt.day)
+        )
+        self.enddt = (
             None
             if enddt is None
             else datetime(year=enddt.year, month=enddt.month, day=enddt.day) + fullday
         )
+        # Dates of files are compared as ISO strings.
+        self.start_iso = None if self.stdt is None else self.stdt.isoformat()
+        self.end_iso = None if self.enddt is None else self.enddt.isoformat()
+        self.latest_only = latest_only
+        self.delivery_status = (
+            "DELIVERY_SUCCEEDED" if delivery_status is None else delivery_status
+        )
+        self.frame_resources = {}  # type: Dict[str, Dict[str, Any]]
+        self.resource_delivery_ids = {}  # type: Dict[str, str]
+        self.delivery_order = {}  # type: Dict[str, int]
+        self.process_frames = set()  # type: Set[str]
 
-        headers = Headers({"accept": "application/json"})
-        delivery_status = "DELIVERY_SUCCEEDED" if delivery_status is None else delivery_status
-        use_cache = True if use_cache is None else use_cache
-        params = {
-            "start_date": datetime.isoformat(stdt),
-            "end_date": None if enddt is None else datetime.isoformat(enddt + timedelta(days=3)),
-            "delivery_status": delivery_status,
+    @property
+    def use_catalog(self):
+        # type: () -> bool
+        """bool: Only successful deliveries are final and can be kept in the catalog."""
+        return self.delivery_status == "DELIVERY_SUCCEEDED"
+
+    def delivery_ids_params(self, use_cache):
+        # type: (bool) -> Dict[str, Any]
+        """Returns the query parameters listing the delivery IDs of the range."""
+        return {
+            "start_date": datetime.isoformat(self.stdt),
+            "end_date": (
+                None
+                if self.enddt is None
+                else datetime.isoformat(self.enddt + timedelta(days=3))
+            ),
+            "delivery_status": self.delivery_status,
             "use_cache": use_cache,
         }
-        response = self.connection.api_call(
-            "GET", ["v1", "deliveries", self.id, "ids"], headers=headers, params=params
-        )
-        response_json = response.json()
+
+    def select_deliveries(self, response_json):
+        # type: (Any) -> List[str]
+        """Returns the delivery IDs whose manifests have to be fetched.
+
+        Raises:
+            ValueError: If a delivery ID is invalid.
+        """
         if isinstance(response_json, dict):
             all_deliveries = response_json.get("delivery_ids")
         else:
             all_deliveries = response_json
 
-        frame_resources = {}
-        resource_delivery_ids = {}
-        select_deliveries = all_deliveries[-20:] if latest_only else all_deliveries
+        select_deliveries = all_deliveries[-20:] if self.latest_only else all_deliveries
         for delivery_id in select_deliveries:
             if not DELIVERY_ID_REGEX.match(delivery_id):
                 raise ValueError("Value of delivery_id is invalid")
-            params = {"delivery_resource_format": file_format}
-            response = self.connection.api_call(
-                "GET", ["v1", "deliveries", self.id, delivery_id, "data"], params=params
-            )
-            data = response.json()
-            for item in data["resources"]:
-                frame_id = item["frame_id"].upper()
-                resource_id = item["resource_id"]
-                if frame_id not in frame_resources:
-                    frame_resources[frame_id] = {
-                        "resource_ids": [],
-                        "best_deliveries": {},
-                    }
-                frame_resources[frame_id]["resource_ids"].append(resource_id)
-                resource_delivery_ids[resource_id] = delivery_id
-
-        found_frames = set(frame_resources)
-        if frames is None:
-            process_frames = found_frames
+
+        # Later deliveries win when a resource is part of several, whatever order
+        # the concurrent requests finish in.
+        self.delivery_order = dict(
+            (d_id, pos) for pos, d_id in enumerate(select_deliveries)
+        )
+        return select_deliveries
+
+    def add_manifest(self, delivery_id, data):
+        # type: (str, Dict[str, Any]) -> None
+        """Adds the resources of a delivery manifest."""
+        for item in data["resources"]:
+            frame_id = item["frame_id"].upper()
+            resource_id = item["resource_id"]
+            if frame_id not in self.frame_resources:
+                self.frame_resources[frame_id] = {
+                    "resource_ids": [],
+                    "best_deliveries": {},
+                }
+            self.frame_resources[frame_id]["resource_ids"].append(resource_id)
+            previous_id = self.resource_delivery_ids.get(resource_id)
+            if (
+                previous_id is None
+                or self.delivery_order[delivery_id] > self.delivery_order[previous_id]
+            ):
+                self.resource_delivery_ids[resource_id] = delivery_id
+
+    def resource_ids(self):
+        # type: () -> List[str]
+        """Returns the IDs of the resources of the selected frames."""
+        found_frames = set(self.frame_resources)
+        if self.frames is None:
+            self.process_frames = found_frames
         else:
-            process_frames = frames.intersection(found_frames)
-            if found_frames and not found_frames.issuperset(frames):
-                unused_frames = found_frames - frames
+            self.process_frames = self.frames.intersection(found_frames)
+            if found_frames and not found_frames.issuperset(self.frames):
+                unused_frames = found_frames - self.frames
                 log.info(
-                    "One or more specified frames not found. Unused frames: %s", unused_frames
+                    "One or more specified frames not found. Unused frames: %s",
+                    unused_frames,
                 )
-        resource_ids = [i for s in process_frames for i in frame_resources[s]["resource_ids"]]
-        for file in self.get_resources_batch(resource_ids):
-            frame_id = file.frame_id.upper()
-            dt = (
-                file.supplier_implied_dt
-                if file.supplier_implied_dt is not None
-                else file.ingestion_time
+        # Manifests are added as their requests complete, so the IDs are put in
+        # delivery order to send the same batch requests whatever that order.
+        return [
+            resource_id
+            for frame_id in sorted(self.process_frames)
+            for resource_id in sorted(
+                self.frame_resources[frame_id]["resource_ids"],
+                key=lambda rid: self.delivery_order[self.resource_delivery_ids[rid]],
             )
-            if (not latest_only and stdt is not None and dt < stdt.isoformat()) or (
-                enddt is not None and dt > enddt.isoformat()
-            ):
-                continue
-            best_deliveries = frame_resources[frame_id]["best_deliveries"]
-            if (
-                dt not in best_deliveries
-                or file.ingestion_time > best_deliveries[dt].ingestion_time
-                or (
-                    file.ingestion_time == best_deliveries[dt].ingestion_time
-                    and resource_delivery_ids[file.id]
-                    > resource_delivery_ids[best_deliveries[dt].id]
-                )
-            ):
-                best_deliveries[dt] = file
+        ]
 
-        for frame_id in process_frames:
-            best_deliveries = frame_resources[frame_id]["best_deliveries"]
+    def add_file(self, file):
+        # type: (File) -> None
+        """Keeps file if it is the best delivery of its frame and date so far."""
+        frame_id = file.frame_id.upper()
+        dt = file.supplier_implied_dt
+        if dt is None:
+            dt = file.ingestion_time
+        start_iso, end_iso = self.start_iso, self.end_iso
+        if (not self.latest_only and start_iso is not None and dt < start_iso) or (
+            end_iso is not None and dt > end_iso
+        ):
+            return
+        best_deliveries = self.frame_resources[frame_id]["best_deliveries"]
+        if dt not in best_deliveries:
+            best_deliveries[dt] = file
+            return
+        ingestion_time = file.ingestion_time
+        best_ingestion_time = best_deliveries[dt].ingestion_time
+        if ingestion_time > best_ingestion_time or (
+            ingestion_time == best_ingestion_time
+            and self.resource_delivery_ids[file.id]
+            > self.resource_delivery_ids[best_deliveries[dt].id]
+        ):
+            best_deliveries[dt] = file
+
+    def files(self):
+        # type: () -> Iterator[File]
+        """Yields the selected files, by frame and in date order."""
+        for frame_id in sorted(self.process_frames):
+            best_deliveries = self.frame_resources[frame_id]["best_deliveries"]
             for cnt, dt in enumerate(sorted(best_deliveries), 1):
-                if latest_only and cnt != len(best_deliveries):
+                if self.latest_only and cnt != len(best_deliveries):
                     continue
                 yield best_deliveries[dt]
 
-    def get_resources_batch(self, resource_ids):
-        # type: (list) -> Iterator[File]
-        """Gets resource metadata.
 
-        Args:
-            resource_ids (list): List of resource IDs
+def _walk_upload_tree(local_path, folder):
+    # type: (str, str) -> Tuple[Dict[int, List[Tuple[str, str]]], List[Tuple[str, str]]]
+    """Walks the local tree once, mapping every folder and file to its dataset path.
 
-        Returns:
-            list (:obj:`crux.models.File`): List of file resources.
-        """
-        headers = Headers({"accept": "application/json"})
-        limit = 250
+    Args:
+        local_path (str): Local OS Path to walk.
+        folder (str): Crux Dataset Folder matching local_path.
 
-        for item_cnt, item in enumerate(resource_ids):
-            if item_cnt > 250:
-                break
-            response = self.connection.api_call(
-                "GET",
-                ["v1", "resources", item],
-                headers=headers
-             )
-            response_json = response.json()
-            obj =File(raw_model=response_json)
-            obj.connection = self.connection
-            yield obj
+    Returns:
+        tuple: Folders grouped by depth, so parents can be created before their
+            children, and the list of files. Both hold (local path, dataset path) pairs.
+    """
+    folder_levels = defaultdict(list)  # type: DefaultDict[int, List[Tuple[str, str]]]
+    file_paths = []  # type: List[Tuple[str, str]]
 
+    for dir_path, dir_names, file_names in os.walk(local_path):
+        relative_dir = os.path.relpath(dir_path, local_path)
+        if relative_dir == os.curdir:
+            remote_dir = folder
+            depth = 0
+        else:
+            parts = relative_dir.split(os.sep)
+            remote_dir = posixpath.join(folder, *parts)
+            depth = len(parts)
+        for name in dir_names:
+            folder_levels[depth].append(
+                (os.path.join(dir_path, name), posixpath.join(remote_dir, name))
+            )
+        for name in file_names:
+            file_paths.append(
+                (os.path.join(dir_path, name), posixpath.join(remote_dir, name))
+            )
 
+    return folder_levels, file_paths
@@ -1,8 +1,10 @@
 """Module contains Delivery model."""
 
-from typing import Dict, Iterator
+from typing import Dict, Iterator, List  # noqa: F401
 
 from crux._client import CruxClient
+from crux._profile import profiled
+from crux.models._factory import get_resources_batch
 from crux.models.file import File
 from crux.models.model import CruxModel
 from crux.models.resource import MediaType, Resource
@@ -53,16 +55,33 @@ class Delivery(CruxModel):
             response = self.connection.api_call(
                 "GET", ["v1", "deliveries", self.dataset_id, self.id]
             )
-            self._summary = response.json()
+            self._summary = self.connection.json(response)
         return self._summary
 
-    def get_data(self, file_format=MediaType.AVRO.value, use_cache=None):
-        # type: (str, bool) -> Iterator[Resource]
+    def _get_resources(self, resource_ids, hydrate):
+        # type: (List[str], bool) -> Iterator[File]
+        if not hydrate:
+            for resource_id in resource_ids:
+                yield File(
+                    raw_model={"resourceId": resource_id}, connection=self.connection
+                )
+            return
+
+        for obj in get_resources_batch(resource_ids, connection=self.connection):
+            yield obj
+
+    @profiled
+    def get_data(self, file_format=MediaType.AVRO.value, use_cache=None, hydrate=True):
+        # type: (str, bool, bool) -> Iterator[Resource]
         """Get the processed delivery data
 
         Args:
             file_format (str): File format of delivery.
             use_cache (bool): Preference to set cached response
+            hydrate (bool): Fetch the metadata of the resources, with concurrent
+                batch requests. If False, the File objects only carry their
+                resource ID, call refresh() on them to fetch their metadata.
+                Defaults to True.
 
         Returns:
             list (:obj:`crux.models.Resource`): List of resources.
@@ -76,21 +95,24 @@ class Delivery(CruxModel):
             "GET", ["v1", "deliveries", self.dataset_id, self.id, "data"], params=params
         )
 
-        resource_list = response.json()["resources"]
+        resource_list = self.connection.json(response)["resources"]
 
         if resource_list:
-            for resource in resource_list:
-                obj = File(raw_model={"resourceId": resource["resource_id"]})
-                obj.connection = self.connection
-                obj.refresh()
+            resource_ids = [resource["resource_id"] for resource in resource_list]
+            for obj in self._get_resources(resource_ids, hydrate):
                 yield obj
 
-    def get_raw(self, use_cache=None):
-        # type: (bool) -> Iterator[Resource]
+    @profiled
+    def get_raw(self, use_cache=None, hydrate=True):
+        # type: (bool, bool) -> Iterator[Resource]
         """Get the raw delivery data
 
         Args:
             use_cache (bool): Preference to set cached response
+            hydrate (bool): Fetch the metadata of the resources, with concurrent
+                batch requests. If False, the File objects only carry their
+                resource ID, call refresh() on them to fetch their metadata.
+                Defaults to True.
 
         Returns:
             list (:obj:`crux.models.Resource`): List of resources.
@@ -103,14 +125,10 @@ class Delivery(CruxModel):
             "GET", ["v1", "deliveries", self.dataset_id, self.id, "raw"], params=params
         )
 
-        resource_list = response.json()["resource_ids"]
+        resource_list = self.connection.json(response)["resource_ids"]
 
         if resource_list:
-            for resource in resource_list:
-                obj = File(
-                    raw_model={"resourceId": resource}, connection=self.connection
-                )
-                obj.refresh()
+            for obj in self._get_resources(resource_list, hydrate):
                 yield obj
 
     def get_healthlog(self, use_cache=None):
@@ -131,5 +149,5 @@ class Delivery(CruxModel):
             "GET", ["v1", "deliveries", self.id, "log"], params=params
         )
 
-        healthlog_list = response.json()
+        healthlog_list = self.connection.json(response)
         return healthlog_list
@@ -1,15 +1,18 @@
 """Module contains File model."""
 
-from typing import Any, Dict, IO, Iterable, List, Union  # noqa: F401
-
-from google.resumable_media.common import (  # type: ignore
-    DataCorruption,
-    InvalidResponse,
-)
-from google.resumable_media.requests import (  # type: ignore
-    ChunkedDownload,
-    ResumableUpload,
+from concurrent.futures import as_completed
+import threading
+from typing import (  # noqa: F401
+    Any,
+    Callable,
+    Dict,
+    IO,
+    Iterable,
+    List,
+    Optional,
+    Union,
 )
+
 from requests.exceptions import (
     ConnectTimeout,
     HTTPError,
@@ -20,10 +23,13 @@ from requests.exceptions import (
 )
 
 from crux._compat import unicode
+from crux._profile import profiled
+from crux._signed_urls import signed_url_expiry
 from crux._utils import (
     create_logger,
     DEFAULT_CHUNK_SIZE,
-    get_session,
+    get_executor,
+    get_shared_session,
     Headers,
     ResumableUploadSignedSession,
     valid_chunk_size,
@@ -40,11 +46,60 @@ from crux.models.resource import MediaType, Resource
 
 log = create_logger(__name__)
 
+# Status codes returned by storage when a signed URL has expired or been revoked.
+SIGNED_URL_EXPIRED_STATUS_CODES = (400, 401, 403)
+
+
+class _SharedSignedURL(object):
+    """Signed URL shared between concurrent range downloads.
+
+    When a range download finds the URL expired, it asks for a refresh. Only the
+    first request for a given stale URL fetches a new one, other workers pick
+    up the already refreshed URL.
+    """
+
+    def __init__(self, fetch, max_refreshes=100):
+        # type: (Callable[..., str], int) -> None
+        self._fetch = fetch
+        self._lock = threading.Lock()
+        self._max_refreshes = max_refreshes
+        self.refreshes = 0
+        self.url = fetch()  # type: str
+
+    def refresh(self, stale_url):
+        # type: (str) -> str
+        """Returns a fresh signed URL, fetching it if stale_url is still current.
+
+        Raises:
+            CruxClientError: If the maximum number of new signed URLs is exceeded.
+        """
+        with self._lock:
+            if self.url == stale_url:
+                if self.refreshes >= self._max_refreshes:
+                    raise CruxClientError("Exceeded max new Signed URLs")
+                self.url = self._fetch(stale_url=stale_url)
+                self.refreshes += 1
+                log.debug(
+                    "fetched_signed_urls count for download is %s", self.refreshes
+                )
+            return self.url
+
 
 class File(Resource):
     """File Model."""
 
-    def _get_signed_url(self):
+    def _get_signed_url(self, stale_url=None):
+        # type: (str) -> str
+        """Returns a signed URL for the content, cached until the URL expires.
+
+        Args:
+            stale_url (str): URL rejected by storage, which is dropped from the cache
+                so a new one is fetched. Defaults to None.
+        """
+        url = self._cached_signed_url(stale_url)
+        if url is not None:
+            return url
+
         headers = Headers(
             {"content-type": "application/json", "accept": "application/json"}
         )
@@ -52,31 +107,67 @@ class File(Resource):
             "GET", ["v2", "resources", self.id, "content-url"], headers=headers, json={}
         )
 
-        url = response.json().get("url")
+        return self._store_signed_url(self.connection.json(response))
+
+    def _cached_signed_url(self, stale_url=None):
+        # type: (str) -> Optional[str]
+        """Returns the cached signed URL, dropping stale_url from the cache first."""
+        cache = self.connection.signed_url_cache
+        if cache is None:
+            return None
+
+        if stale_url is not None:
+            cache.invalidate(self.id, stale_url)
+        url = cache.get(self.id)
+        if url is not None:
+            log.debug("Using cached signed url for resource %s", self.id)
+        return url
+
+    def _store_signed_url(self, response_json):
+        # type: (Dict[str, Any]) -> str
+        """Returns the signed URL of a content-url response, caching it."""
+        url = response_json.get("url")
 
         if not url:
             raise KeyError(
                 "Signed URL missing in response for resource {id}".format(id=self.id)
             )
 
+        cache = self.connection.signed_url_cache
+        if cache is not None:
+            cache.put(self.id, url, expires_at=signed_url_expiry(url, response_json))
+
         return url
 
+    def _get_from_signed_url(self, session, signed_url):
+        """Starts streaming signed_url, with a new signed URL if storage rejects it."""
+        response = session.get(signed_url, stream=True)
+        if response.status_code in SIGNED_URL_EXPIRED_STATUS_CODES:
+            response.close()
+            log.debug("Signed url rejected, refreshing it for resource %s", self.id)
+            signed_url = self._get_signed_url(stale_url=signed_url)
+            response = session.get(signed_url, stream=True)
+        return response
+
     def _dl_signed_url(self, file_obj, chunk_size=DEFAULT_CHUNK_SIZE):
         """Download from signed URL using requests directly, not google-resumable-media."""
         signed_url = self._get_signed_url()
 
         log.trace("Using direct signed url: %s", signed_url)
 
-        transport = get_session(proxies=self.connection.crux_config.proxies)
+        transport = self.connection.crux_config.storage_session
 
         log.debug("Using Proxies %s for downloading", transport.proxies)
 
         try:
-            with transport as session:
-                response = session.get(signed_url, stream=True)
+            response = self._get_from_signed_url(transport, signed_url)
+            try:
                 response.raise_for_status()
                 for chunk in response.iter_content(chunk_size=chunk_size):
                     file_obj.write(chunk)
+            finally:
+                # Release the connection back to the shared pool.
+                response.close()
         except HTTPError as err:
             raise CruxClientHTTPError(str(err), err.response)
         except TooManyRedirects as err:
@@ -90,11 +181,19 @@ class File(Resource):
 
     def _dl_signed_url_resumable(self, file_obj, chunk_size=DEFAULT_CHUNK_SIZE):
         """Download from signed URL using google-resumable-media."""
+        # google-resumable-media is only imported by the transfers using it.
+        # pylint: disable=import-outside-toplevel
+        from google.resumable_media.common import (  # type: ignore
+            DataCorruption,
+            InvalidResponse,
+        )
+        from google.resumable_media.requests import ChunkedDownload  # type: ignore
+
         signed_url = self._get_signed_url()
 
         log.trace("Using resumable signed url: %s", signed_url)
 
-        transport = get_session(proxies=self.connection.crux_config.proxies)
+        transport = self.connection.crux_config.storage_session
 
         log.debug("Using Proxies %s for downloading", transport.proxies)
 
@@ -129,7 +228,7 @@ class File(Resource):
                 if not sum_total_bytes_from_urls > bytes_at_last_refresh:
                     # Limit new URLs without making progress downloading
                     if refreshes_without_progress <= max_url_refreshes_without_progress:
-                        new_signed_url = self._get_signed_url()
+                        new_signed_url = self._get_signed_url(stale_url=signed_url)
                         fetched_signed_urls += 1
                         log.debug(
                             "fetched_signed_urls count for download is %s",
@@ -150,7 +249,7 @@ class File(Resource):
                 else:
                     refreshes_without_progress = 0
                     log.debug("Fetching new singed url")
-                    new_signed_url = self._get_signed_url()
+                    new_signed_url = self._get_signed_url(stale_url=signed_url)
                     log.trace("New signed url: %s", new_signed_url)
                     fetched_signed_urls += 1
                     log.debug(
@@ -167,8 +266,9 @@ class File(Resource):
                     new_signed_url,
                     sum_total_bytes_from_urls,
                 )
+                signed_url = new_signed_url
                 download = ChunkedDownload(
-                    new_signed_url,
+                    signed_url,
                     chunk_size,
                     file_obj,
                     start=sum_total_bytes_from_urls,
@@ -176,12 +276,155 @@ class File(Resource):
             except DataCorruption as err:
                 raise CruxClientError(err)
 
-        # Closing the session as it is not closed by Resumable Media Lib.
-        transport.close()
         log.debug("Download completed using signed url for resource %s", self.id)
 
         return True
 
+    def _dl_signed_url_range(  # pylint: disable=too-many-arguments
+        self, session, signed_url, file_obj, write_lock, start, end, chunk_size, aborted
+    ):
+        """Download bytes start to end (inclusive) and write them at their offset."""
+        max_url_refreshes_without_progress = 5
+        refreshes_without_progress = 0
+        position = start
+        url = signed_url.url
+
+        while position <= end and not aborted.is_set():
+            headers = {"range": "bytes={start}-{end}".format(start=position, end=end)}
+            response = session.get(url, headers=headers, stream=True)
+            try:
+                # Catch the signed URL expiring
+                if response.status_code in SIGNED_URL_EXPIRED_STATUS_CODES:
+                    if refreshes_without_progress >= max_url_refreshes_without_progress:
+                        raise CruxClientError(
+                            "Exceeded max new Signed URLs without progress"
+                        )
+                    refreshes_without_progress += 1
+                    log.debug(
+                        "Refreshing signed url for range %s-%s of resource %s",
+                        position,
+                        end,
+                        self.id,
+                    )
+                    url = signed_url.refresh(url)
+                    continue
+
+                response.raise_for_status()
+
+                if response.status_code != 206:
+                    raise CruxClientError(
+                        "Storage did not honour range request for resource {id}".format(
+                            id=self.id
+                        )
+                    )
+
+                received_from = position
+                for chunk in response.iter_content(chunk_size=chunk_size):
+                    if aborted.is_set():
+                        break
+                    with write_lock:
+                        file_obj.seek(position)
+                        file_obj.write(chunk)
+                    position += len(chunk)
+
+                # An empty or truncated response is retried from where it stopped,
+                # as long as retries make progress.
+                if position > received_from:
+                    refreshes_without_progress = 0
+                elif refreshes_without_progress >= max_url_refreshes_without_progress:
+                    raise CruxClientError(
+                        "Storage returned no content for range {start}-{end} of "
+                        "resource {id}".format(start=position, end=end, id=self.id)
+                    )
+                else:
+                    refreshes_without_progress += 1
+            finally:
+                response.close()
+
+        return True
+
+    def _dl_signed_url_parallel(
+        self, file_obj, chunk_size=DEFAULT_CHUNK_SIZE, workers=None
+    ):
+        """Download from signed URL in concurrent ranges into a preallocated file."""
+        signed_url = _SharedSignedURL(self._get_signed_url)
+
+        log.trace("Using parallel signed url: %s", signed_url.url)
+
+        transport = self.connection.crux_config.storage_session
+
+        log.debug("Using Proxies %s for downloading", transport.proxies)
+
+        # Preallocate the file so every range can be written at its own offset.
+        file_obj.seek(0)
+        file_obj.truncate(self.size)
+
+        write_lock = threading.Lock()
+        aborted = threading.Event()
+        ranges = [
+            (start, min(start + chunk_size, self.size) - 1)
+            for start in range(0, self.size, chunk_size)
+        ]
+
+        log.debug(
+            "Starting download of %s ranges with %s workers for resource %s",
+            len(ranges),
+            workers,
+            self.id,
+        )
+
+        try:
+            with get_executor(max_workers=workers) as executor:
+                futures = [
+                    executor.submit(
+                        self._dl_signed_url_range,
+                        transport,
+                        signed_url,
+                        file_obj,
+                        write_lock,
+                        start,
+                        end,
+                        chunk_size,
+                        aborted,
+                    )
+                    for start, end in ranges
+                ]
+                try:
+                    for future in as_completed(futures):
+                        future.result()
+                except BaseException:
+                    # Stop the remaining ranges before the executor waits for them.
+                    aborted.set()
+                    for future in futures:
+                        future.cancel()
+                    raise
+        except HTTPError as err:
+            raise CruxClientHTTPError(str(err), err.response)
+        except TooManyRedirects as err:
+            raise CruxClientTooManyRedirects(str(err))
+        except (ProxyError, SSLError) as err:
+            raise CruxClientConnectionError(str(err))
+        except (ConnectTimeout, ReadTimeout) as err:
+            raise CruxClientTimeout(str(err))
+
+        log.debug(
+            "Download completed using parallel signed url for resource %s", self.id
+        )
+
+        return True
+
+    def delete(self):
+        # type: () -> bool
+        """Deletes File from Dataset.
+
+        Returns:
+            bool: True if it is deleted.
+        """
+        if self.connection.signed_url_cache is not None:
+            self.connection.signed_url_cache.invalidate(self.id)
+        return super(File, self).delete()
+
+    @profiled
     def iter_content(self, chunk_size=DEFAULT_CHUNK_SIZE, only_use_crux_domains=None):
         # type: (int, bool) -> Iterable[str]
         """Streams the file resource.
@@ -219,13 +462,17 @@ class File(Resource):
         log.debug("Using Resumable Signed url for streaming file resource %s", self.id)
 
         signed_url = self._get_signed_url()
-        session = get_session(proxies=self.connection.crux_config.proxies)
-        data = session.get(signed_url, stream=True)
+        session = self.connection.crux_config.storage_session
+        data = self._get_from_signed_url(session, signed_url)
 
         return data.iter_content(chunk_size=chunk_size)
 
     def _download_file(
-        self, file_obj, chunk_size=DEFAULT_CHUNK_SIZE, only_use_crux_domains=None
+        self,
+        file_obj,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        only_use_crux_domains=None,
+        workers=None,
     ):
 
         # If size is None it means the file has been created,
@@ -259,6 +506,15 @@ class File(Resource):
                 "Using Direct Signed url for downloading file resource %s", self.id
             )
             return self._dl_signed_url(file_obj=file_obj, chunk_size=chunk_size)
+        # Fetch byte ranges concurrently when workers are requested and the file
+        # object can be written at arbitrary offsets.
+        elif workers is not None and workers > 1 and _is_seekable(file_obj):
+            log.debug(
+                "Using Parallel Signed url for downloading file resource %s", self.id
+            )
+            return self._dl_signed_url_parallel(
+                file_obj=file_obj, chunk_size=chunk_size, workers=workers
+            )
         # Use google-resumable-media for large files
         else:
             log.debug(
@@ -268,15 +524,27 @@ class File(Resource):
                 file_obj=file_obj, chunk_size=chunk_size
             )
 
-    def download(self, dest, chunk_size=DEFAULT_CHUNK_SIZE, only_use_crux_domains=None):
-        # type: (str, int, bool) -> bool
+    @profiled
+    def download(
+        self,
+        dest,
+        chunk_size=DEFAULT_CHUNK_SIZE,
+        only_use_crux_domains=None,
+        workers=None,
+    ):
+        # type: (str, int, bool, int) -> bool
         """Downloads the file resource.
 
         Args:
             dest (str or file): Local OS path at which file resource will be downloaded.
-            chunk_size (int): Number of bytes to be read in memory.
+            chunk_size (int): Number of bytes to be read in memory. When workers is set,
+                it is also the size of each byte range fetched.
             only_use_crux_domains (bool): True if content is required to be downloaded
                 from Crux domains else False.
+            workers (int): Number of byte ranges to fetch concurrently from the signed
+                URL. Ranges are written into a preallocated file, so dest must be a
+                path or a seekable file object. Defaults to None, which downloads
+                over a single stream.
 
         Returns:
             bool: True if it is downloaded.
@@ -289,7 +557,10 @@ class File(Resource):
 
         if hasattr(dest, "write"):
             return self._download_file(
-                dest, chunk_size=chunk_size, only_use_crux_domains=only_use_crux_domains
+                dest,
+                chunk_size=chunk_size,
+                only_use_crux_domains=only_use_crux_domains,
+                workers=workers,
             )
         elif isinstance(dest, (str, unicode)):
             with open(dest, "wb") as file_obj:
@@ -297,11 +568,15 @@ class File(Resource):
                     file_obj,
                     chunk_size=chunk_size,
                     only_use_crux_domains=only_use_crux_domains,
+                    workers=workers,
                 )
         else:
             raise TypeError("Invalid Data Type for dest: {}".format(type(dest)))
 
     def _ul_signed_url_resumable(self, file_obj, media_type):
+        # pylint: disable=import-outside-toplevel
+        from google.resumable_media.common import InvalidResponse  # type: ignore
+        from google.resumable_media.requests import ResumableUpload  # type: ignore
 
         headers = Headers(
             {
@@ -319,7 +594,7 @@ class File(Resource):
         )
         log.debug("Fetched upload session url for resource %s", self.id)
 
-        upload_response_json = upload_session_response.json()
+        upload_response_json = self.connection.json(upload_session_response)
 
         signed_url = upload_response_json.get("signedURL").get("url")
         if not signed_url:
@@ -355,9 +630,10 @@ class File(Resource):
 
         metadata = {"name": self.name}
 
-        transport = get_session(
+        # The upload has its own headers, but reuses the shared storage connections.
+        transport = get_shared_session(
+            self.connection.crux_config.storage_session,
             session_class=ResumableUploadSignedSession,
-            proxies=self.connection.crux_config.proxies,
         )
 
         transport.headers = signed_url_headers
@@ -392,6 +668,9 @@ class File(Resource):
 
     def _upload(self, file_obj, media_type, only_use_crux_domains=None):
 
+        if self.connection.signed_url_cache is not None:
+            self.connection.signed_url_cache.invalidate(self.id)
+
         if only_use_crux_domains is None:
             only_use_crux_domains = self.connection.crux_config.only_use_crux_domains
 
@@ -412,6 +691,7 @@ class File(Resource):
             log.debug("Using Signed url for uploading file resource %s", self.id)
             return self._ul_signed_url_resumable(file_obj, media_type)
 
+    @profiled
     def upload(self, src, media_type=None, only_use_crux_domains=None):
         # type: (Union[IO, str], str, bool) -> File
         """Uploads the content to empty file resource.
@@ -467,3 +747,12 @@ class File(Resource):
                     file_name=self.name, path=self.path
                 )
             )
+
+
+def _is_seekable(file_obj):
+    # type: (IO) -> bool
+    """Checks whether file_obj supports writing at arbitrary offsets."""
+    seekable = getattr(file_obj, "seekable", None)
+    if seekable is not None:
+        return seekable()
+    return hasattr(file_obj, "seek") and hasattr(file_obj, "truncate")
@@ -2,7 +2,7 @@
 
 import copy
 import pprint
-from typing import Any, Dict  # noqa: F401
+from typing import Any, Callable, Dict  # noqa: F401
 
 from crux._client import CruxClient
 from crux._client import CruxConfig
@@ -18,9 +18,34 @@ class CruxModel(object):
             raw_model (dict): Resource raw dictionary. Defaults to None.
             connection (CruxClient): Connection object. Defaults to None.
         """
+        self._raw_model = {}  # type: Dict
+        # Values parsed from raw_model by _parsed, dropped when it is replaced.
+        self._parsed_values = {}  # type: Dict[str, Any]
         self.raw_model = raw_model if raw_model is not None else {}
         self._connection = connection
 
+    @property
+    def raw_model(self):
+        # type: () -> Dict
+        """dict: Gets the raw dictionary of the model."""
+        return self._raw_model
+
+    @raw_model.setter
+    def raw_model(self, raw_model):
+        # type: (Dict) -> None
+        self._raw_model = raw_model
+        self._parsed_values = {}
+
+    def _parsed(self, key, parse):
+        # type: (str, Callable[[], Any]) -> Any
+        """Returns the value parse computes from raw_model, computed once per raw model.
+
+        Replacing raw_model, as refresh() and update() do, drops the values.
+        """
+        if key not in self._parsed_values:
+            self._parsed_values[key] = parse()
+        return self._parsed_values[key]
+
     @property
     def connection(self):
         """CruxClient: API connection client."""
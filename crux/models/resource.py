@@ -1,14 +1,15 @@
 """Module contains Resource model."""
 
+from datetime import datetime  # noqa: F401 pylint: disable=unused-import
 from enum import Enum
 import os
 import posixpath
-from typing import Dict, List, Union  # noqa: F401
+from typing import Callable, Dict, List, Union  # noqa: F401
 
 from requests.models import Response  # noqa: F401 pylint: disable=unused-import
 
 from crux._client import CruxClient
-from crux._utils import create_logger, DEFAULT_CHUNK_SIZE, Headers
+from crux._utils import create_logger, DEFAULT_CHUNK_SIZE, Headers, parse_datetime
 from crux.models.model import CruxModel
 from crux.models.permission import Permission
 
@@ -29,6 +30,23 @@ class Resource(CruxModel):
         self._folder = None
         super(Resource, self).__init__(raw_model, connection)
 
+    @property
+    def _labels(self):
+        # type: () -> Dict[str, str]
+        """dict: Labels by key, shared by the label accessors."""
+
+        def parse():
+            return dict(
+                (label["labelKey"], label["labelValue"])
+                for label in self.raw_model["labels"]
+            )
+
+        return self._parsed("labels", parse)
+
+    def _parsed_datetime(self, key, value):
+        # type: (str, Callable[[], str]) -> datetime
+        return self._parsed(key, lambda: parse_datetime(value()))
+
     @property
     def id(self):
         """str: Gets the Resource ID."""
@@ -65,7 +83,7 @@ class Resource(CruxModel):
     @property
     def frame_id(self):
         """str: Gets the Frame ID."""
-        return self.labels["frame_id"]
+        return self._labels["frame_id"]
 
     @property
     def storage_id(self):
@@ -93,7 +111,14 @@ class Resource(CruxModel):
     @property
     def supplier_implied_dt(self):
         """str: Gets the supplier date."""
-        return self.labels["supplier_implied_dt"]
+        return self._labels["supplier_implied_dt"]
+
+    @property
+    def supplier_implied_datetime(self):
+        """datetime: Gets the supplier date, parsed."""
+        return self._parsed_datetime(
+            "supplier_implied_datetime", lambda: self.supplier_implied_dt
+        )
 
     @property
     def type(self):
@@ -112,10 +137,7 @@ class Resource(CruxModel):
     @property
     def labels(self):
         """dict: Gets the Resource labels."""
-        labels_dict = {}
-        for label in self.raw_model["labels"]:
-            labels_dict[label["labelKey"]] = label["labelValue"]
-        return labels_dict
+        return dict(self._labels)
 
     @property
     def as_of(self):
@@ -127,16 +149,31 @@ class Resource(CruxModel):
         """str: Gets created_at."""
         return self.raw_model["createdAt"]
 
+    @property
+    def created_datetime(self):
+        """datetime: Gets created_at, parsed."""
+        return self._parsed_datetime("created_datetime", lambda: self.created_at)
+
     @property
     def ingestion_time(self):
         """str: Gets created_at."""
-        return self.labels["ingestion_dt"]
+        return self._labels["ingestion_dt"]
+
+    @property
+    def ingestion_datetime(self):
+        """datetime: Gets ingestion_time, parsed."""
+        return self._parsed_datetime("ingestion_datetime", lambda: self.ingestion_time)
 
     @property
     def modified_at(self):
         """str: Gets modified_at."""
         return self.raw_model["modifiedAt"]
 
+    @property
+    def modified_datetime(self):
+        """datetime: Gets modified_at, parsed."""
+        return self._parsed_datetime("modified_datetime", lambda: self.modified_at)
+
     @property
     def size(self):
         """int: Gets the size."""
@@ -164,7 +201,26 @@ class Resource(CruxModel):
             bool: True if it is deleted.
         """
         headers = Headers({"content-type": "application/json", "accept": "application/json"})
-        return self.connection.api_call("DELETE", ["v1", "resources", self.id], headers=headers)
+        deleted = self.connection.api_call(
+            "DELETE", ["v1", "resources", self.id], headers=headers
+        )
+        self._invalidate_path_index()
+        return deleted
+
+    def _invalidate_path_index(self):
+        # type: () -> None
+        """Drops the indexed folder of the resource, see Dataset.get_file."""
+        path_index = self.connection.path_index
+        dataset_id = self.raw_model.get("datasetId")
+        if path_index is None or dataset_id is None:
+            # Without the dataset only the indexes of every dataset could be dropped.
+            return
+        if self._folder and self.raw_model.get("type") != "folder":
+            path_index.invalidate(dataset_id, self._folder)
+        else:
+            # Folders drop the index of their subfolders too, and resources whose
+            # folder is unknown would need a request to find it.
+            path_index.invalidate(dataset_id)
 
     def update(self, name=None, description=None, tags=None, provenance=None):
         # type: (str, str, List[str], str) -> bool
@@ -204,6 +260,8 @@ class Resource(CruxModel):
         )
 
         self.raw_model = resource_object.raw_model
+        if name is not None:
+            self._invalidate_path_index()
 
         log.debug("Updated dataset %s with content %s", self.id, self.raw_model)
         return True
@@ -358,7 +416,7 @@ class Resource(CruxModel):
             "GET", ["v1", "resources", self.id, "folderpath"], headers=headers
         )
 
-        return response.json().get("path")
+        return self.connection.json(response).get("path")
 
     def _download(self, file_obj, media_type, chunk_size=DEFAULT_CHUNK_SIZE):
 
@@ -0,0 +1,231 @@
+"""Module contains ResourceTable, a compact columnar listing of resources."""
+
+from array import array
+import sys
+from typing import Any, Dict, Iterable, Iterator, List, Optional  # noqa: F401
+
+from crux._client import CruxClient  # noqa: F401 pylint: disable=unused-import
+from crux._compat import intern
+from crux.models.file import File
+
+
+# Column names, in the order rows and exports use.
+RESOURCE_TABLE_COLUMNS = (
+    "id",
+    "name",
+    "folder",
+    "size",
+    "type",
+    "modified_at",
+    "frame_id",
+    "supplier_implied_dt",
+)
+
+# Stored instead of None in the size array.
+_MISSING_SIZE = -1
+
+# Typecode of the size array, signed 64 bit integers where available. Python 2
+# has no "q" typecode, and its "l" is 64 bit on most platforms.
+_SIZE_TYPECODE = "q" if sys.version_info >= (3, 3) else "l"
+
+
+def _interned(value):
+    # type: (Any) -> Any
+    """Interns strings repeated across resources, so each value is stored once."""
+    # Python 2 can only intern byte strings.
+    if type(value) is str:  # pylint: disable=unidiomatic-typecheck
+        return intern(value)
+    return value
+
+
+def _label_values(raw_item):
+    # type: (Dict[str, Any]) -> Dict[str, str]
+    labels = {}
+    for label in raw_item.get("labels") or ():
+        if label.get("labelKey") in ("frame_id", "supplier_implied_dt"):
+            labels[label["labelKey"]] = label["labelValue"]
+    return labels
+
+
+class ResourceTable(object):
+    """Listing of resources which keeps their common fields in columns.
+
+    Resource objects keep the whole decoded API object and a connection each,
+    a table only keeps the fields named in RESOURCE_TABLE_COLUMNS, with repeated
+    strings interned and sizes in an array. File objects are built on request.
+    """
+
+    __slots__ = (
+        "dataset_id",
+        "connection",
+        "model",
+        "_ids",
+        "_names",
+        "_folders",
+        "_sizes",
+        "_types",
+        "_modified_ats",
+        "_frame_ids",
+        "_supplier_implied_dts",
+    )
+
+    def __init__(self, dataset_id=None, connection=None, model=File):
+        # type: (Optional[str], Optional[CruxClient], Any) -> None
+        """
+        Args:
+            dataset_id (str): ID of the listed Dataset. Defaults to None.
+            connection (CruxClient): Connection given to the built models.
+                Defaults to None.
+            model (crux.models.Resource): Model built from rows. Defaults to File.
+        """
+        self.dataset_id = dataset_id
+        self.connection = connection
+        self.model = model
+        self._ids = []  # type: List[str]
+        self._names = []  # type: List[Optional[str]]
+        self._folders = []  # type: List[Optional[str]]
+        self._sizes = array(_SIZE_TYPECODE)
+        self._types = []  # type: List[Optional[str]]
+        self._modified_ats = []  # type: List[Optional[str]]
+        self._frame_ids = []  # type: List[Optional[str]]
+        self._supplier_implied_dts = []  # type: List[Optional[str]]
+
+    def append(self, raw_item, folder=None):
+        # type: (Dict[str, Any], Optional[str]) -> None
+        """Adds a resource from its decoded API object.
+
+        Args:
+            raw_item (dict): Decoded resource.
+            folder (str): Folder path the resource was listed from. Defaults to None.
+        """
+        labels = _label_values(raw_item)
+        size = raw_item.get("size")
+        self._ids.append(_interned(raw_item["resourceId"]))
+        self._names.append(raw_item.get("name"))
+        self._folders.append(_interned(folder))
+        self._sizes.append(_MISSING_SIZE if size is None else int(size))
+        self._types.append(_interned(raw_item.get("type")))
+        self._modified_ats.append(raw_item.get("modifiedAt"))
+        self._frame_ids.append(_interned(labels.get("frame_id")))
+        self._supplier_implied_dts.append(_interned(labels.get("supplier_implied_dt")))
+
+    def extend(self, raw_items, folder=None):
+        # type: (Iterable[Dict[str, Any]], Optional[str]) -> None
+        """Adds resources from their decoded API objects, see append."""
+        for raw_item in raw_items:
+            self.append(raw_item, folder=folder)
+
+    def __len__(self):
+        # type: () -> int
+        return len(self._ids)
+
+    def __repr__(self):
+        # type: () -> str
+        return "ResourceTable({} rows)".format(len(self))
+
+    def column(self, name):
+        # type: (str) -> List[Any]
+        """Gets the values of a column.
+
+        Args:
+            name (str): One of RESOURCE_TABLE_COLUMNS.
+
+        Returns:
+            list: Column values, None where a resource has no value.
+
+        Raises:
+            KeyError: If name is not a column.
+        """
+        if name not in RESOURCE_TABLE_COLUMNS:
+            raise KeyError("Unknown column {}".format(name))
+        if name == "size":
+            return [None if size == _MISSING_SIZE else size for size in self._sizes]
+        return list(getattr(self, "_{}s".format(name)))
+
+    def row(self, index):
+        # type: (int) -> Dict[str, Any]
+        """Gets the column values of a resource, as a dict keyed by column name."""
+        size = self._sizes[index]
+        return {
+            "id": self._ids[index],
+            "name": self._names[index],
+            "folder": self._folders[index],
+            "size": None if size == _MISSING_SIZE else size,
+            "type": self._types[index],
+            "modified_at": self._modified_ats[index],
+            "frame_id": self._frame_ids[index],
+            "supplier_implied_dt": self._supplier_implied_dts[index],
+        }
+
+    def rows(self):
+        # type: () -> Iterator[Dict[str, Any]]
+        """Yields the column values of each resource, see row."""
+        for index in range(len(self)):
+            yield self.row(index)
+
+    def __getitem__(self, index):
+        # type: (int) -> Any
+        """Builds the model object of a row.
+
+        Its raw model only holds the fields kept by the table, refresh() fetches
+        the others.
+        """
+        row = self.row(index)
+        raw_model = {
+            "resourceId": row["id"],
+            "name": row["name"],
+            "type": row["type"],
+            "modifiedAt": row["modified_at"],
+        }  # type: Dict[str, Any]
+        if row["size"] is not None:
+            raw_model["size"] = row["size"]
+        if self.dataset_id is not None:
+            raw_model["datasetId"] = self.dataset_id
+        raw_model["labels"] = [
+            {"labelKey": key, "labelValue": row[key]}
+            for key in ("frame_id", "supplier_implied_dt")
+            if row[key] is not None
+        ]
+        resource = self.model(raw_model=raw_model, connection=self.connection)
+        if row["folder"] is not None:
+            # Saves a folder path request when the path of the resource is used.
+            resource._folder = row["folder"]
+        return resource
+
+    def __iter__(self):
+        # type: () -> Iterator[Any]
+        """Yields the model object of each row, see __getitem__."""
+        for index in range(len(self)):
+            yield self[index]
+
+    def to_dict(self):
+        # type: () -> Dict[str, List[Any]]
+        """Returns the columns as a dict of lists, keyed by column name."""
+        return dict((name, self.column(name)) for name in RESOURCE_TABLE_COLUMNS)
+
+    def to_arrow(self):
+        """Exports the table to a pyarrow Table.
+
+        Returns:
+            pyarrow.Table: Table with a column for each of RESOURCE_TABLE_COLUMNS.
+
+        Raises:
+            ImportError: If pyarrow is not installed.
+        """
+        import pyarrow  # type: ignore # pylint: disable=import-outside-toplevel,import-error
+
+        return pyarrow.table(self.to_dict())
+
+    def to_pandas(self):
+        """Exports the table to a pandas DataFrame.
+
+        Returns:
+            pandas.DataFrame: DataFrame with a column for each of
+                RESOURCE_TABLE_COLUMNS.
+
+        Raises:
+            ImportError: If pandas is not installed.
+        """
+        import pandas  # type: ignore # pylint: disable=import-outside-toplevel,import-error
+
+        return pandas.DataFrame(self.to_dict(), columns=list(RESOURCE_TABLE_COLUMNS))
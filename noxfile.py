@@ -29,6 +29,7 @@ def lint(session):
 def unit(session):
     """Run unit tests."""
     session.install("pytest")
+    session.install("aiohttp; python_version >= '3.6'")
     session.install("-r", "requirements.txt")
     session.run("python", "-m", "pytest", "tests/unit")
 
@@ -42,6 +43,22 @@ def integration(session):
     session.run("python", "-m", "pytest", "-n", str(cpu_count), "tests/integration")
 
 
+@nox.session(python=["3.7"])
+def benchmark(session):
+    """Run benchmarks against a local fake API, saving results for comparison."""
+    session.install("pytest")
+    session.install("pytest-benchmark")
+    session.install("-r", "requirements.txt")
+    session.run(
+        "python",
+        "-m",
+        "pytest",
+        "--benchmark-autosave",
+        "tests/benchmark",
+        *session.posargs
+    )
+
+
 @nox.session(python=["3.7"])
 def format_check(session):
     """Run all tests."""
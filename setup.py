@@ -10,6 +10,7 @@ from setuptools import find_packages, setup
 here = os.path.abspath(os.path.dirname(__file__))
 requirements = [
     "enum34;python_version<'3.4'",
+    "futures;python_version<'3.2'",
     "google-resumable-media[requests]",
     "typing;python_version<'3.5'",
     "python-dateutil",
@@ -36,6 +37,7 @@ setup(
     python_requires=">=2.7, !=3.0.*, !=3.1.*, !=3.2.*, !=3.3.*, !=3.4.*",
     license="MIT",
     install_requires=requirements,
+    extras_require={"aio": ["aiohttp>=3.6;python_version>='3.6'"]},
     keywords=["crux-python"],
     classifiers=[
         "Development Status :: 3 - Alpha",
@@ -0,0 +1,103 @@
+import os
+
+import pytest
+
+from crux import Crux
+from .fake_api import FakeCruxAPI
+
+# Fixed latency of every request in seconds, and bandwidth of bodies in bytes per
+# second (0 is unlimited), so results are comparable between releases.
+LATENCY = float(os.environ.get("CRUX_BENCHMARK_LATENCY", "0.002"))
+BANDWIDTH = float(os.environ.get("CRUX_BENCHMARK_BANDWIDTH", "0"))
+
+LISTING_FILES = 2000
+DOWNLOAD_FOLDERS = 4
+DOWNLOAD_FILES_PER_FOLDER = 10
+SMALL_FILE_SIZE = 64 * 1024
+LARGE_FILE_SIZE = 8 * 1024 * 1024
+DELIVERIES = 30
+FRAMES = ("FRAME_A", "FRAME_B")
+DAYS_PER_DELIVERY = 10
+
+
+class BenchmarkData(object):
+    """Paths and sizes of the data seeded in the fake API."""
+
+    listing_folder = "/listing"
+    listing_files = LISTING_FILES
+    download_folder = "/download"
+    download_files = DOWNLOAD_FOLDERS * DOWNLOAD_FILES_PER_FOLDER
+    download_bytes = download_files * SMALL_FILE_SIZE
+    large_file_path = "/large.bin"
+    large_file_size = LARGE_FILE_SIZE
+    range_start = "2020-01-01"
+    range_end = "2020-12-31"
+    range_files = len(FRAMES) * DAYS_PER_DELIVERY * DELIVERIES
+
+    def __init__(self, dataset_id, large_file_id):
+        self.dataset_id = dataset_id
+        self.large_file_id = large_file_id
+
+
+def _seed(api):
+    # type: (FakeCruxAPI) -> BenchmarkData
+    dataset_id = api.add_dataset("benchmark_dataset")
+
+    for index in range(LISTING_FILES):
+        api.add_file(dataset_id, "/listing/file_{:05d}.csv".format(index), b"a,b\n")
+
+    small_content = os.urandom(SMALL_FILE_SIZE)
+    for folder in range(DOWNLOAD_FOLDERS):
+        for index in range(DOWNLOAD_FILES_PER_FOLDER):
+            path = "/download/folder_{}/file_{}.bin".format(folder, index)
+            api.add_file(dataset_id, path, small_content)
+
+    large_file_id = api.add_file(dataset_id, "/large.bin", os.urandom(LARGE_FILE_SIZE))
+
+    day = 0
+    for delivery in range(DELIVERIES):
+        resources = []
+        for _ in range(DAYS_PER_DELIVERY):
+            day += 1
+            supplier_dt = "2020-{:02d}-{:02d}T00:00:00".format(
+                (day - 1) // 28 + 1, (day - 1) % 28 + 1
+            )
+            for frame_id in FRAMES:
+                resource_id = api.add_file(
+                    dataset_id,
+                    "/deliveries/{}/{}_{}.avro".format(delivery, frame_id, day),
+                    b"avro",
+                    labels={
+                        "frame_id": frame_id,
+                        "supplier_implied_dt": supplier_dt,
+                        "ingestion_dt": "2021-01-01T00:00:00",
+                    },
+                )
+                resources.append((frame_id, resource_id))
+        api.add_delivery(dataset_id, "delivery{}.0".format(delivery), resources)
+
+    return BenchmarkData(dataset_id, large_file_id)
+
+
+@pytest.fixture(scope="session")
+def fake_api():
+    api = FakeCruxAPI(latency=LATENCY, bandwidth=BANDWIDTH or None).start()
+    yield api
+    api.stop()
+
+
+@pytest.fixture(scope="session")
+def benchmark_data(fake_api):
+    return _seed(fake_api)
+
+
+@pytest.fixture
+def connection(fake_api):
+    conn = Crux(api_key="benchmark", api_host=fake_api.url)
+    yield conn
+    conn.close()
+
+
+@pytest.fixture
+def dataset(connection, benchmark_data):
+    return connection.get_dataset(benchmark_data.dataset_id)
@@ -0,0 +1,384 @@
+"""Local stand-in for the Crux API and storage, used by the benchmarks.
+
+Serves the routes of api_usage.csv used by the benchmarked operations: resource
+listings with cursors, delivery IDs and data, batch resource metadata, signed
+content URLs with range requests, and resumable upload sessions. Every response
+is delayed by a fixed latency, and bodies are paced to a bandwidth, both ways.
+"""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import itertools
+import json
+import re
+import threading
+import time
+from urllib.parse import parse_qs, urlsplit
+
+DEFAULT_PAGE_SIZE = 500
+
+# Bodies are written and paced in blocks of this many bytes.
+BLOCK_SIZE = 64 * 1024
+
+_RANGE_REGEX = re.compile(r"^bytes=(\d+)-(\d*)$")
+_CONTENT_RANGE_REGEX = re.compile(r"^bytes (?:(\d+)-(\d+)|\*)/(\d+|\*)$")
+
+
+class FakeCruxAPI(object):
+    """In-memory datasets, resources and deliveries served over HTTP."""
+
+    def __init__(self, latency=0.0, bandwidth=None):
+        """
+        Args:
+            latency (float): Seconds every request waits before its response.
+                Defaults to 0.
+            bandwidth (float): Bytes per second request and response bodies are
+                paced to. Defaults to None, which is unlimited.
+        """
+        self.latency = latency
+        self.bandwidth = bandwidth
+        self.datasets = {}
+        self.resources = {}
+        self.contents = {}
+        self.children = {}
+        self.deliveries = {}
+        self.manifests = {}
+        self.upload_sessions = {}
+        self.request_count = 0
+        self._ids = itertools.count(1)
+        self._lock = threading.Lock()
+        self._server = None
+        self._thread = None
+
+    @property
+    def url(self):
+        """str: Base URL of the server."""
+        host, port = self._server.server_address[:2]
+        return "http://{}:{}".format(host, port)
+
+    def start(self):
+        handler = type("Handler", (_Handler,), {"api": self})
+        self._server = ThreadingHTTPServer(("127.0.0.1", 0), handler)
+        self._server.daemon_threads = True
+        self._thread = threading.Thread(target=self._server.serve_forever)
+        self._thread.daemon = True
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        self._thread.join()
+
+    def _new_id(self, prefix):
+        with self._lock:
+            return "{}{:08d}".format(prefix, next(self._ids))
+
+    def add_dataset(self, name):
+        dataset_id = self._new_id("ds")
+        self.datasets[dataset_id] = {
+            "datasetId": dataset_id,
+            "name": name,
+            "description": "",
+            "tags": [],
+        }
+        self.children[(dataset_id, "/")] = []
+        return dataset_id
+
+    def add_resource(self, dataset_id, folder, name, resource_type="file", **fields):
+        """Adds a resource under folder, creating missing parent folders."""
+        if (dataset_id, folder) not in self.children:
+            parent, _, folder_name = folder.rstrip("/").rpartition("/")
+            self.add_resource(dataset_id, parent or "/", folder_name, "folder")
+        resource_id = self._new_id("rs")
+        raw = {
+            "resourceId": resource_id,
+            "datasetId": dataset_id,
+            "folderId": folder,
+            "name": name,
+            "type": resource_type,
+            "size": None,
+            "mediaType": fields.get("mediaType", "application/octet-stream"),
+            "description": fields.get("description"),
+            "tags": fields.get("tags", []),
+            "labels": [
+                {"labelKey": key, "labelValue": value}
+                for key, value in sorted(fields.get("labels", {}).items())
+            ],
+            "provenance": "{}",
+            "storageId": resource_id,
+            "createdAt": "2020-02-01T00:00:00Z",
+            "modifiedAt": "2020-02-01T00:00:00Z",
+        }
+        with self._lock:
+            self.resources[resource_id] = raw
+            self.children[(dataset_id, folder)].append(resource_id)
+            if resource_type == "folder":
+                path = folder.rstrip("/") + "/" + name
+                self.children.setdefault((dataset_id, path), [])
+        return resource_id
+
+    def add_file(self, dataset_id, path, content, labels=None):
+        folder, _, name = path.rpartition("/")
+        resource_id = self.add_resource(
+            dataset_id, folder or "/", name, labels=labels or {}
+        )
+        self.set_content(resource_id, content)
+        return resource_id
+
+    def set_content(self, resource_id, content):
+        with self._lock:
+            self.contents[resource_id] = content
+            self.resources[resource_id]["size"] = len(content)
+
+    def add_delivery(self, dataset_id, delivery_id, resources):
+        """Adds a delivery of resources, a list of (frame ID, resource ID)."""
+        self.deliveries.setdefault(dataset_id, []).append(delivery_id)
+        self.manifests[delivery_id] = {
+            "resources": [
+                {"frame_id": frame_id, "resource_id": resource_id}
+                for frame_id, resource_id in resources
+            ]
+        }
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Routes requests to the FakeCruxAPI of the server."""
+
+    api = None  # type: FakeCruxAPI
+    protocol_version = "HTTP/1.1"
+    # Headers and bodies are written separately, which Nagle's algorithm delays.
+    disable_nagle_algorithm = True
+
+    routes = [
+        ("GET", r"/v2/client/datasets/([^/]+)", "get_dataset"),
+        ("GET", r"/plat-api/resources", "list_resources"),
+        ("POST", r"/plat-api/datasets/([^/]+)/resources", "create_resource"),
+        ("POST", r"/v1/client/resources/get-batch", "get_batch"),
+        ("GET", r"/v[12]/client/resources/([^/]+)", "get_resource"),
+        ("DELETE", r"/v1/client/resources/([^/]+)", "delete_resource"),
+        ("GET", r"/v1/client/resources/([^/]+)/folderpath", "get_folder_path"),
+        ("GET", r"/v2/client/resources/([^/]+)/content-url", "get_content_url"),
+        ("GET", r"/v1/client/deliveries/([^/]+)/ids", "get_delivery_ids"),
+        ("GET", r"/v1/client/deliveries/([^/]+)/([^/]+)/data", "get_delivery_data"),
+        (
+            "POST",
+            r"/plat-api/resources/([^/]+)/upload-session-start",
+            "start_upload_session",
+        ),
+        (
+            "POST",
+            r"/plat-api/resources/([^/]+)/upload-session-complete",
+            "complete_upload_session",
+        ),
+        ("GET", r"/storage/([^/]+)", "get_content"),
+        ("POST", r"/upload/([^/]+)", "initiate_upload"),
+        ("PUT", r"/upload/([^/]+)", "upload_chunk"),
+    ]
+
+    def log_message(self, format, *args):  # pylint: disable=redefined-builtin
+        pass
+
+    def do_GET(self):
+        self._dispatch("GET")
+
+    def do_POST(self):
+        self._dispatch("POST")
+
+    def do_PUT(self):
+        self._dispatch("PUT")
+
+    def do_DELETE(self):
+        self._dispatch("DELETE")
+
+    def _dispatch(self, method):
+        with self.api._lock:
+            self.api.request_count += 1
+        url = urlsplit(self.path)
+        self.query = dict(
+            (key, values[0]) for key, values in parse_qs(url.query).items()
+        )
+        self.body = self._read_body()
+        time.sleep(self.api.latency)
+        for route_method, pattern, name in self.routes:
+            match = re.match(pattern + "$", url.path)
+            if route_method == method and match:
+                getattr(self, name)(*match.groups())
+                return
+        self._send_json({"message": "Not found: " + url.path}, status=404)
+
+    def _pace(self, size):
+        if self.api.bandwidth:
+            time.sleep(float(size) / self.api.bandwidth)
+
+    def _read_body(self):
+        length = int(self.headers.get("content-length") or 0)
+        chunks = []
+        while length > 0:
+            chunk = self.rfile.read(min(length, BLOCK_SIZE))
+            if not chunk:
+                break
+            self._pace(len(chunk))
+            chunks.append(chunk)
+            length -= len(chunk)
+        return b"".join(chunks)
+
+    def _send(self, status, body=b"", headers=None):
+        self.send_response(status)
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.send_header("content-length", str(len(body)))
+        self.end_headers()
+        view = memoryview(body)
+        for start in range(0, len(body), BLOCK_SIZE):
+            end = start + BLOCK_SIZE
+            block = view[start:end]
+            self.wfile.write(block)
+            self._pace(len(block))
+
+    def _send_json(self, payload, status=200):
+        self._send(
+            status,
+            json.dumps(payload).encode("utf-8"),
+            {"content-type": "application/json"},
+        )
+
+    def _json_body(self):
+        return json.loads(self.body.decode("utf-8")) if self.body else {}
+
+    def _resource(self, resource_id):
+        raw = self.api.resources.get(resource_id)
+        if raw is None:
+            self._send_json({"message": "Resource not found"}, status=404)
+        return raw
+
+    def get_dataset(self, dataset_id):
+        self._send_json(self.api.datasets[dataset_id])
+
+    def list_resources(self):
+        folder = self.query.get("folder", "/")
+        key = (self.query["datasetId"], folder.rstrip("/") or "/")
+        include_folders = self.query.get("includeFolders") == "true"
+        resources = [
+            self.api.resources[resource_id]
+            for resource_id in self.api.children.get(key, [])
+            if include_folders or self.api.resources[resource_id]["type"] == "file"
+        ]
+        start = int(self.query.get("cursor") or 0)
+        end = start + int(self.query.get("limit") or DEFAULT_PAGE_SIZE)
+        self._send_json({"results": resources[start:end], "cursor": str(end)})
+
+    def create_resource(self, dataset_id):
+        body = self._json_body()
+        resource_id = self.api.add_resource(
+            dataset_id,
+            body["folder"].rstrip("/") or "/",
+            body["name"],
+            body["type"],
+            description=body.get("description"),
+            tags=body.get("tags") or [],
+        )
+        self._send_json(self.api.resources[resource_id], status=201)
+
+    def get_batch(self):
+        resource_ids = self._json_body()["resourceIds"]
+        self._send_json(
+            [
+                self.api.resources[resource_id]
+                for resource_id in resource_ids
+                if resource_id in self.api.resources
+            ]
+        )
+
+    def get_resource(self, resource_id):
+        raw = self._resource(resource_id)
+        if raw is not None:
+            self._send_json(raw)
+
+    def delete_resource(self, resource_id):
+        with self.api._lock:
+            raw = self.api.resources.pop(resource_id, None)
+            if raw is not None:
+                key = (raw["datasetId"], raw["folderId"])
+                self.api.children[key].remove(resource_id)
+                self.api.contents.pop(resource_id, None)
+        self._send(204)
+
+    def get_folder_path(self, resource_id):
+        raw = self._resource(resource_id)
+        if raw is not None:
+            self._send_json({"path": raw["folderId"]})
+
+    def get_content_url(self, resource_id):
+        if self._resource(resource_id) is not None:
+            self._send_json({"url": "{}/storage/{}".format(self.api.url, resource_id)})
+
+    def get_delivery_ids(self, dataset_id):
+        self._send_json({"delivery_ids": self.api.deliveries.get(dataset_id, [])})
+
+    def get_delivery_data(self, dataset_id, delivery_id):
+        self._send_json(self.api.manifests[delivery_id])
+
+    def start_upload_session(self, resource_id):
+        session_id = self.api._new_id("us")
+        self.api.upload_sessions[session_id] = resource_id
+        self._send_json(
+            {
+                "sessionId": session_id,
+                "signedURL": {
+                    "url": "{}/upload/{}".format(self.api.url, session_id),
+                    "headers": {"content-type": "application/octet-stream"},
+                },
+            }
+        )
+
+    def complete_upload_session(self, resource_id):
+        self._send_json({"resourceId": resource_id})
+
+    def get_content(self, resource_id):
+        content = self.api.contents.get(resource_id)
+        if content is None:
+            self._send_json({"message": "Content not found"}, status=404)
+            return
+        match = _RANGE_REGEX.match(self.headers.get("range") or "")
+        if match is None:
+            self._send(200, content, {"content-type": "application/octet-stream"})
+            return
+        start = int(match.group(1))
+        last = min(int(match.group(2) or len(content) - 1), len(content) - 1)
+        if start >= len(content):
+            content_range = "bytes */{}".format(len(content))
+            self._send(416, headers={"content-range": content_range})
+            return
+        end = last + 1
+        self._send(
+            206,
+            content[start:end],
+            {
+                "content-type": "application/octet-stream",
+                "content-range": "bytes {}-{}/{}".format(start, last, len(content)),
+            },
+        )
+
+    def initiate_upload(self, session_id):
+        with self.api._lock:
+            self.api.upload_sessions[session_id] = (
+                self.api.upload_sessions[session_id],
+                bytearray(),
+            )
+        self._send(
+            200, headers={"location": "{}/upload/{}".format(self.api.url, session_id)}
+        )
+
+    def upload_chunk(self, session_id):
+        resource_id, received = self.api.upload_sessions[session_id]
+        match = _CONTENT_RANGE_REGEX.match(self.headers.get("content-range") or "")
+        if match is None:
+            self._send_json({"message": "Invalid content-range"}, status=400)
+            return
+        received.extend(self.body)
+        total = match.group(3)
+        if total != "*" and len(received) >= int(total):
+            self.api.set_content(resource_id, bytes(received))
+            self._send_json({"size": str(len(received))})
+            return
+        self._send(308, headers={"range": "bytes=0-{}".format(len(received) - 1)})
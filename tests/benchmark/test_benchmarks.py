@@ -0,0 +1,114 @@
+import io
+import os
+import shutil
+import subprocess
+import sys
+import tempfile
+
+import pytest
+
+ROUNDS = int(os.environ.get("CRUX_BENCHMARK_ROUNDS", "5"))
+
+UPLOAD_FILES = 20
+UPLOAD_FILE_SIZE = 64 * 1024
+
+
+def run(benchmark, function, *args, **kwargs):
+    return benchmark.pedantic(
+        function, args=args, kwargs=kwargs, rounds=ROUNDS, warmup_rounds=1
+    )
+
+
+@pytest.fixture
+def local_dir():
+    path = tempfile.mkdtemp()
+    yield path
+    shutil.rmtree(path)
+
+
+def test_list_files(benchmark, dataset, benchmark_data):
+    def list_files():
+        files = dataset.list_files(folder=benchmark_data.listing_folder, limit=None)
+        return sum(1 for _ in files)
+
+    benchmark.extra_info["files"] = benchmark_data.listing_files
+    assert run(benchmark, list_files) == benchmark_data.listing_files
+
+
+def test_list_files_as_table(benchmark, dataset, benchmark_data):
+    def list_files():
+        return len(
+            dataset.list_files(
+                folder=benchmark_data.listing_folder, limit=None, as_table=True
+            )
+        )
+
+    benchmark.extra_info["files"] = benchmark_data.listing_files
+    assert run(benchmark, list_files) == benchmark_data.listing_files
+
+
+def test_get_files_range(benchmark, dataset, benchmark_data):
+    def get_files_range():
+        return len(
+            list(
+                dataset.get_files_range(
+                    start_date=benchmark_data.range_start,
+                    end_date=benchmark_data.range_end,
+                )
+            )
+        )
+
+    benchmark.extra_info["files"] = benchmark_data.range_files
+    assert run(benchmark, get_files_range) == benchmark_data.range_files
+
+
+@pytest.mark.parametrize("workers", [None, 8])
+def test_download_files(benchmark, dataset, benchmark_data, local_dir, workers):
+    def download_files():
+        return len(
+            list(
+                dataset.download_files(
+                    benchmark_data.download_folder, local_dir, workers=workers
+                )
+            )
+        )
+
+    benchmark.extra_info["files"] = benchmark_data.download_files
+    benchmark.extra_info["bytes"] = benchmark_data.download_bytes
+    assert run(benchmark, download_files) == benchmark_data.download_files
+
+
+@pytest.mark.parametrize("workers", [None, 8])
+def test_upload_files(benchmark, dataset, local_dir, workers):
+    for index in range(UPLOAD_FILES):
+        with open(os.path.join(local_dir, "file_{}.csv".format(index)), "wb") as f:
+            f.write(os.urandom(UPLOAD_FILE_SIZE))
+    rounds = iter(range(ROUNDS + 1))
+
+    def upload_files():
+        folder = "/upload_{}_{}".format(workers, next(rounds))
+        dataset.create_folder(folder)
+        return len(dataset.upload_files(local_dir, folder, workers=workers))
+
+    benchmark.extra_info["files"] = UPLOAD_FILES
+    benchmark.extra_info["bytes"] = UPLOAD_FILES * UPLOAD_FILE_SIZE
+    assert run(benchmark, upload_files) == UPLOAD_FILES
+
+
+@pytest.mark.parametrize("workers", [None, 4])
+def test_file_download(benchmark, connection, benchmark_data, workers):
+    file_resource = connection.get_resource(benchmark_data.large_file_id)
+
+    def download():
+        file_obj = io.BytesIO()
+        file_resource.download(file_obj, workers=workers)
+        return file_obj.tell()
+
+    benchmark.extra_info["bytes"] = benchmark_data.large_file_size
+    assert run(benchmark, download) == benchmark_data.large_file_size
+
+
+@pytest.mark.parametrize("statement", ["import crux", "from crux import Crux"])
+def test_import_time(benchmark, statement):
+    command = [sys.executable, "-c", statement]
+    run(benchmark, subprocess.check_call, command)
@@ -0,0 +1,7 @@
+import sys
+
+collect_ignore = []
+
+# crux.aio uses async syntax, which needs Python 3.6 or later.
+if sys.version_info < (3, 6):
+    collect_ignore.append("test_aio.py")
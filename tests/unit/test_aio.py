@@ -0,0 +1,190 @@
+import asyncio
+import os
+
+import pytest
+
+aiohttp = pytest.importorskip("aiohttp")
+
+from aiohttp import web  # noqa: E402,I100,I202 pylint: disable=wrong-import-position
+from aiohttp.test_utils import (  # noqa: E402 pylint: disable=wrong-import-position
+    TestServer,
+)
+
+from crux.aio import AsyncCrux  # noqa: E402 pylint: disable=wrong-import-position
+from crux.exceptions import (  # noqa: E402 pylint: disable=wrong-import-position
+    CruxResourceNotFoundError,
+)
+
+
+def run(coroutine):
+    loop = asyncio.new_event_loop()
+    try:
+        return loop.run_until_complete(coroutine)
+    finally:
+        loop.close()
+
+
+def make_resource(resource_id, frame_id, supplier_implied_dt):
+    return {
+        "resourceId": resource_id,
+        "name": "{}.csv".format(resource_id),
+        "type": "file",
+        "size": 4,
+        "labels": [
+            {"labelKey": "frame_id", "labelValue": frame_id},
+            {"labelKey": "supplier_implied_dt", "labelValue": supplier_implied_dt},
+            {"labelKey": "ingestion_time", "labelValue": "2020-02-10T00:00:00"},
+        ],
+    }
+
+
+RESOURCES = dict(
+    (rid, make_resource(rid, "frame", "2020-02-0{}T00:00:00".format(day)))
+    for day, rid in enumerate(["file1", "file2", "file3"], 1)
+)
+
+
+def make_app(calls):
+    async def get_dataset(request):
+        return web.json_response({"datasetId": request.match_info["id"], "name": "ds"})
+
+    async def list_resources(request):
+        calls.append(("list", dict(request.query)))
+        resource_ids = sorted(RESOURCES)
+        start = int(request.query.get("cursor", 0))
+        end = start + 2
+        results = [RESOURCES[rid] for rid in resource_ids[start:end]]
+        return web.json_response({"results": results, "cursor": str(end)})
+
+    async def content_url(request):
+        resource_id = request.match_info["id"]
+        calls.append(("content-url", resource_id))
+        signed_urls = len([call for call in calls if call[0] == "content-url"])
+        url = request.url.with_path("/storage/{}".format(resource_id))
+        url = url.with_query({"signature": str(signed_urls)})
+        return web.json_response({"url": str(url)})
+
+    async def storage(request):
+        # The first signed URL has been revoked.
+        if request.query["signature"] == "1":
+            return web.Response(status=403)
+        assert "authorization" not in request.headers
+        return web.Response(body=b"crux")
+
+    async def delivery_ids(request):
+        return web.json_response(["abc.1", "abc.2"])
+
+    async def delivery_data(request):
+        if request.match_info["delivery"] == "abc.1":
+            resource_ids = ["file1", "file2"]
+        else:
+            resource_ids = ["file3"]
+        return web.json_response(
+            {
+                "resources": [
+                    {"frame_id": "frame", "resource_id": rid} for rid in resource_ids
+                ]
+            }
+        )
+
+    async def get_batch(request):
+        resource_ids = (await request.json())["resourceIds"]
+        calls.append(("get-batch", resource_ids))
+        return web.json_response([RESOURCES[rid] for rid in resource_ids])
+
+    async def missing(request):
+        return web.json_response({"statusCode": 404, "message": "missing"}, status=404)
+
+    app = web.Application()
+    app.router.add_get("/v2/client/datasets/{id}", get_dataset)
+    app.router.add_get("/plat-api/resources", list_resources)
+    app.router.add_get("/v2/client/resources/{id}/content-url", content_url)
+    app.router.add_get("/storage/{id}", storage)
+    app.router.add_get("/v1/client/deliveries/{dataset}/ids", delivery_ids)
+    app.router.add_get("/v1/client/deliveries/{dataset}/{delivery}/data", delivery_data)
+    app.router.add_post("/v1/client/resources/get-batch", get_batch)
+    app.router.add_get("/v2/client/resources/{id}", missing)
+    return app
+
+
+def with_client(test):
+    calls = []
+
+    async def run_test():
+        server = TestServer(make_app(calls))
+        await server.start_server()
+        try:
+            api_host = str(server.make_url("")).rstrip("/")
+            async with AsyncCrux(api_key="1235", api_host=api_host) as conn:
+                await test(conn)
+        finally:
+            await server.close()
+
+    run(run_test())
+    return calls
+
+
+def test_async_list_files_and_download(tmpdir):
+    async def test(conn):
+        dataset = await conn.get_dataset("12345")
+        files = [file async for file in dataset.list_files(limit=None)]
+        assert [file.id for file in files] == ["file1", "file2", "file3"]
+
+        dest = str(tmpdir.join("file1.csv"))
+        assert await files[0].download(dest)
+        with open(dest, "rb") as file_obj:
+            assert file_obj.read() == b"crux"
+
+        # The refreshed signed URL is cached.
+        chunks = [chunk async for chunk in files[0].iter_content()]
+        assert chunks == [b"crux"]
+
+    calls = with_client(test)
+
+    assert [call for call in calls if call[0] == "list"][1][1]["cursor"] == "2"
+    assert [call for call in calls if call[0] == "content-url"] == [
+        ("content-url", "file1"),
+        ("content-url", "file1"),
+    ]
+
+
+def test_async_list_files_prefetch():
+    async def test(conn):
+        dataset = await conn.get_dataset("12345")
+        files = [file async for file in dataset.list_files(limit=None, prefetch=2)]
+        assert [file.id for file in files] == ["file1", "file2", "file3"]
+
+        with pytest.raises(ValueError):
+            [file async for file in dataset.list_files(as_table=True)]
+
+    calls = with_client(test)
+
+    cursors = [call[1].get("cursor") for call in calls if call[0] == "list"]
+    assert cursors == [None, "2", "4"]
+
+
+def test_async_get_files_range():
+    async def test(conn):
+        dataset = await conn.get_dataset("12345")
+        files = [
+            file
+            async for file in dataset.get_files_range(
+                start_date="2020-02-02", end_date="2020-02-03"
+            )
+        ]
+        assert [file.id for file in files] == ["file2", "file3"]
+
+    calls = with_client(test)
+
+    # Deliveries are fetched concurrently, so their resources come in any order.
+    batches = [sorted(ids) for name, ids in calls if name == "get-batch"]
+    assert batches == [["file1", "file2", "file3"]]
+
+
+def test_async_api_error():
+    async def test(conn):
+        with pytest.raises(CruxResourceNotFoundError):
+            await conn.get_file("file1")
+
+    os.environ["CRUX_API_KEY"] = "1235"
+    with_client(test)
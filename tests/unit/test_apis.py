@@ -1,4 +1,5 @@
 import copy
+import json
 import os
 
 import pytest
@@ -99,6 +100,10 @@ def monkeypatch_get_resource_dict(method, path, model=None, headers=None):
     """Return a fake requests.Response object with a mock .json() method."""
 
     class MockResponse:
+        @property
+        def content(self):
+            return json.dumps(self.json()).encode("utf-8")
+
         def json(self):
             resource = {
                 "resourceId": path[1],
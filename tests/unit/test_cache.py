@@ -0,0 +1,145 @@
+import json
+import os
+import time
+
+import pytest
+import requests
+from requests.models import Response
+
+from crux._cache import ResponseCache
+from crux._client import CruxClient
+from crux._config import CruxConfig
+from crux.models import Dataset, Resource
+
+
+def make_response(status_code=200, content=b"", headers=None):
+    response = Response()
+    response.status_code = status_code
+    response._content = content
+    response.headers.update(headers or {})
+    response.url = "https://api.example.com/resource"
+    return response
+
+
+@pytest.fixture
+def client():
+    os.environ["CRUX_API_KEY"] = "1235"
+    return CruxClient(CruxConfig(response_cache_size=10))
+
+
+def test_response_cache_routes():
+    cache = ResponseCache(10, ttls={"v2/datasets/*": 0, "v2/deliveries/*": 5})
+
+    assert cache.ttl(["v2", "resources", "id1"]) == 60
+    assert cache.ttl(["v1", "resources", "id1", "folderpath"]) == 300
+    assert cache.ttl(["v2", "deliveries", "id1"]) == 5
+    assert cache.ttl(["v2", "datasets", "id1"]) is None
+    assert cache.ttl(["resources"]) is None
+
+
+def test_response_cache_lru_and_invalidation():
+    cache = ResponseCache(2)
+    for resource_id in ("id1", "id2", "id3"):
+        path = ["v2", "resources", resource_id]
+        cache.put(resource_id, path, make_response(content=b"{}"), 60)
+
+    assert len(cache) == 2
+    assert cache.get("id1") is None
+
+    cache.invalidate_path(["v1", "datasets", "ds1", "resources", "id2", "labels", "k"])
+
+    assert cache.get("id2") is None
+    assert cache.get("id3") is not None
+
+
+def test_client_caches_metadata_gets(client, monkeypatch):
+    requests_sent = []
+
+    def monkeypatch_request(self, method, url, headers=None, **kwargs):
+        requests_sent.append((method, url, dict(headers)))
+        if method == "PUT":
+            return make_response(content=b'{"resourceId": "id1", "name": "new"}')
+        if "if-none-match" in headers:
+            return make_response(status_code=304)
+        return make_response(
+            content=b'{"resourceId": "id1", "name": "old"}', headers={"ETag": '"v1"'}
+        )
+
+    monkeypatch.setattr(requests.sessions.Session, "request", monkeypatch_request)
+    path = ["v2", "resources", "id1"]
+
+    first = client.api_call("GET", path, model=Resource)
+    second = client.api_call("GET", path, model=Resource)
+
+    assert second.name == "old"
+    assert second is not first
+    assert len(requests_sent) == 1
+    # Responses without a model are rebuilt from the cached body.
+    assert client.api_call("GET", path).json()["name"] == "old"
+
+    # Expired responses are revalidated with their ETag.
+    for entry in client.response_cache._entries.values():
+        entry.expires_at = time.time() - 1
+    assert client.api_call("GET", path, model=Resource).name == "old"
+    assert requests_sent[-1][2]["if-none-match"] == '"v1"'
+    assert len(requests_sent) == 2
+
+    # Writes to the resource drop its cached responses.
+    client.api_call("PUT", ["v1", "resources", "id1"], json={"name": "new"})
+    assert len(client.response_cache) == 0
+    client.api_call("GET", path, model=Resource)
+    assert len(requests_sent) == 4
+
+
+def test_client_permission_writes_invalidate_listing(client, monkeypatch):
+    permissions = []
+
+    def monkeypatch_request(self, method, url, headers=None, **kwargs):
+        if method == "PUT":
+            identity_id, permission = url.split("/")[-2:]
+            permissions.append(
+                {
+                    "targetId": "id1",
+                    "identityId": identity_id,
+                    "permissionName": permission,
+                }
+            )
+            return make_response(content=json.dumps(permissions[-1]).encode("utf-8"))
+        return make_response(content=json.dumps(permissions).encode("utf-8"))
+
+    monkeypatch.setattr(requests.sessions.Session, "request", monkeypatch_request)
+    resource = Resource(raw_model={"resourceId": "id1"}, connection=client)
+
+    assert resource.list_permissions() == []
+    resource.add_permission("identity1", "Read")
+
+    assert [p.identity_id for p in resource.list_permissions()] == ["identity1"]
+
+
+def test_client_bulk_permission_writes_invalidate_listing(client, monkeypatch):
+    permissions = []
+
+    def monkeypatch_request(self, method, url, headers=None, **kwargs):
+        if method == "POST":
+            body = kwargs["json"]
+            for resource_id in body["resourceIds"]:
+                permissions.append(
+                    {
+                        "targetId": resource_id,
+                        "identityId": body["identityId"],
+                        "permissionName": body["permission"],
+                    }
+                )
+            return make_response(content=b"true")
+        return make_response(content=json.dumps(permissions).encode("utf-8"))
+
+    monkeypatch.setattr(requests.sessions.Session, "request", monkeypatch_request)
+    dataset = Dataset(raw_model={"datasetId": "ds1"}, connection=client)
+    resource = Resource(raw_model={"resourceId": "id1"}, connection=client)
+
+    assert resource.list_permissions() == []
+    dataset.add_permission_to_resources(
+        identity_id="identity1", permission="Read", resource_ids=["id1"]
+    )
+
+    assert [p.identity_id for p in resource.list_permissions()] == ["identity1"]
@@ -1,3 +1,4 @@
+import json
 import os
 
 import pytest
@@ -14,6 +15,8 @@ from requests.models import Response
 
 
 from crux._client import CruxClient
+from crux._config import CruxConfig
+from crux._json import get_json_decoder
 from crux.exceptions import (
     CruxClientConnectionError,
     CruxClientHTTPError,
@@ -216,6 +219,32 @@ def test_client_get_list_with_model(client, monkeypatch):
     assert resp[1].attr_2 == "dummy4"
 
 
+def test_client_get_list_lazy(client, monkeypatch):
+    monkeypatch.setattr(requests.sessions.Session, "request", monkeypatch_get_list_call)
+    built = []
+
+    def from_dict(cls, a_dict, connection=None):
+        built.append(a_dict)
+        return cls(raw_model=a_dict, connection=connection)
+
+    monkeypatch.setattr(SampleModel, "from_dict", classmethod(from_dict))
+
+    resp = client.api_call(
+        method="GET", path=["test-path"], model=SampleModel, lazy=True
+    )
+
+    assert len(resp) == 2
+    assert [raw["attr1"] for raw in resp.raw_items] == ["dummy1", "dummy3"]
+    selected = resp.filter(lambda raw: raw["attr1"] == "dummy3")
+    assert len(selected) == 1
+    assert built == []
+
+    assert selected[0].attr_2 == "dummy4"
+    assert resp[0].connection is client
+    assert [model.attr_1 for model in resp[1:]] == ["dummy3"]
+    assert len(built) == 3
+
+
 def monkeypatch_client_http_exception(
     self,
     method=None,
@@ -367,3 +396,54 @@ def test_client_too_many_redirects_exception(client, monkeypatch):
 
     with pytest.raises(CruxClientTooManyRedirects):
         client.api_call(method="GET", path=["test-path"], model=SampleModel)
+
+
+def test_client_decodes_response_once(monkeypatch):
+    decoded = []
+
+    def decoder(document):
+        decoded.append(document)
+        return json.loads(document.decode("utf-8"))
+
+    def response_json(self, **kwargs):
+        raise AssertionError("Response.json should not be called")
+
+    os.environ["CRUX_API_KEY"] = "1235"
+    client = CruxClient(crux_config=CruxConfig(json_decoder=decoder))
+    monkeypatch.setattr(requests.sessions.Session, "request", monkeypatch_get_call)
+    monkeypatch.setattr(Response, "json", response_json)
+
+    resp = client.api_call(method="GET", path=["test-path"], model=SampleModel)
+
+    assert resp.attr_1 == "dummy1"
+    assert decoded == [b'{"attr1":"dummy1","attr2":"dummy2"}']
+
+
+def test_client_json_uses_configured_decoder(monkeypatch):
+    decoded = []
+
+    def decoder(document):
+        decoded.append(document)
+        return json.loads(document.decode("utf-8"))
+
+    def response_json(self, **kwargs):
+        raise AssertionError("Response.json should not be called")
+
+    os.environ["CRUX_API_KEY"] = "1235"
+    client = CruxClient(crux_config=CruxConfig(json_decoder=decoder))
+    monkeypatch.setattr(
+        requests.sessions.Session, "request", monkeypatch_get_call_with_no_model
+    )
+    monkeypatch.setattr(Response, "json", response_json)
+
+    resp = client.api_call(method="GET", path=["test-path"], model=None)
+
+    assert client.json(resp) == {"data": "dummy"}
+    assert decoded == [b'{"data":"dummy"}']
+
+
+def test_get_json_decoder():
+    assert get_json_decoder("json")(b'{"a": [1]}') == {"a": [1]}
+    assert get_json_decoder()(b'{"a": [1]}') == {"a": [1]}
+    with pytest.raises(ValueError):
+        get_json_decoder("yaml")
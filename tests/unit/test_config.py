@@ -86,3 +86,19 @@ def test_def_proxies(config_def):
 
 def test_def_use_crux_domain(config_def):
     assert config_def.only_use_crux_domains is True
+
+
+def test_pool_settings(monkeypatch):
+    monkeypatch.setenv("CRUX_POOL_MAXSIZE", "32")
+    monkeypatch.setenv("CRUX_POOL_BLOCK", "true")
+    config = CruxConfig(api_key="12345", pool_connections=4)
+
+    assert (config.pool_connections, config.pool_maxsize, config.pool_block) == (
+        4,
+        32,
+        True,
+    )
+    assert config.storage_pool_size == 32
+    adapter = config.session.get_adapter("https://api.example.com")
+    assert adapter._pool_maxsize == 32
+    assert adapter._pool_block is True
@@ -1,8 +1,17 @@
+import copy
+import json
 import os
+import pickle
+import posixpath
+import time
 
 import pytest
 
+from crux._catalog import DeliveryCatalog
 from crux._client import CruxClient
+from crux._lazy import LazyModelList
+from crux._path_index import PathIndex
+from crux.exceptions import CruxClientError, CruxResourceNotFoundError
 from crux.models import Dataset, Delivery, File, Folder, Label, Resource, StitchJob
 
 
@@ -262,8 +271,17 @@ def test_get_delivery(dataset, monkeypatch):
     assert delivery_object.id == "abcd123.1"
 
 
+def encode_json(payload):
+    """Encodes payload like the body of a JSON API response."""
+    return json.dumps(payload).encode("utf-8")
+
+
 def monkeypatch_get_ingestions(*args, **kwargs):
     class MockResponse:
+        @property
+        def content(self):
+            return encode_json(self.json())
+
         def json(self):
             delivery_list = ["abcd123.0", "abcd123.1", "xyz123.0"]
             return delivery_list
@@ -281,3 +299,370 @@ def test_get_ingestions(dataset, monkeypatch):
         if ingestion.id == "xyz123":
             assert ingestion.versions == [0]
 
+
+def test_download_files_concurrent(dataset, monkeypatch, tmpdir):
+    tree = {
+        "/": [
+            Resource(raw_model={"name": "a.csv", "type": "file"}),
+            Resource(raw_model={"name": "sub", "type": "folder"}),
+        ],
+        "/sub": [
+            Resource(raw_model={"name": "b.csv", "type": "file"}),
+            Resource(raw_model={"name": "c.csv", "type": "file"}),
+        ],
+    }
+
+    def monkeypatch_list_resources(folder="/", **kwargs):
+        return iter(tree[folder])
+
+    def monkeypatch_file_download(self, dest, only_use_crux_domains=None):
+        with open(dest, "w") as file_obj:
+            file_obj.write(self.name)
+        return True
+
+    monkeypatch.setattr(dataset, "_list_resources", monkeypatch_list_resources)
+    monkeypatch.setattr(File, "download", monkeypatch_file_download)
+
+    local_path = str(tmpdir)
+    file_path_list = dataset.download_files(
+        folder="/", local_path=local_path, workers=2, list_workers=2
+    )
+
+    assert sorted(file_path_list) == [
+        os.path.join(local_path, "a.csv"),
+        os.path.join(local_path, "sub", "b.csv"),
+        os.path.join(local_path, "sub", "c.csv"),
+    ]
+    assert tmpdir.join("sub", "c.csv").read() == "c.csv"
+
+
+def test_upload_files_concurrent(dataset, monkeypatch, tmpdir):
+    tmpdir.join("a.csv").write("a")
+    tmpdir.mkdir("sub").join("b.csv").write("b")
+    tmpdir.join("sub").mkdir("deeper").join("c.csv").write("c")
+    tmpdir.mkdir("broken").join("d.csv").write("d")
+
+    created_folders = []
+    attempts = {}
+
+    def monkeypatch_create_folder(path, tags=None, description=None):
+        if path == "/dest/broken":
+            raise CruxClientError("Unable to create folder")
+        # Parents must always exist before their children are created.
+        parent = posixpath.dirname(path)
+        assert parent == "/dest" or parent in created_folders
+        created_folders.append(path)
+        return Folder(raw_model={"name": posixpath.basename(path), "type": "folder"})
+
+    def monkeypatch_upload_file(src, dest, **kwargs):
+        attempts[dest] = attempts.get(dest, 0) + 1
+        if dest == "/dest/sub/b.csv" and attempts[dest] == 1:
+            raise CruxClientError("Transient failure")
+        return File(raw_model={"name": posixpath.basename(dest), "type": "file"})
+
+    monkeypatch.setattr(dataset, "create_folder", monkeypatch_create_folder)
+    monkeypatch.setattr(dataset, "upload_file", monkeypatch_upload_file)
+
+    summary = dataset.upload_files_concurrently(
+        local_path=str(tmpdir), folder="/dest", workers=4, retry_backoff=0
+    )
+
+    assert sorted(file_obj.name for file_obj in summary.uploaded) == [
+        "a.csv",
+        "b.csv",
+        "c.csv",
+    ]
+    assert attempts["/dest/sub/b.csv"] == 2
+    assert "/dest/broken/d.csv" not in attempts
+    assert [local_path for local_path, _ in summary.failed] == [
+        str(tmpdir.join("broken"))
+    ]
+    assert not summary.succeeded
+
+    with pytest.raises(CruxClientError):
+        dataset.upload_files(
+            local_path=str(tmpdir), folder="/dest", workers=4, retry_backoff=0
+        )
+
+
+def test_upload_files_workers_returns_list(dataset, monkeypatch, tmpdir):
+    tmpdir.join("a.csv").write("a")
+    tmpdir.mkdir("sub").join("b.csv").write("b")
+
+    def monkeypatch_create_folder(path, tags=None, description=None):
+        return Folder(raw_model={"name": posixpath.basename(path), "type": "folder"})
+
+    def monkeypatch_upload_file(src, dest, **kwargs):
+        return File(raw_model={"name": posixpath.basename(dest), "type": "file"})
+
+    monkeypatch.setattr(dataset, "create_folder", monkeypatch_create_folder)
+    monkeypatch.setattr(dataset, "upload_file", monkeypatch_upload_file)
+
+    file_list = dataset.upload_files(local_path=str(tmpdir), folder="/dest", workers=2)
+
+    assert isinstance(file_list, list)
+    assert sorted(file_obj.name for file_obj in file_list) == ["a.csv", "b.csv"]
+
+
+def test_get_resources_batch(dataset, monkeypatch):
+    requested_batches = []
+
+    def monkeypatch_batch_call(method, path, headers=None, json=None, **kwargs):
+        assert path == ["v1", "resources", "get-batch"]
+        requested_batches.append(json["resourceIds"])
+
+        class MockResponse:
+            @property
+            def content(self):
+                return encode_json(self.json())
+
+            def json(self):
+                # The API doesn't guarantee the order of the batch.
+                return {
+                    "resources": [
+                        {"resourceId": rid, "type": "file"}
+                        for rid in reversed(json["resourceIds"])
+                    ]
+                }
+
+        return MockResponse()
+
+    monkeypatch.setattr(dataset.connection, "api_call", monkeypatch_batch_call)
+
+    resource_ids = ["id{}".format(i) for i in range(600)]
+    files = list(dataset.get_resources_batch(resource_ids, batch_size=100))
+
+    assert [file_obj.id for file_obj in files] == resource_ids
+    assert len(requested_batches) == 6
+
+
+def test_get_resources_batch_fetches_missing(dataset, monkeypatch):
+    fetched_one_by_one = []
+
+    def monkeypatch_batch_call(method, path, headers=None, json=None, **kwargs):
+        class MockResponse:
+            def __init__(self, data):
+                self.data = data
+                self.content = encode_json(data)
+
+            def json(self):
+                return self.data
+
+        if method == "POST":
+            # The batch response leaves out id1 and id3.
+            return MockResponse(
+                {
+                    "resources": [
+                        {"resourceId": rid, "type": "file"}
+                        for rid in json["resourceIds"]
+                        if rid not in ("id1", "id3")
+                    ]
+                }
+            )
+        resource_id = path[-1]
+        fetched_one_by_one.append(resource_id)
+        if resource_id == "id3":
+            raise CruxResourceNotFoundError({"statusCode": 404})
+        return MockResponse({"resourceId": resource_id, "type": "file"})
+
+    monkeypatch.setattr(dataset.connection, "api_call", monkeypatch_batch_call)
+
+    files = list(dataset.get_resources_batch(["id0", "id1", "id2"]))
+    assert [file_obj.id for file_obj in files] == ["id0", "id1", "id2"]
+    assert fetched_one_by_one == ["id1"]
+
+    with pytest.raises(CruxResourceNotFoundError):
+        list(dataset.get_resources_batch(["id2", "id3"]))
+
+
+def monkeypatch_deliveries_api(delivery_resources, raw_resources):
+    """Fake api_call serving delivery ids, delivery data and resource batches."""
+
+    class MockResponse:
+        def __init__(self, payload):
+            self.payload = payload
+            self.content = encode_json(payload)
+
+        def json(self):
+            return self.payload
+
+    def api_call(method, path, params=None, json=None, **kwargs):
+        if path[-1] == "ids":
+            return MockResponse(sorted(delivery_resources))
+        if path[-1] == "data":
+            resources = [
+                {"frame_id": raw_resources[rid]["frame"], "resource_id": rid}
+                for rid in delivery_resources[path[-2]]
+            ]
+            return MockResponse({"resources": resources})
+        if path[-1] == "get-batch":
+            return MockResponse(
+                [raw_resources[rid]["raw"] for rid in json["resourceIds"]]
+            )
+        raise AssertionError("Unexpected path {}".format(path))
+
+    return api_call
+
+
+def make_delivery_resource(resource_id, frame, supplier_dt, ingestion_dt):
+    labels = [
+        {"labelKey": "frame_id", "labelValue": frame},
+        {"labelKey": "supplier_implied_dt", "labelValue": supplier_dt},
+        {"labelKey": "ingestion_dt", "labelValue": ingestion_dt},
+    ]
+    raw = {"resourceId": resource_id, "type": "file", "labels": labels}
+    return resource_id, {"frame": frame, "raw": raw}
+
+
+def test_get_files_range_concurrent_deliveries(dataset, monkeypatch):
+    day_1, day_2 = "2020-01-01T00:00:00", "2020-01-02T00:00:00"
+    raw_resources = dict(
+        [
+            make_delivery_resource("r1", "f1", day_1, "2020-01-01T01:00:00"),
+            make_delivery_resource("r2", "f1", day_1, "2020-01-01T05:00:00"),
+            make_delivery_resource("r3", "f1", day_2, "2020-01-02T01:00:00"),
+            make_delivery_resource("r4", "f2", day_2, "2020-01-02T01:00:00"),
+        ]
+    )
+    delivery_resources = {
+        "abc.0": ["r1"],
+        "abc.1": ["r2"],
+        "def.0": ["r3", "r4"],
+    }
+    monkeypatch.setattr(
+        dataset.connection,
+        "api_call",
+        monkeypatch_deliveries_api(delivery_resources, raw_resources),
+    )
+
+    files = dataset.get_files_range(
+        start_date="2020-01-01", end_date="2020-01-02", max_workers=3
+    )
+
+    assert sorted(file_obj.id for file_obj in files) == ["r2", "r3", "r4"]
+
+
+def test_get_files_range_delivery_catalog(dataset, monkeypatch, tmpdir):
+    raw_resources = dict(
+        [make_delivery_resource("r1", "f1", "2020-01-01T00:00:00", "2020-01-01")]
+    )
+    api_call = monkeypatch_deliveries_api({"abc.0": ["r1"]}, raw_resources)
+    requested_paths = []
+
+    def counting_api_call(method, path, **kwargs):
+        requested_paths.append(path[-1])
+        return api_call(method, path, **kwargs)
+
+    monkeypatch.setattr(dataset.connection, "api_call", counting_api_call)
+    monkeypatch.setattr(
+        dataset.connection,
+        "delivery_catalog",
+        DeliveryCatalog.from_cache_dir(str(tmpdir)),
+    )
+
+    first = [file_obj.id for file_obj in dataset.get_files_range("2020-01-01")]
+    second = [file_obj.id for file_obj in dataset.get_files_range("2020-01-01")]
+
+    assert first == second == ["r1"]
+    # The second call only lists delivery IDs, everything else is in the catalog.
+    assert requested_paths == ["ids", "data", "get-batch", "ids"]
+
+
+def test_path_index(dataset, monkeypatch):
+    listed_folders = []
+    raw_model = {"resourceId": "1", "name": "a.csv", "type": "file"}
+    folder_contents = {"/data": [Resource(raw_model=raw_model)]}
+
+    def monkeypatch_list_resources(folder="/", **kwargs):
+        listed_folders.append(folder)
+        return iter(folder_contents[folder])
+
+    def monkeypatch_api_call(method, path, json=None, model=None, **kwargs):
+        if method == "DELETE":
+            folder_contents["/data"] = [
+                resource
+                for resource in folder_contents["/data"]
+                if resource.id != path[-1]
+            ]
+            return True
+        if method == "PUT":
+            for resource in folder_contents["/data"]:
+                if resource.id == path[-1]:
+                    resource.raw_model = dict(json)
+            return model(raw_model=json)
+        raw_model = dict(json, resourceId="2")
+        folder_contents["/data"].append(Resource(raw_model=raw_model))
+        return model(raw_model=raw_model)
+
+    monkeypatch.setattr(dataset.connection, "path_index", PathIndex(60))
+    monkeypatch.setattr(dataset, "_list_resources", monkeypatch_list_resources)
+    monkeypatch.setattr(dataset.connection, "api_call", monkeypatch_api_call)
+
+    assert dataset.get_file("/data/a.csv").id == "1"
+    assert dataset._resource_exists("/data/a.csv")
+    assert not dataset._resource_exists("/data/b.csv")
+    assert listed_folders == ["/data"]
+
+    dataset.create_file("/data/b.csv")
+    assert dataset.get_file("/data/b.csv").id == "2"
+    assert listed_folders == ["/data", "/data"]
+
+    dataset.get_file("/data/a.csv").delete()
+    assert not dataset._resource_exists("/data/a.csv")
+    assert listed_folders == ["/data", "/data", "/data"]
+
+    dataset.get_file("/data/b.csv").update(name="c.csv")
+    assert dataset.get_file("/data/c.csv").id == "2"
+    assert not dataset._resource_exists("/data/b.csv")
+    assert listed_folders == ["/data", "/data", "/data", "/data"]
+
+
+def test_path_index_resource_without_dataset(dataset, monkeypatch):
+    path_index = PathIndex(60)
+    path_index.put(dataset.id, "/data", {}, time.time())
+    monkeypatch.setattr(dataset.connection, "path_index", path_index)
+    monkeypatch.setattr(dataset.connection, "api_call", lambda *args, **kwargs: True)
+
+    # The dataset of the resource is unknown, so other indexes are kept.
+    Resource(raw_model={"resourceId": "1"}, connection=dataset.connection).delete()
+
+    assert path_index.get(dataset.id, "/data") == {}
+
+
+def test_dataset_copy_and_pickle(dataset):
+    copied = copy.deepcopy(dataset)
+    assert copied.id == dataset.id
+
+    unpickled = pickle.loads(pickle.dumps(Dataset(raw_model=dataset.raw_model)))
+    assert unpickled.raw_model == dataset.raw_model
+
+
+def test_list_files_skips_other_resources(dataset, monkeypatch):
+    calls = []
+
+    def monkeypatch_resources_call(method, path, model=None, params=None, **kwargs):
+        calls.append((params.get("cursor"), kwargs))
+        kwargs["paginate"]["cursor"] = "next"
+        if "cursor" in params:
+            return LazyModelList([], model)
+        return LazyModelList(
+            [
+                {"resourceId": "file1", "type": "file"},
+                {"resourceId": "folder1", "type": "folder"},
+                {"resourceId": "file2", "type": "file"},
+            ],
+            model,
+        )
+
+    monkeypatch.setattr(dataset.connection, "api_call", monkeypatch_resources_call)
+
+    files = list(dataset.list_files(limit=None))
+
+    assert [file_obj.id for file_obj in files] == ["file1", "file2"]
+    assert all(isinstance(file_obj, File) for file_obj in files)
+    assert all(kwargs["lazy"] for _, kwargs in calls)
+    assert [cursor for cursor, _ in calls] == [None, "next"]
+
+    pages = list(dataset.list_resource_pages(include_folders=True))
+    assert [len(page) for page in pages] == [3]
+    assert [raw["resourceId"] for raw in pages[0].raw_items][1] == "folder1"
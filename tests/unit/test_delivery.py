@@ -0,0 +1,70 @@
+import json
+import os
+
+import pytest
+
+from crux._client import CruxClient
+from crux.models import Delivery
+
+
+@pytest.fixture
+def delivery():
+    os.environ["CRUX_API_KEY"] = "1235"
+    conn = CruxClient(crux_config=None)
+    raw_model = {"delivery_id": "67890", "dataset_id": "12345"}
+    return Delivery(raw_model=raw_model, connection=conn)
+
+
+def monkeypatch_delivery_api(resource_ids, calls):
+    class MockResponse:
+        def __init__(self, payload):
+            self.payload = payload
+            self.content = json.dumps(payload).encode("utf-8")
+
+        def json(self):
+            return self.payload
+
+    def api_call(method, path, headers=None, json=None, **kwargs):
+        calls.append(path)
+        if path == ["v1", "resources", "get-batch"]:
+            return MockResponse(
+                [{"resourceId": rid, "type": "file"} for rid in json["resourceIds"]]
+            )
+        if path[-1] == "data":
+            return MockResponse(
+                {"resources": [{"resource_id": rid} for rid in resource_ids]}
+            )
+        if path[-1] == "raw":
+            return MockResponse({"resource_ids": resource_ids})
+        raise AssertionError("Unexpected call to {}".format(path))
+
+    return api_call
+
+
+def test_delivery_get_data_batches_metadata(delivery, monkeypatch):
+    resource_ids = ["id{}".format(i) for i in range(250)]
+    calls = []
+    monkeypatch.setattr(
+        delivery.connection, "api_call", monkeypatch_delivery_api(resource_ids, calls)
+    )
+
+    files = list(delivery.get_data())
+
+    assert [file_obj.id for file_obj in files] == resource_ids
+    assert all(file_obj.type == "file" for file_obj in files)
+    # One call for the delivery data and three batches of 100 resources.
+    assert len(calls) == 4
+
+
+def test_delivery_get_raw_without_hydration(delivery, monkeypatch):
+    resource_ids = ["id1", "id2"]
+    calls = []
+    monkeypatch.setattr(
+        delivery.connection, "api_call", monkeypatch_delivery_api(resource_ids, calls)
+    )
+
+    files = list(delivery.get_raw(hydrate=False))
+
+    assert [file_obj.id for file_obj in files] == resource_ids
+    assert all(file_obj.connection is delivery.connection for file_obj in files)
+    assert len(calls) == 1
@@ -1,5 +1,10 @@
+import json
+import os
+
 import pytest
 
+from crux._client import CruxClient
+from crux.exceptions import CruxClientError
 from crux.models import File, Permission
 
 
@@ -89,3 +94,139 @@ def test_download(monkeypatch, file):
     monkeypatch.setattr(file, "download", monkeypatch_download)
     result = file.download("/tmp/test.csv")
     assert result is True
+
+
+class MockRangeResponse(object):
+    def __init__(self, status_code, content=b""):
+        self.status_code = status_code
+        self.content = content
+
+    def raise_for_status(self):
+        pass
+
+    def iter_content(self, chunk_size=1):
+        for start in range(0, len(self.content), chunk_size):
+            end = start + chunk_size
+            yield self.content[start:end]
+
+    def close(self):
+        pass
+
+
+class MockRangeSession(object):
+    """Serves byte ranges of content, expiring the first signed URL once."""
+
+    def __init__(self, content):
+        self.content = content
+        self.proxies = {}
+        self.expired = set(["signed-url-0"])
+
+    def get(self, url, headers=None, stream=False):
+        if url in self.expired:
+            return MockRangeResponse(403)
+        start, end = headers["range"].replace("bytes=", "").split("-")
+        start, end = int(start), int(end) + 1
+        return MockRangeResponse(206, self.content[start:end])
+
+    def close(self):
+        pass
+
+
+def test_download_parallel_ranges(monkeypatch, tmpdir):
+    content = bytes(bytearray(range(256))) * 4096  # 1 MiB
+    chunk_size = 256 * 1024
+    session = MockRangeSession(content)
+    signed_urls = iter("signed-url-{}".format(i) for i in range(10))
+
+    os.environ["CRUX_API_KEY"] = "1235"
+    big_file = File(
+        raw_model={"resourceId": "12345", "size": len(content)},
+        connection=CruxClient(crux_config=None),
+    )
+    monkeypatch.setattr(
+        big_file, "_get_signed_url", lambda stale_url=None: next(signed_urls)
+    )
+    monkeypatch.setattr(big_file.connection.crux_config, "storage_session", session)
+
+    dest = str(tmpdir.join("parallel.bin"))
+    assert big_file.download(
+        dest, chunk_size=chunk_size, only_use_crux_domains=False, workers=4
+    )
+
+    with open(dest, "rb") as file_obj:
+        assert file_obj.read() == content
+
+
+def test_download_parallel_ranges_without_progress(monkeypatch, tmpdir):
+    content = bytes(bytearray(range(256))) * 4096  # 1 MiB
+    requests_sent = []
+
+    class EmptyRangeSession(MockRangeSession):
+        def get(self, url, headers=None, stream=False):
+            requests_sent.append(headers["range"])
+            return MockRangeResponse(206)
+
+    os.environ["CRUX_API_KEY"] = "1235"
+    big_file = File(
+        raw_model={"resourceId": "12345", "size": len(content)},
+        connection=CruxClient(crux_config=None),
+    )
+    monkeypatch.setattr(big_file, "_get_signed_url", lambda stale_url=None: "url")
+    monkeypatch.setattr(
+        big_file.connection.crux_config, "storage_session", EmptyRangeSession(content)
+    )
+
+    with pytest.raises(CruxClientError):
+        big_file.download(
+            str(tmpdir.join("empty.bin")),
+            chunk_size=256 * 1024,
+            only_use_crux_domains=False,
+            workers=2,
+        )
+    # Each range is requested once, then retried 5 times without progress.
+    assert max(requests_sent.count(byte_range) for byte_range in requests_sent) == 6
+
+
+def test_signed_url_cache(monkeypatch):
+    os.environ["CRUX_API_KEY"] = "1235"
+    cached_file = File(
+        raw_model={"resourceId": "12345"}, connection=CruxClient(crux_config=None)
+    )
+    signed_urls = iter("signed-url-{}".format(i) for i in range(10))
+    api_calls = []
+
+    class MockResponse(object):
+        def __init__(self, status_code, payload=None):
+            self.status_code = status_code
+            self.payload = payload
+            self.content = json.dumps(payload).encode("utf-8")
+
+        def json(self):
+            return self.payload
+
+        def iter_content(self, chunk_size=1):
+            yield b"crux"
+
+        def close(self):
+            pass
+
+    def api_call(method, path, headers=None, json=None, **kwargs):
+        api_calls.append(path)
+        return MockResponse(200, {"url": next(signed_urls)})
+
+    class MockSession(object):
+        # The first signed URL has been revoked.
+        def get(self, url, stream=False):
+            return MockResponse(403 if url == "signed-url-0" else 200)
+
+    monkeypatch.setattr(cached_file.connection, "api_call", api_call)
+    monkeypatch.setattr(
+        cached_file.connection.crux_config, "storage_session", MockSession()
+    )
+
+    for _ in range(3):
+        content = cached_file.iter_content(only_use_crux_domains=False)
+        assert list(content) == [b"crux"]
+
+    assert len(api_calls) == 2
+    assert cached_file._get_signed_url() == "signed-url-1"
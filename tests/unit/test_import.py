@@ -0,0 +1,41 @@
+import subprocess
+import sys
+
+import pytest
+
+pytestmark = pytest.mark.skipif(
+    sys.version_info < (3, 7), reason="Lazy imports need module __getattr__"
+)
+
+
+def imported_modules(statement):
+    code = "import sys\n{}\nprint('\\n'.join(sorted(sys.modules)))".format(statement)
+    output = subprocess.check_output([sys.executable, "-c", code])
+    return set(output.decode("utf-8").split())
+
+
+def test_import_crux_is_lazy():
+    modules = imported_modules("import crux")
+    assert "requests" not in modules
+    assert "crux.apis" not in modules
+    assert "crux.models" not in modules
+
+
+def test_import_client_skips_heavy_dependencies():
+    modules = imported_modules("from crux import Crux\nfrom crux.models import File")
+    assert "crux.apis" in modules
+    assert "dateutil" not in modules
+    assert "google.resumable_media" not in modules
+
+
+def test_lazy_attributes():
+    import crux
+    import crux.models
+    from crux.apis import Crux
+    from crux.models.dataset import Dataset
+
+    assert crux.Crux is Crux
+    assert crux.models.Dataset is Dataset
+    assert "Profile" in dir(crux)
+    with pytest.raises(AttributeError):
+        crux.Missing  # pylint: disable=pointless-statement
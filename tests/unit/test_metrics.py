@@ -0,0 +1,106 @@
+import copy
+import os
+
+import pytest
+import requests
+from requests.exceptions import ReadTimeout
+from requests.models import Response
+
+from crux import InMemoryMetrics
+from crux._client import CruxClient
+from crux._config import CruxConfig
+from crux._metrics import route_template
+from crux.exceptions import CruxClientTimeout, CruxResourceNotFoundError
+from crux.models import Resource
+
+
+def test_route_template():
+    assert route_template(["v2", "resources", "a1b2"]) == "v2/resources/{id}"
+    assert route_template(["resources", "a1b2", "permissions"]) == (
+        "resources/{id}/permissions"
+    )
+    assert route_template(["v1", "resources", "get-batch"]) == "v1/resources/get-batch"
+    assert route_template(["v2", "resources", "abcdef", "content-url"]) == (
+        "v2/resources/{id}/content-url"
+    )
+    assert route_template(["v1", "deliveries", "ds1", "abc123.0", "data"]) == (
+        "v1/deliveries/{id}/{id}/data"
+    )
+    assert route_template(["v1", "deliveries", "ds1", "ids"]) == (
+        "v1/deliveries/{id}/ids"
+    )
+    assert route_template(["permissions", "res1", "Id2", "Read"]) == (
+        "permissions/{id}/{id}/{id}"
+    )
+    assert route_template(["permissions", "bulk"]) == "permissions/bulk"
+    assert route_template(["datasets", "ds1", "labels", "key", "val2"]) == (
+        "datasets/{id}/labels/{id}/{id}"
+    )
+    assert route_template(["datasets", "ds1", "labels", "search"]) == (
+        "datasets/{id}/labels/search"
+    )
+    # Unknown paths have every segment following a collection name replaced.
+    assert route_template(["v2", "things", "abc", "parts", "xyz"]) == (
+        "v2/things/{id}/parts/{id}"
+    )
+
+
+def test_in_memory_metrics_records_api_calls(monkeypatch):
+    os.environ["CRUX_API_KEY"] = "1235"
+    metrics = InMemoryMetrics()
+    client = CruxClient(CruxConfig(metrics_hooks=[metrics], coalesce_requests=False))
+
+    def monkeypatch_request(self, method, url, params=None, **kwargs):
+        if url.endswith("slow"):
+            raise ReadTimeout("timed out")
+        response = Response()
+        if url.endswith("missing1"):
+            response.status_code = 404
+            response._content = b'{"message": "not found"}'
+        elif url.endswith("resources"):
+            response.status_code = 200
+            response._content = (
+                b'{"results": [{"resourceId": "r1"}], "cursor": "c"}'
+                if "cursor" not in params
+                else b'{"results": [], "cursor": "c"}'
+            )
+        else:
+            response.status_code = 200
+            response._content = b'{"resourceId": "r1"}'
+        return response
+
+    monkeypatch.setattr(requests.sessions.Session, "request", monkeypatch_request)
+
+    client.api_call("GET", ["v2", "resources", "r1"], model=Resource)
+    with pytest.raises(CruxResourceNotFoundError):
+        client.api_call("GET", ["v2", "resources", "missing1"], model=Resource)
+    with pytest.raises(CruxClientTimeout):
+        client.api_call("GET", ["v2", "slow"], model=Resource)
+    paginate = {}
+    client.api_call("GET", ["resources"], model=Resource, paginate=paginate)
+    client.api_call(
+        "GET",
+        ["resources"],
+        model=Resource,
+        params={"cursor": "c"},
+        paginate=paginate,
+    )
+
+    snapshot = metrics.snapshot()
+    resource_stats = snapshot[("GET", "v2/resources/{id}")]
+    assert resource_stats["requests"] == 2
+    assert resource_stats["statuses"] == {"200": 1, "404": 1}
+    assert resource_stats["response_bytes"] == len(b'{"resourceId": "r1"}') + len(
+        b'{"message": "not found"}'
+    )
+    assert snapshot[("GET", "v2/slow")]["statuses"] == {"CruxClientTimeout": 1}
+    assert snapshot[("GET", "resources")]["max_page"] == 2
+
+    text = metrics.to_prometheus()
+    labels = '{method="GET",route="v2/resources/{id}",status="404"}'
+    assert "crux_client_requests_total{} 1".format(labels) in text
+    assert (
+        'crux_client_request_duration_seconds_count{method="GET",route="resources"} 2'
+        in text
+    )
+    assert copy.deepcopy(metrics) is metrics
@@ -0,0 +1,114 @@
+import os
+import time
+
+import requests
+from requests.models import Response
+
+from crux import Profile
+from crux._client import CruxClient
+from crux._config import CruxConfig
+from crux._profile import _union_length, profiled, record_request
+from crux._utils import get_executor
+from crux.models import Resource
+
+
+class Operations(object):
+    def __init__(self, executor=None):
+        self.executor = executor
+
+    @profiled
+    def outer(self, count):
+        self.inner()
+        for _ in range(count):
+            record_request("GET v2/resources/{id}", 0.01)
+
+    @profiled
+    def inner(self):
+        record_request("GET v2/datasets/{id}", 0.01)
+
+    @profiled
+    def fan_out(self, count):
+        futures = [
+            self.executor.submit(record_request, "GET storage", 0.01, 0, 5, True)
+            for _ in range(count)
+        ]
+        for future in futures:
+            future.result()
+
+    @profiled
+    def generate(self, count):
+        for index in range(count):
+            record_request("GET v2/resources/{id}", 0.01)
+            yield index
+
+
+def test_union_length():
+    assert _union_length([]) == 0
+    assert _union_length([(0.0, 1.0), (0.5, 1.5), (3.0, 4.0)]) == 2.5
+
+
+def test_profile_attributes_to_outermost_operation():
+    operations = Operations()
+    with Profile(n_plus_one_threshold=3) as profile:
+        operations.outer(3)
+        operations.inner()
+        record_request("GET v2/other", 0.01)
+
+    report = profile.report()
+    assert report["Operations.outer"]["calls"] == 1
+    assert report["Operations.outer"]["api_requests"] == 4
+    assert report["Operations.outer"]["routes"] == {
+        "GET v2/resources/{id}": 3,
+        "GET v2/datasets/{id}": 1,
+    }
+    assert report["Operations.outer"]["n_plus_one"] == {"GET v2/resources/{id}": 3}
+    assert report["Operations.inner"]["api_requests"] == 1
+    assert report["other"]["api_requests"] == 1
+    assert "N+1: GET v2/resources/{id} (3 requests)" in profile.summary()
+
+
+def test_profile_follows_executor_threads_and_generators():
+    with get_executor(4) as executor:
+        operations = Operations(executor)
+        with Profile() as profile:
+            operations.fan_out(8)
+            assert list(operations.generate(2)) == [0, 1]
+
+    report = profile.report()
+    fan_out = report["Operations.fan_out"]
+    assert fan_out["storage_requests"] == 8
+    assert fan_out["bytes_received"] == 40
+    assert fan_out["serial_time"] >= fan_out["wall_time"]
+    assert report["Operations.generate"]["api_requests"] == 2
+    assert "other" not in report
+
+
+def test_profile_sampling_and_inactive():
+    operations = Operations()
+    operations.outer(1)
+    with Profile(sample_rate=0) as profile:
+        operations.outer(1)
+    assert profile.report() == {}
+
+
+def test_profile_records_api_calls(monkeypatch):
+    os.environ["CRUX_API_KEY"] = "1235"
+    client = CruxClient(CruxConfig(coalesce_requests=False))
+
+    def monkeypatch_request(self, method, url, params=None, **kwargs):
+        time.sleep(0.001)
+        response = Response()
+        response.status_code = 200
+        response._content = b'{"resourceId": "r1"}'
+        return response
+
+    monkeypatch.setattr(requests.sessions.Session, "request", monkeypatch_request)
+
+    with Profile() as profile:
+        client.api_call("GET", ["v2", "resources", "r1"], model=Resource)
+
+    stats = profile.report()["other"]
+    assert stats["api_requests"] == 1
+    assert stats["routes"] == {"GET v2/resources/{id}": 1}
+    assert stats["bytes_received"] == len(b'{"resourceId": "r1"}')
+    assert stats["serial_time"] > 0
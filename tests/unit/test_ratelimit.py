@@ -0,0 +1,87 @@
+from requests.adapters import HTTPAdapter
+from requests.models import Response
+
+from crux import _ratelimit
+from crux._ratelimit import RateLimiter, retry_after_seconds
+from crux._utils import get_session, RateLimitedRetry
+
+
+class FakeTime(object):
+    def __init__(self):
+        self.now = 1000.0
+        self.slept = []
+
+    def time(self):
+        return self.now
+
+    def sleep(self, seconds):
+        self.slept.append(seconds)
+        self.now += seconds
+
+
+def test_retry_after_seconds(monkeypatch):
+    fake_time = FakeTime()
+    fake_time.now = 1582243200.0  # Fri, 21 Feb 2020 00:00:00 GMT
+    monkeypatch.setattr(_ratelimit, "time", fake_time)
+
+    assert retry_after_seconds("2") == 2.0
+    assert retry_after_seconds("Fri, 21 Feb 2020 00:00:30 GMT") == 30.0
+    assert retry_after_seconds("soon") is None
+    assert retry_after_seconds(None) is None
+
+
+def test_rate_limiter_limits_rate(monkeypatch):
+    fake_time = FakeTime()
+    monkeypatch.setattr(_ratelimit, "time", fake_time)
+    limiter = RateLimiter("test", max_rate=2, adaptive=False)
+
+    for _ in range(6):
+        limiter.acquire()
+
+    # Two tokens are available at once, then one every half second.
+    assert sum(fake_time.slept) == 2.0
+
+
+def test_rate_limiter_adapts_to_throttling(monkeypatch):
+    fake_time = FakeTime()
+    monkeypatch.setattr(_ratelimit, "time", fake_time)
+    limiter = RateLimiter("test")
+
+    for _ in range(40):
+        limiter.acquire()
+    assert limiter.rate is None
+
+    limiter.on_response(429, {"Retry-After": "3"})
+    assert limiter.rate == 20
+    # Throttling caused by requests already sent doesn't lower the rate again.
+    limiter.on_response(429, {})
+    assert limiter.rate == 20
+
+    limiter.acquire()
+    assert fake_time.slept[0] == 3.0
+
+    fake_time.now += 5
+    limiter.on_response(200, {})
+    assert limiter.rate > 20
+
+
+def test_session_requests_use_rate_limiter(monkeypatch):
+    limiter = RateLimiter("test")
+
+    def monkeypatch_send(self, request, **kwargs):
+        response = Response()
+        response.status_code = 429
+        response.headers["Retry-After"] = "0"
+        return response
+
+    monkeypatch.setattr(HTTPAdapter, "send", monkeypatch_send)
+    session = get_session(rate_limiter=limiter)
+
+    response = session.get("https://storage.example.com/object")
+
+    assert response.status_code == 429
+    assert limiter.rate == limiter.min_rate
+    retries = session.get_adapter("https://storage.example.com").max_retries
+    assert isinstance(retries, RateLimitedRetry)
+    assert retries.rate_limiter is limiter
+    assert 429 in retries.status_forcelist
@@ -0,0 +1,82 @@
+import json
+import os
+
+import pytest
+from requests.adapters import BaseAdapter
+from requests.models import Response
+
+from crux._client import CruxClient
+from crux._config import CruxConfig
+from crux._replay import ReplayMissError
+from crux.models import Resource
+
+
+class FakeAdapter(BaseAdapter):
+    def __init__(self):
+        super(FakeAdapter, self).__init__()
+        self.requests = []
+
+    def send(self, request, stream=False, **kwargs):
+        self.requests.append(request.url)
+        response = Response()
+        response.request = request
+        response.url = request.url
+        if "storage" in request.url:
+            response.status_code = 200
+            response.headers["content-type"] = "application/octet-stream"
+            response._content = b"x" * 1000
+        else:
+            response.status_code = 200
+            response.headers["content-type"] = "application/json"
+            response._content = json.dumps(
+                {"resourceId": request.url.rsplit("/", 1)[-1], "type": "file"}
+            ).encode("utf-8")
+        return response
+
+    def close(self):
+        pass
+
+
+@pytest.fixture
+def record_path(tmpdir):
+    os.environ["CRUX_API_KEY"] = "1235"
+    return str(tmpdir.join("recording.jsonl"))
+
+
+def test_record_then_replay(record_path):
+    adapter = FakeAdapter()
+    config = CruxConfig(record_path=record_path, coalesce_requests=False)
+    for session in (config.session, config.storage_session):
+        session.mount("https://", adapter)
+    client = CruxClient(config)
+
+    client.api_call("GET", ["v2", "resources", "r1"], model=Resource)
+    client.api_call("GET", ["v2", "resources", "r2"], model=Resource)
+    config.storage_session.get("https://storage.example.com/storage/r1?sig=abc")
+    client.close()
+
+    with open(record_path) as recording:
+        entries = [json.loads(line) for line in recording]
+    assert [entry["route"] for entry in entries] == [
+        "v2/resources/{id}",
+        "v2/resources/{id}",
+        "storage",
+    ]
+    assert entries[0]["status"] == 200
+    assert json.loads(entries[1]["body"])["resourceId"] == "r2"
+    assert entries[2]["body"] is None
+    assert entries[2]["body_size"] == 1000
+    assert entries[2]["params"] == {"sig": "abc"}
+
+    replay_client = CruxClient(
+        CruxConfig(replay_path=record_path, coalesce_requests=False)
+    )
+    resource = replay_client.api_call("GET", ["v2", "resources", "r2"], model=Resource)
+    assert resource.id == "r2"
+    response = replay_client.crux_config.storage_session.get(
+        "https://storage.example.com/storage/r1?sig=abc"
+    )
+    assert len(response.content) == 1000
+
+    with pytest.raises(ReplayMissError):
+        replay_client.api_call("GET", ["v2", "datasets", "d1"])
@@ -1,3 +1,4 @@
+from datetime import datetime
 import os
 
 import pytest
@@ -133,3 +134,38 @@ def test_update_resource(resource, monkeypatch):
 
     assert resource.name == "test_dataset2"
     assert resource.description == "test_description_2"
+
+
+def test_resource_parsed_fields_cached_until_refresh(monkeypatch):
+    os.environ["CRUX_API_KEY"] = "1235"
+    conn = CruxClient(crux_config=None)
+
+    def raw_resource(ingestion_dt):
+        return {
+            "resourceId": "12345",
+            "modifiedAt": "2020-02-03T10:00:00Z",
+            "labels": [
+                {"labelKey": "frame_id", "labelValue": "frame1"},
+                {"labelKey": "supplier_implied_dt", "labelValue": "2020-02-02"},
+                {"labelKey": "ingestion_dt", "labelValue": ingestion_dt},
+            ],
+        }
+
+    resource = Resource(raw_model=raw_resource("2020-02-03T00:00:00"), connection=conn)
+
+    assert resource.supplier_implied_datetime == datetime(2020, 2, 2)
+    assert resource.ingestion_datetime == datetime(2020, 2, 3)
+    assert resource.modified_datetime.hour == 10
+    assert resource.frame_id == "frame1"
+    # Modifying the returned labels doesn't change the cached ones.
+    resource.labels["frame_id"] = "other"
+    assert resource.frame_id == "frame1"
+
+    def monkeypatch_refresh_call(*args, **kwargs):
+        return Resource(raw_model=raw_resource("2020-02-04T00:00:00"))
+
+    monkeypatch.setattr(conn, "api_call", monkeypatch_refresh_call)
+    resource.refresh()
+
+    assert resource.ingestion_time == "2020-02-04T00:00:00"
+    assert resource.ingestion_datetime == datetime(2020, 2, 4)
@@ -0,0 +1,89 @@
+import os
+
+import pytest
+
+from crux._client import CruxClient
+from crux._lazy import LazyModelList
+from crux.models import Dataset, File, ResourceTable
+
+
+@pytest.fixture
+def dataset():
+    os.environ["CRUX_API_KEY"] = "1235"
+    conn = CruxClient(crux_config=None)
+    return Dataset(raw_model={"datasetId": "12345"}, connection=conn)
+
+
+def raw_file(resource_id, frame_id="frame1", size=10):
+    return {
+        "resourceId": resource_id,
+        "name": resource_id + ".csv",
+        "type": "file",
+        "size": size,
+        "modifiedAt": "2020-02-03T00:00:00Z",
+        "description": "not kept",
+        "labels": [
+            {"labelKey": "frame_id", "labelValue": frame_id},
+            {"labelKey": "supplier_implied_dt", "labelValue": "2020-02-02"},
+            {"labelKey": "ingestion_dt", "labelValue": "2020-02-03"},
+        ],
+    }
+
+
+def test_resource_table_columns_and_rows():
+    table = ResourceTable(dataset_id="12345")
+    table.extend([raw_file("file1"), raw_file("file2", size=None)], folder="/data")
+
+    assert len(table) == 2
+    assert table.column("id") == ["file1", "file2"]
+    assert table.column("size") == [10, None]
+    assert table.column("folder") == ["/data", "/data"]
+    assert table.row(1)["frame_id"] == "frame1"
+    assert table.to_dict()["supplier_implied_dt"] == ["2020-02-02", "2020-02-02"]
+
+    with pytest.raises(KeyError):
+        table.column("description")
+
+
+def test_resource_table_builds_files():
+    table = ResourceTable(dataset_id="12345")
+    table.append(raw_file("file1"), folder="/data")
+
+    file_obj = table[0]
+
+    assert isinstance(file_obj, File)
+    assert file_obj.id == "file1"
+    assert file_obj.dataset_id == "12345"
+    assert file_obj.frame_id == "frame1"
+    assert file_obj.supplier_implied_dt == "2020-02-02"
+    # The folder comes from the listing, without a folder path request.
+    assert file_obj.path == "/data/file1.csv"
+    assert [file_obj.size for file_obj in table] == [10]
+
+
+def test_list_files_as_table(dataset, monkeypatch):
+    def monkeypatch_resources_call(method, path, model=None, params=None, **kwargs):
+        kwargs["paginate"]["cursor"] = "next"
+        if "cursor" in params:
+            return LazyModelList([], model)
+        folder = {"resourceId": "folder1", "type": "folder"}
+        return LazyModelList([raw_file("file1"), folder, raw_file("file2")], model)
+
+    monkeypatch.setattr(dataset.connection, "api_call", monkeypatch_resources_call)
+
+    table = dataset.list_files(folder="/data", limit=None, as_table=True)
+
+    assert isinstance(table, ResourceTable)
+    assert table.column("id") == ["file1", "file2"]
+    assert table[1].path == "/data/file2.csv"
+
+
+def test_resource_table_to_pandas():
+    pandas = pytest.importorskip("pandas")
+    table = ResourceTable()
+    table.append(raw_file("file1"), folder="/data")
+
+    frame = table.to_pandas()
+
+    assert isinstance(frame, pandas.DataFrame)
+    assert list(frame["id"]) == ["file1"]
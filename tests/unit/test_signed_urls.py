@@ -0,0 +1,43 @@
+import time
+
+from crux._signed_urls import signed_url_expiry, SignedURLCache
+
+
+def test_signed_url_expiry_gcs_v4():
+    url = (
+        "https://storage.googleapis.com/bucket/object"
+        "?X-Goog-Algorithm=GOOG4-RSA-SHA256&X-Goog-Date=20200101T000000Z"
+        "&X-Goog-Expires=900&X-Goog-Signature=abc"
+    )
+    assert signed_url_expiry(url) == 1577836800 + 900
+
+
+def test_signed_url_expiry_v2_and_api_fields():
+    url = (
+        "https://storage.googleapis.com/bucket/object"
+        "?Expires=1577836800&Signature=abc"
+    )
+    assert signed_url_expiry(url) == 1577836800
+    assert signed_url_expiry(url, {"expiresAt": "2020-01-01T00:15:00Z"}) == 1577837700
+    assert signed_url_expiry("https://storage.example.com/object") is None
+
+
+def test_signed_url_cache():
+    cache = SignedURLCache(max_entries=2)
+    now = time.time()
+    cache.put("id1", "url1", expires_at=now + 3600)
+    cache.put("id2", "url2", expires_at=now + 1)
+    assert cache.get("id1") == "url1"
+    # Expiring within the safety margin counts as expired.
+    assert cache.get("id2") is None
+
+    cache.put("id2", "url2")
+    cache.put("id3", "url3")
+    # id1 is the least recently used entry.
+    assert cache.get("id1") is None
+    assert len(cache) == 2
+
+    cache.invalidate("id3", "other-url")
+    assert cache.get("id3") == "url3"
+    cache.invalidate("id3", "url3")
+    assert cache.get("id3") is None
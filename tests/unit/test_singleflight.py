@@ -0,0 +1,60 @@
+import os
+import threading
+import time
+
+import pytest
+import requests
+from requests.models import Response
+
+from crux._client import CruxClient
+from crux._config import CruxConfig
+from crux._singleflight import SingleFlight
+from crux.models import Resource
+
+
+def test_single_flight_shares_errors():
+    single_flight = SingleFlight()
+
+    def fail():
+        raise ValueError("failed")
+
+    with pytest.raises(ValueError):
+        single_flight.run("key", fail)
+
+    assert single_flight.run("key", lambda: 1) == (1, False)
+
+
+def test_client_coalesces_concurrent_gets(monkeypatch):
+    os.environ["CRUX_API_KEY"] = "1235"
+    client = CruxClient(CruxConfig())
+    requests_sent = []
+    release = threading.Event()
+
+    def monkeypatch_request(self, method, url, **kwargs):
+        requests_sent.append(url)
+        release.wait(5)
+        response = Response()
+        response.status_code = 200
+        response._content = b'{"resourceId": "id1", "name": "name1"}'
+        return response
+
+    monkeypatch.setattr(requests.sessions.Session, "request", monkeypatch_request)
+    results = []
+
+    def get_resource():
+        results.append(
+            client.api_call("GET", ["v2", "resources", "id1"], model=Resource)
+        )
+
+    threads = [threading.Thread(target=get_resource) for _ in range(5)]
+    for thread in threads:
+        thread.start()
+    # Let every thread join the request in flight before it completes.
+    time.sleep(0.2)
+    release.set()
+    for thread in threads:
+        thread.join()
+
+    assert len(requests_sent) == 1
+    assert [resource.name for resource in results] == ["name1"] * 5
+    assert len(set(id(resource.raw_model) for resource in results)) == 5
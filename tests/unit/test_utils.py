@@ -1,8 +1,13 @@
 import pytest
 
 from crux._utils import (
+    get_pool_stats,
+    get_session,
+    get_shared_session,
     Headers,
+    prefetched,
     quote,
+    ResumableUploadSignedSession,
     split_posixpath_filename_dirpath,
     str_to_bool,
     url_builder,
@@ -85,3 +90,69 @@ def test_headers():
     assert header["HeAdEr-KeY"] == "ChangedHeaderValue"
     assert header["header-key"] == "ChangedHeaderValue"
     assert header["HEADER-KEY"] == "ChangedHeaderValue"
+
+
+def test_prefetched():
+    produced = []
+
+    def pages():
+        for page in range(5):
+            produced.append(page)
+            yield page
+
+    pages_gen = prefetched(pages(), depth=2)
+    assert next(pages_gen) == 0
+    assert list(pages_gen) == [1, 2, 3, 4]
+    assert produced == [0, 1, 2, 3, 4]
+
+
+def test_prefetched_raises():
+    def pages():
+        yield 1
+        raise ValueError("page failed")
+
+    pages_gen = prefetched(pages(), depth=1)
+    assert next(pages_gen) == 1
+    with pytest.raises(ValueError):
+        next(pages_gen)
+
+
+def test_get_shared_session():
+    source = get_session(
+        proxies={"https": "https://proxy.example.com"}, pool_maxsize=32
+    )
+    session = get_shared_session(source, session_class=ResumableUploadSignedSession)
+    session.headers = {"x-goog-resumable": "start"}
+
+    assert isinstance(session, ResumableUploadSignedSession)
+    assert session.get_adapter("https://storage.example.com") is source.get_adapter(
+        "https://storage.example.com"
+    )
+    assert session.proxies == {"https": "https://proxy.example.com"}
+    assert source.get_adapter("https://storage.example.com")._pool_maxsize == 32
+    assert "x-goog-resumable" not in source.headers
+
+
+def test_get_pool_stats():
+    session = get_session(pool_maxsize=4, pool_connections=2, pool_block=True)
+    adapter = session.get_adapter("https://api.example.com")
+    pool = adapter.poolmanager.connection_from_url("https://api.example.com")
+    pool.num_requests = 5
+    pool.num_connections = 2
+
+    stats = get_pool_stats(session)
+
+    assert adapter.poolmanager.pools._maxsize == 2
+    assert pool.block is True
+    assert stats == [
+        {
+            "scheme": "https",
+            "host": "api.example.com",
+            "port": 443,
+            "maxsize": 4,
+            "requests": 5,
+            "connections_created": 2,
+            "connections_reused": 3,
+            "idle_connections": 4,
+        }
+    ]